@@ -13,6 +13,10 @@ class Settings(BaseSettings):
 
     # Database Configuration
     database_url: str = "sqlite:///./praisa_demo.db"
+    # "single" (praisa_demo.db) or "sharded" (one SQLite file per hospital)
+    database_layout: str = "single"
+    shard_dir: str = "shards"  # Relative to the project root
+    shard_workers: int = 8  # Threads for cross-hospital scatter queries
 
     # API Configuration
     api_host: str = "0.0.0.0"
@@ -25,6 +29,99 @@ class Settings(BaseSettings):
     fuzzy_match_threshold: float = 80.0
     review_threshold: float = 60.0
 
+    # In-memory Indexes
+    # How often (seconds) indexes check the database for changed data
+    index_refresh_interval_s: float = 5.0
+    # Memory-mapped name index file shared by all workers (relative to the
+    # project root, e.g. "indexes/names.idx"); empty = per-worker in-memory index
+    name_index_path: str = ""
+    # Default +/- years around birth_year for demographic search filters
+    birth_year_window: int = 1
+    # From this many names on, name search scores only candidates from the
+    # n-gram TF-IDF shortlist and the SymSpell index (smaller: all names)
+    candidate_index_min_names: int = 20000
+    ngram_shortlist_size: int = 200  # Distinct names kept by the shortlist
+    symspell_max_distance: int = 2  # Max edits per name token
+    # Time budget of a name search's fuzzy scoring (0 = unlimited); when it
+    # runs out the best matches so far are returned with "partial": true
+    search_budget_ms: int = 500
+    fuzzy_chunk_size: int = 5000  # Names scored between budget checks
+    disconnect_poll_s: float = 0.05  # Client disconnect check while searching
+    batch_max_queries: int = 500  # Queries per POST /api/patients/search/batch
+    batch_max_ids: int = 1000  # Patient IDs per multi-ID fetch
+    # In-memory Bloom filters answer ABHA/Aadhaar/phone misses without SQLite
+    identifier_filter_enabled: bool = True
+    identifier_filter_error_rate: float = 0.01  # False positives -> SQL lookup
+    # Reject Aadhaar numbers failing the Verhoeff checksum before any lookup
+    # (off by default: stored demo/legacy numbers often fail it)
+    aadhaar_checksum_validation: bool = False
+
+    # Admission Control (per worker, see app/utils/admission.py)
+    admission_enabled: bool = True
+    # Request class -> [concurrent requests, queued requests]; beyond that: 503
+    admission_pools: dict = {
+        "identifier": [32, 256],
+        "name": [8, 32],
+        "match": [8, 64],
+        "bulk": [2, 4],
+    }
+    admission_queue_timeout_s: float = 1.0  # Max wait in the queue
+    admission_retry_after_s: int = 1  # Retry-After header of 503 responses
+
+    # Match results cached per (record versions, model version); 0 = off
+    match_cache_size: int = 10000
+
+    # Micro-batching of POST /api/match: concurrent requests are scored
+    # together once max_size are pending or after max_wait_ms. Batches are
+    # per worker and bounded by the "match" admission pool's concurrency, so
+    # max_size should not exceed it (larger batches never fill and every
+    # call waits the full max_wait_ms)
+    match_batching_enabled: bool = False
+    match_batch_max_size: int = 8
+    match_batch_max_wait_ms: float = 2.0
+
+    # Matcher weights hot reload (app/matching/model_reload.py): seconds
+    # between weights file checks (0 = only POST /api/admin/model/reload),
+    # and the golden-pair accuracy new weights need to be swapped in
+    model_watch_interval_s: float = 5.0
+    model_golden_min_accuracy: float = 1.0
+
+    # Change feed (GET /api/changes): changes per page
+    changes_page_size: int = 500
+    changes_max_page_size: int = 5000
+    # Merkle tree for node reconciliation: levels of 16 children (3 = 4096
+    # buckets); nodes comparing trees must use the same depth
+    merkle_depth: int = 3
+    merkle_max_prefixes: int = 256  # Prefixes per tree/bucket request
+
+    # Background jobs (app/jobs): job table and outputs under jobs_dir
+    jobs_dir: str = "jobs"  # Relative to the project root
+    jobs_thread_workers: int = 2  # Concurrent in-process jobs (index rebuilds)
+    jobs_process_workers: int = 1  # Concurrent CPU-heavy jobs (training, linkage)
+    jobs_progress_interval_s: float = 0.5  # Min seconds between progress writes
+
+    # Startup
+    # Run the index/matcher warmup in a background thread (serve /health meanwhile)
+    warmup_in_background: bool = True
+    # gc.freeze() after warmup: preloaded objects are never scanned or
+    # touched by the collector, keeping forked workers' pages shared
+    gc_freeze_after_warmup: bool = True
+
+    # Response Compression
+    # Responses smaller than this many bytes are sent uncompressed
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+
+    # Federation (fan-out to other PRAISA hospital nodes)
+    # JSON object of node name -> base URL, e.g. {"hospital_b": "http://10.0.0.12:8000"}
+    federation_nodes: dict = {}
+    federation_timeout_s: float = 2.0
+    federation_max_connections: int = 20
+    # Consecutive failures before a node's circuit opens, and how long it stays open
+    federation_breaker_failures: int = 3
+    federation_breaker_reset_s: float = 30.0
+
     # CORS Settings
     cors_origins: list = ["*"]  # For development; restrict in production
 
@@ -10,55 +10,139 @@ Connection: Context manager pattern for automatic cleanup
 """
 
 import os
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from itertools import islice
+from sqlalchemy import bindparam, text
 from contextlib import contextmanager
-from rapidfuzz import process, fuzz
+from app.config import settings
+from app.database.shards import ShardSet, SHARDED
+from app.utils.identifiers import identifier_key, validate_identifier
 
 # Database Configuration
 # Using SQLite for POC demo - file-based database
 # For production, this will be PostgreSQL connection string
 # Use absolute path to avoid issues with CWD
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'praisa_demo.db')}"
+DATABASE_PATH = os.path.join(BASE_DIR, "praisa_demo.db")
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
-# Create SQLAlchemy engine
-# check_same_thread=False is required for SQLite to work with FastAPI
-# (FastAPI uses multiple threads for async operations)
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}  # SQLite-specific setting
+# Per-hospital shard files (DATABASE_LAYOUT=sharded), e.g. shards/hospital_a.db
+SHARD_DIR = os.path.join(BASE_DIR, settings.shard_dir)
+
+
+def build_shards() -> ShardSet:
+    """
+    Build the ShardSet for the configured DATABASE_LAYOUT.
+
+    Each shard owns a SQLAlchemy engine; check_same_thread=False is set
+    because FastAPI and the scatter pool use sessions from several threads.
+    """
+    if settings.database_layout == SHARDED:
+        return ShardSet.sharded(SHARD_DIR, workers=settings.shard_workers)
+    return ShardSet.single(DATABASE_PATH, workers=settings.shard_workers)
+
+
+# Shards every query is routed through (one shard in the single-file layout)
+shards = build_shards()
+
+
+# Columns that callers may request through a `fields=` projection.
+# Projections are rendered into the SELECT list, so only whitelisted
+# names ever reach the SQL text.
+PATIENT_COLUMNS = (
+    "id",
+    "patient_id",
+    "hospital_id",
+    "name",
+    "dob",
+    "mobile",
+    "gender",
+    "abha_number",
+    "aadhaar_number",
+    "address",
+    "state",
+    "version",
+)
+VISIT_COLUMNS = (
+    "id",
+    "visit_id",
+    "patient_id",
+    "admission_date",
+    "visit_type",
+    "diagnosis",
+    "doctor_name",
 )
 
-# Create session factory
-# Sessions are used to interact with the database
-# autocommit=False: Manual transaction control
-# autoflush=False: Manual flush control
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def select_list(columns=None, allowed=PATIENT_COLUMNS, required=()) -> str:
+    """
+    Render a SELECT column list for an optional projection.
+
+    Args:
+        columns: Requested column names, or None for all columns
+        allowed: Whitelist the columns must come from
+        required: Columns always selected (e.g. keys the query logic needs)
+
+    Returns:
+        str: "*" or a comma-separated column list
+
+    Raises:
+        ValueError: If a requested column is not in `allowed`
+    """
+    if not columns:
+        return "*"
+    unknown = [c for c in columns if c not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    selected = list(dict.fromkeys([*required, *columns]))
+    return ", ".join(selected)
 
 
 @contextmanager
-def get_db():
+def get_db(hospital_id: str = None):
     """
     Database session context manager.
 
     Provides a database session and ensures it's properly closed
-    after use, even if an exception occurs.
+    after use, even if an exception occurs. Pending schema migrations
+    are applied on first use.
 
     Usage:
         with get_db() as db:
             result = db.execute(query)
 
+    Args:
+        hospital_id: Shard to open in the sharded layout (required there)
+
     Yields:
         Session: SQLAlchemy database session
     """
-    db = SessionLocal()  # Create new session
-    try:
-        yield db  # Provide session to caller
-    finally:
-        db.close()  # Always close session (cleanup)
+    with shards.session(hospital_id) as db:
+        yield db
+
+
+def fetch_dicts(db, query, params=None) -> list:
+    """
+    Execute a query and return its rows as plain dicts, copied exactly once.
+
+    Builds each dict straight from the row tuple and the column names,
+    skipping the intermediate RowMapping objects of `.mappings()`. The
+    dicts are mutable so routes can add derived fields (e.g. quality score)
+    in place before serialization.
+
+    Args:
+        db: Open database session
+        query: SQLAlchemy text() query
+        params: Bound parameters
+
+    Returns:
+        list[dict]: One dict per row
+    """
+    result = db.execute(query, params or {})
+    keys = tuple(result.keys())
+    return [dict(zip(keys, row)) for row in result]
 
 
-def get_patient(patient_id: str):
+def get_patient(patient_id: str, columns=None):
     """
     Get patient by unique patient ID.
 
@@ -67,26 +151,277 @@ def get_patient(patient_id: str):
 
     Args:
         patient_id: Unique patient identifier (e.g., "HA001")
+        columns: Optional projection (subset of PATIENT_COLUMNS)
 
     Returns:
-        dict: Patient record with all fields, or None if not found
+        dict: Patient record with all (or the projected) fields, or None if not found
 
     Example:
         >>> get_patient("HA001")
         {'patient_id': 'HA001', 'name': 'Ramesh Singh', 'abha_number': '12-3456-7890-1234', ...}
     """
-    with get_db() as db:
-        # Use parameterized query to prevent SQL injection
-        query = text("SELECT * FROM patients WHERE patient_id = :pid")
+    # Use parameterized query to prevent SQL injection
+    cols = select_list(columns)
+    query = text(f"SELECT {cols} FROM patients WHERE patient_id = :pid")
+
+    # Execute query (on every shard in the sharded layout) and build the
+    # record dict directly from the row
+    for _, rows in shards.scatter(
+        lambda key, db: fetch_dicts(db, query, {"pid": patient_id})
+    ):
+        if rows:
+            return rows[0]
+
+    # Not found
+    return None
+
+
+def get_patients(patient_ids, columns=None) -> dict:
+    """
+    Get several patients by patient ID with one indexed query per shard.
+
+    Args:
+        patient_ids: Patient identifiers (e.g. ["HA001", "HB001"])
+        columns: Optional projection (subset of PATIENT_COLUMNS)
+
+    Returns:
+        dict: {patient_id: patient record} for the IDs that exist
+    """
+    patient_ids = list(dict.fromkeys(patient_ids))
+    if not patient_ids:
+        return {}
+    cols = select_list(columns, required=("patient_id",))
+    found = {}
+    for _, rows in shards.scatter(
+        lambda key, db: _fetch_in(db, cols, "patient_id", patient_ids)
+    ):
+        for row in rows:
+            found.setdefault(row["patient_id"], row)
+    return found
+
+
+def get_data_version() -> int:
+    """
+    Global data version, bumped by triggers on every patients/visits write.
+
+    A single-row primary-key lookup; used for search ETags and to detect
+    stale in-memory indexes.
+    """
+    return sum(version for _, version in _shard_data_versions())
+
+
+def _shard_data_versions(key: str = "data_version") -> list:
+    query = text("SELECT value FROM meta WHERE key = :key")
+
+    def read(shard, db):
+        row = db.execute(query, {"key": key}).first()
+        return row[0] if row else 0
+
+    return shards.scatter(read)
+
+
+def get_data_signature():
+    """
+    Fingerprint of the patient rows, used to detect stale indexes.
+
+    Based on meta.patients_version, which visit writes do not change (the
+    indexes hold no visit data).
+
+    Returns:
+        tuple: ((shard key, patients version), ...) - one entry per shard
+    """
+    return tuple(_shard_data_versions("patients_version"))
+
+
+def get_patient_version(patient_id: str):
+    """
+    Row version of one patient (bumped when the patient or its visits change).
+
+    Returns:
+        int | None: Version, or None if the patient does not exist
+    """
+    revision = get_patient_revision(patient_id)
+    return revision[2] if revision else None
+
+
+def get_patient_revision(patient_id: str):
+    """
+    Identity and version of one patient's row, for ETags.
+
+    The version restarts at 1 when a patient is deleted and re-inserted; the
+    row id does not (AUTOINCREMENT never reuses ids), so (hospital_id, id,
+    version) changes whenever the stored data may have.
+
+    Returns:
+        tuple | None: (hospital_id, id, version), or None if not found
+    """
+    query = text(
+        "SELECT hospital_id, id, version FROM patients WHERE patient_id = :pid"
+    )
+    for _, row in shards.scatter(
+        lambda key, db: db.execute(query, {"pid": patient_id}).first()
+    ):
+        if row:
+            return tuple(row)
+    return None
+
+
+def iter_patient_names():
+    """
+    Return (id, name, hospital_id) for every patient, in table order.
+
+    Used to build the in-memory name index without loading full records.
+    In the sharded layout ids are per shard; (hospital_id, id) is unique.
+    """
+    query = text("SELECT id, name, hospital_id FROM patients ORDER BY id")
+    rows = []
+    for _, shard_rows in shards.scatter(
+        lambda key, db: [tuple(row) for row in db.execute(query).all()]
+    ):
+        rows.extend(shard_rows)
+    return rows
+
+
+def iter_patient_names_after(last_ids: dict):
+    """
+    Return (id, name, hospital_id) of patients added after `last_ids`.
+
+    Args:
+        last_ids: {hospital_id: highest patients.id already seen}; ids are
+            per database file, so each shard is read from the highest id
+            seen among the hospitals it holds
+    """
+
+    def read(key, db):
+        seen = [i for h, i in last_ids.items() if key is None or h == key]
+        query = text(
+            "SELECT id, name, hospital_id FROM patients WHERE id > :last ORDER BY id"
+        )
+        return [tuple(row) for row in db.execute(query, {"last": max(seen or [0])})]
+
+    rows = []
+    for _, shard_rows in shards.scatter(read):
+        rows.extend(shard_rows)
+    return rows
+
+
+def count_patients() -> int:
+    """Total number of patients across all shards."""
+    query = text("SELECT COUNT(*) FROM patients")
+    return sum(
+        count for _, count in shards.scatter(lambda key, db: db.execute(query).scalar())
+    )
+
+
+def iter_patient_demographics():
+    """
+    Return (id, name, hospital_id, dob, gender, mobile, state) for every
+    patient, in table order (source of the columnar patient store).
+    """
+    query = text(
+        "SELECT id, name, hospital_id, dob, gender, mobile, state "
+        "FROM patients ORDER BY id"
+    )
+    rows = []
+    for _, shard_rows in shards.scatter(
+        lambda key, db: [tuple(row) for row in db.execute(query).all()]
+    ):
+        rows.extend(shard_rows)
+    return rows
+
+
+def get_identifiers_signature():
+    """
+    Per-shard meta.identifiers_version (bumped by patient deletes and
+    identifier updates, not by inserts; see the identifier Bloom filters).
+
+    Returns:
+        tuple: ((shard key, identifiers version), ...)
+    """
+    return tuple(_shard_data_versions("identifiers_version"))
+
+
+def iter_patient_identifiers(last_ids: dict = None):
+    """
+    Return (id, hospital_id, abha_number, aadhaar_number, mobile) for every
+    patient (source of the identifier Bloom filters).
+
+    Args:
+        last_ids: Optional {hospital_id: highest patients.id already seen};
+            only rows added after them are returned (as in
+            iter_patient_names_after)
+    """
+
+    def read(key, db):
+        seen = [i for h, i in (last_ids or {}).items() if key is None or h == key]
+        query = text(
+            "SELECT id, hospital_id, abha_number, aadhaar_number, mobile "
+            "FROM patients WHERE id > :last ORDER BY id"
+        )
+        return [tuple(row) for row in db.execute(query, {"last": max(seen or [0])})]
+
+    rows = []
+    for _, shard_rows in shards.scatter(read):
+        rows.extend(shard_rows)
+    return rows
+
+
+def iter_patient_records(columns) -> list:
+    """
+    Return every patient as a dict of `columns` (source of the Merkle
+    tree used for node reconciliation).
+    """
+    query = text(f"SELECT {select_list(columns)} FROM patients")
+    rows = []
+    for _, shard_rows in shards.scatter(lambda key, db: fetch_dicts(db, query)):
+        rows.extend(shard_rows)
+    return rows
+
+
+def _identifier_filter():
+    """
+    The identifier Bloom filters, or None if disabled or behind the data.
 
-        # Execute query and get first result
-        # mappings() converts Row objects to dict-like objects
-        result = db.execute(query, {"pid": patient_id}).mappings().first()
+    The index manager refreshes the filters with new patients when it
+    notices a write (every index_refresh_interval_s). Filters it marked
+    stale (deletes, identifier changes) are skipped until they have been
+    rebuilt: their signature lags behind the manager's.
+    """
+    if not settings.identifier_filter_enabled:
+        return None
+    from app.index import index_manager
 
-        # Convert to regular dict if found, otherwise return None
-        if result:
-            return dict(result)
+    filters = index_manager.get("identifiers")
+    if filters.signature != index_manager.signature:
         return None
+    return filters
+
+
+def _definitely_absent(filters, kind: str, key: str) -> bool:
+    """Whether `filters` (see _identifier_filter) rule out any patient with `key`."""
+    return filters is not None and not filters.might_contain(kind, key)
+
+
+def fetch_patients_by_row_ids(db, row_ids, cols="*"):
+    """
+    Load full patient records for a set of primary keys, in table order.
+
+    Args:
+        db: Open database session
+        row_ids: Iterable of patients.id values
+        cols: SELECT list (see select_list)
+
+    Returns:
+        list[dict]: Patient records ordered by id
+    """
+    row_ids = list(row_ids)
+    if not row_ids:
+        return []
+    # expanding=True renders one bound parameter per id: IN (?, ?, ...)
+    query = text(
+        f"SELECT {cols} FROM patients WHERE id IN :ids ORDER BY id"
+    ).bindparams(bindparam("ids", expanding=True))
+    return fetch_dicts(db, query, {"ids": row_ids})
 
 
 def search_patients(
@@ -95,164 +430,576 @@ def search_patients(
     aadhaar: str = None,
     phone: str = None,
     hospital_id: str = None,
+    columns=None,
+    gender: str = None,
+    birth_year: int = None,
+    year_window: int = None,
+    budget=None,
 ):
     """
     Search patients by name, ABHA (exact), Aadhaar (exact), or phone (exact).
+
+    `columns` optionally projects the SELECT list (subset of PATIENT_COLUMNS).
+    The primary key `id` is always selected so name-search results can be
+    merged and deduplicated; callers strip it if it was not requested.
+
+    Name searches can be narrowed by `gender` and `birth_year` (+/-
+    `year_window`, default settings.birth_year_window). The fuzzy fallback
+    then only scores patients passing these filters, selected with vectorized
+    comparisons over the columnar patient store.
+
+    `budget` (app.utils.budget.SearchBudget) bounds the fuzzy fallback:
+    candidates are scored in chunks of settings.fuzzy_chunk_size and scoring
+    stops once the budget is exhausted or cancelled, returning the best
+    matches so far with `budget.partial` set.
+
+    Identifier searches validate the ABHA/Aadhaar/phone value first and
+    return [] without a query when the identifier Bloom filter rules it out.
+
+    Raises:
+        ValueError: If `columns` contains an unknown column
+        ValidationException: If the searched identifier is malformed
     """
+    cols = select_list(columns, required=("id",))
     print(
         f"[DEBUG] search_patients called with: name={name}, abha={abha}, "
         f"aadhaar={aadhaar}, phone={phone}, hosp={hospital_id}"
     )
-    with get_db() as db:
-        results = []
+    if not (name or abha or aadhaar or phone):
+        # No search criteria provided
+        return []
 
-        # Priority 1: ABHA (Government ID) - Exact Match
-        if abha:
-            # Clean input
-            clean_abha = abha.replace("-", "").replace(" ", "").strip()
+    # Identifier search (same priority as _search_shard): reject malformed
+    # values, and answer definite misses from memory
+    for kind, value in (("abha", abha), ("aadhaar", aadhaar), ("phone", phone)):
+        if value:
+            key = validate_identifier(kind, value)
+            if _definitely_absent(_identifier_filter(), kind, key):
+                return []
+            break
 
-            # OPTIMIZATION: Try exact match first (Uses Index = Fast)
-            sql_fast = "SELECT * FROM patients WHERE abha_number = :val"
-            params = {"val": clean_abha}  # Try cleaned version first
+    # The name index is fetched here, not inside the per-shard workers
+    # (building it scatters over the shards itself)
+    indexes = {}
+    demographics = None
+    if name and not (abha or aadhaar or phone):
+        from app.index import index_manager
 
-            if hospital_id:
-                sql_fast += " AND hospital_id = :hosp"
-                params["hosp"] = hospital_id
+        indexes["names"] = index_manager.get("names")
+        if len(indexes["names"]) >= settings.candidate_index_min_names:
+            # Large corpus: only candidates from the n-gram TF-IDF shortlist and
+            # the SymSpell edit-distance index are scored with rapidfuzz
+            indexes["ngrams"] = index_manager.get("ngrams")
+            indexes["symspell"] = index_manager.get("symspell")
+        if gender or birth_year:
+            demographics = {
+                "gender": gender,
+                "birth_year": birth_year,
+                "year_window": (
+                    settings.birth_year_window if year_window is None else year_window
+                ),
+            }
+            indexes["patients"] = index_manager.get("patients")
 
-            query_fast = text(sql_fast)
-            results = db.execute(query_fast, params).mappings().all()
+    # Hospital-scoped searches touch one shard; the rest scatter to all
+    per_shard = shards.scatter(
+        lambda key, db: _search_shard(
+            db,
+            key,
+            name,
+            abha,
+            aadhaar,
+            phone,
+            hospital_id,
+            cols,
+            indexes=indexes,
+            demographics=demographics,
+            budget=budget,
+        ),
+        hospital_id=hospital_id,
+    )
 
-            # If no results, try formatted search (or if input had dashes)
-            # This handles cases where DB has dashes "12-34" but user searched "1234"
-            if not results:
-                # Fallback to REPLACEd query (Full Scan)
-                sql = (
-                    "SELECT * FROM patients WHERE "
-                    "REPLACE(REPLACE(abha_number, '-', ''), ' ', '') = :val"
-                )
-                if hospital_id:
-                    sql += " AND hospital_id = :hosp"
-                results = db.execute(text(sql), params).mappings().all()
+    # Merge: direct (SQL) matches of every shard before fuzzy candidates
+    results = [p for _, (direct, _fuzzy) in per_shard for p in direct]
+    results += [p for _, (_direct, fuzzy) in per_shard for p in fuzzy]
+    if indexes:
+        results = results[:10]  # Return top 10
+    return results
 
-        # Priority 2: Aadhaar (Government ID) - Exact Match
-        elif aadhaar:
-            # Clean input
-            clean_aadhaar = aadhaar.replace("-", "").replace(" ", "").strip()
 
-            # OPTIMIZATION: Try exact match first (Uses Index = Fast)
-            sql_fast = "SELECT * FROM patients WHERE aadhaar_number = :val"
-            params = {"val": clean_aadhaar}
+def _search_shard(
+    db,
+    shard_key,
+    name,
+    abha,
+    aadhaar,
+    phone,
+    hospital_id,
+    cols,
+    indexes=None,
+    demographics=None,
+    budget=None,
+):
+    """
+    Run search_patients' query logic on one shard.
 
-            if hospital_id:
-                sql_fast += " AND hospital_id = :hosp"
-                params["hosp"] = hospital_id
+    `indexes` holds the in-memory indexes fetched by search_patients for a
+    name search ("names", plus "ngrams"/"symspell" and "patients" when used).
 
-            results = db.execute(text(sql_fast), params).mappings().all()
+    Returns:
+        tuple: (direct SQL matches, fuzzy candidates)
+    """
+    results = []
+    fuzzy = []
+    # Hospital scope of the in-memory name index for this shard
+    scope = hospital_id or shard_key
 
-            if not results:
-                # Fallback (though Aadhaar is usually clean)
-                sql = (
-                    "SELECT * FROM patients WHERE "
-                    "REPLACE(REPLACE(aadhaar_number, '-', ''), ' ', '') = :val"
-                )
-                if hospital_id:
-                    sql += " AND hospital_id = :hosp"
-                results = db.execute(text(sql), params).mappings().all()
-
-        # Priority 3: Phone - Exact Match
-        elif phone:
-            # Clean the search phone (remove common prefixes and separators)
-            clean_phone = (
-                phone.replace("+91", "").replace("-", "").replace(" ", "").strip()
+    # Priority 1: ABHA (Government ID) - Exact Match
+    if abha:
+        # Clean input
+        clean_abha = abha.replace("-", "").replace(" ", "").strip()
+
+        # OPTIMIZATION: Try exact match first (Uses Index = Fast)
+        sql_fast = f"SELECT {cols} FROM patients WHERE abha_number = :val"
+        params = {"val": clean_abha}  # Try cleaned version first
+
+        if hospital_id:
+            sql_fast += " AND hospital_id = :hosp"
+            params["hosp"] = hospital_id
+
+        query_fast = text(sql_fast)
+        results = fetch_dicts(db, query_fast, params)
+
+        # If no results, try formatted search (or if input had dashes)
+        # This handles cases where DB has dashes "12-34" but user searched "1234"
+        if not results:
+            # Fallback to REPLACEd query (Full Scan)
+            sql = (
+                f"SELECT {cols} FROM patients WHERE "
+                "REPLACE(REPLACE(abha_number, '-', ''), ' ', '') = :val"
             )
-            # Try last 10 digits as exact match
-            last_10 = clean_phone[-10:] if len(clean_phone) >= 10 else clean_phone
+            if hospital_id:
+                sql += " AND hospital_id = :hosp"
+            results = fetch_dicts(db, text(sql), params)
+
+    # Priority 2: Aadhaar (Government ID) - Exact Match
+    elif aadhaar:
+        # Clean input
+        clean_aadhaar = aadhaar.replace("-", "").replace(" ", "").strip()
 
-            # OPTIMIZATION: Try exact match first
-            sql_fast = "SELECT * FROM patients WHERE mobile = :val"
-            params = {"val": last_10}
+        # OPTIMIZATION: Try exact match first (Uses Index = Fast)
+        sql_fast = f"SELECT {cols} FROM patients WHERE aadhaar_number = :val"
+        params = {"val": clean_aadhaar}
 
+        if hospital_id:
+            sql_fast += " AND hospital_id = :hosp"
+            params["hosp"] = hospital_id
+
+        results = fetch_dicts(db, text(sql_fast), params)
+
+        if not results:
+            # Fallback (though Aadhaar is usually clean)
+            sql = (
+                f"SELECT {cols} FROM patients WHERE "
+                "REPLACE(REPLACE(aadhaar_number, '-', ''), ' ', '') = :val"
+            )
             if hospital_id:
-                sql_fast += " AND hospital_id = :hosp"
-                params["hosp"] = hospital_id
+                sql += " AND hospital_id = :hosp"
+            results = fetch_dicts(db, text(sql), params)
+
+    # Priority 3: Phone - Exact Match
+    elif phone:
+        # Clean the search phone (remove common prefixes and separators)
+        clean_phone = phone.replace("+91", "").replace("-", "").replace(" ", "").strip()
+        # Try last 10 digits as exact match
+        last_10 = clean_phone[-10:] if len(clean_phone) >= 10 else clean_phone
+
+        # OPTIMIZATION: Try exact match first
+        sql_fast = f"SELECT {cols} FROM patients WHERE mobile = :val"
+        params = {"val": last_10}
 
-            results = db.execute(text(sql_fast), params).mappings().all()
-
-            if not results:
-                # Fallback to flexible search
-                # Phone search: Flexible match on last 10 digits (PRIORITY 2)
-                sql = """
-                    SELECT * FROM patients
-                    WHERE SUBSTR(
-                        REPLACE(REPLACE(REPLACE(mobile, '+91', ''), '-', ''), ' ', ''),
-                        -10
-                    ) = :p_phone
-                """
-                params = {"p_phone": last_10}
-                if hospital_id:
-                    sql += " AND hospital_id = :hosp"
-                    params["hosp"] = hospital_id
-                results = db.execute(text(sql), params).mappings().all()
-
-        elif name:
-            # 1. Exact/Partial Match (Standard SQL)
-            sql = "SELECT * FROM patients WHERE lower(name) LIKE :name"
-            params = {"name": f"%{name.lower()}%"}
+        if hospital_id:
+            sql_fast += " AND hospital_id = :hosp"
+            params["hosp"] = hospital_id
 
+        results = fetch_dicts(db, text(sql_fast), params)
+
+        if not results:
+            # Fallback to flexible search
+            # Phone search: Flexible match on last 10 digits (PRIORITY 2)
+            sql = f"""
+                SELECT {cols} FROM patients
+                WHERE SUBSTR(
+                    REPLACE(REPLACE(REPLACE(mobile, '+91', ''), '-', ''), ' ', ''),
+                    -10
+                ) = :p_phone
+            """
+            params = {"p_phone": last_10}
             if hospital_id:
                 sql += " AND hospital_id = :hosp"
                 params["hosp"] = hospital_id
+            results = fetch_dicts(db, text(sql), params)
+
+    elif name:
+        # 1. Exact/Partial Match (Standard SQL)
+        sql = f"SELECT {cols} FROM patients WHERE lower(name) LIKE :name"
+        params = {"name": f"%{name.lower()}%"}
+
+        if hospital_id:
+            sql += " AND hospital_id = :hosp"
+            params["hosp"] = hospital_id
+
+        if demographics and demographics["gender"]:
+            # Same rule as patient_store.gender_code: "Other" counts as "O"
+            sql += " AND upper(substr(gender, 1, 1)) = :gender"
+            params["gender"] = demographics["gender"][:1].upper()
+        if demographics and demographics["birth_year"]:
+            sql += (
+                " AND CAST(substr(dob, 1, 4) AS INTEGER)"
+                " BETWEEN :year_from AND :year_to"
+            )
+            params["year_from"] = (
+                demographics["birth_year"] - demographics["year_window"]
+            )
+            params["year_to"] = demographics["birth_year"] + demographics["year_window"]
 
-            query = text(sql + " LIMIT 20")
-            sql_results = [
-                dict(row) for row in db.execute(query, params).mappings().all()
-            ]
-
-            # 2. Fuzzy Match (Typo Resilience)
-            # If we don't have enough exact matches, find candidates using fuzzy similarity
-            if len(sql_results) < 5:
-                # Fetch all patients (or filtered by hospital)
-                all_sql = "SELECT * FROM patients"
-                all_params = {}
-                if hospital_id:
-                    all_sql += " WHERE hospital_id = :hosp"
-                    all_params["hosp"] = hospital_id
-
-                all_query = text(all_sql)
-                all_patients = [
-                    dict(row)
-                    for row in db.execute(all_query, all_params).mappings().all()
-                ]
-
-                # Extract names for comparison
-                names_map = {p["id"]: p["name"] for p in all_patients}
-
-                # Find top fuzzy matches
-                fuzzy_results = process.extract(
+        query = text(sql + " LIMIT 20")
+        sql_results = fetch_dicts(db, query, params)
+
+        # 2. Fuzzy Match (Typo Resilience)
+        # If we don't have enough exact matches, find candidates using fuzzy similarity
+        if len(sql_results) < 5:
+            # Score names from the in-memory index instead of re-reading
+            # every patient row (or every row of the hospital)
+            name_index = indexes["names"]
+            allowed = None
+            if demographics:
+                # Vectorized demographic pre-filter before any fuzzy scoring
+                patient_store = indexes["patients"]
+                positions = patient_store.filter(hospital_id=scope, **demographics)
+                allowed = patient_store.row_ids[positions]
+
+            if "ngrams" in indexes:
+                # Only the n-gram shortlist plus every name within edit
+                # distance 2 of the query tokens is scored with rapidfuzz
+                names_map = indexes["ngrams"].shortlist(
                     name,
-                    names_map.values(),
-                    scorer=fuzz.ratio,
-                    limit=10,
-                    score_cutoff=70,
+                    settings.ngram_shortlist_size,
+                    hospital_id=scope,
+                    row_ids=allowed,
                 )
+                names_map.update(
+                    indexes["symspell"].candidates(
+                        name, hospital_id=scope, row_ids=allowed
+                    )
+                )
+            elif allowed is not None:
+                names_map = patient_store.names_by_row_id(positions)
+            else:
+                names_map = name_index.names_by_row_id(scope)
+
+            # Find top fuzzy matches (within the time budget)
+            fuzzy_results = _extract_within_budget(name, names_map, budget)
+
+            # Every row carrying a matched name
+            matched_names = {res[0] for res in fuzzy_results}
+            candidate_ids = {
+                row_id
+                for row_id, candidate in names_map.items()
+                if candidate in matched_names
+            }
+
+            # Deduplicate and merge (in table order)
+            for p in fetch_patients_by_row_ids(db, candidate_ids, cols):
+                if p not in sql_results:
+                    fuzzy.append(p)
+
+        results = sql_results
 
-                # Deduplicate and merge
-                matched_names = [res[0] for res in fuzzy_results]
-                for p in all_patients:
-                    if p["name"] in matched_names and p not in sql_results:
-                        sql_results.append(p)
+    # Rows are already plain mutable dicts (see fetch_dicts); no second copy
+    return results, fuzzy
 
-            results = sql_results[:10]  # Return top 10
 
+# Batch search: identifier type -> patients column
+IDENTIFIER_COLUMNS = {
+    "abha": "abha_number",
+    "aadhaar": "aadhaar_number",
+    "phone": "mobile",
+}
+# The same normalization as the REPLACE(...) fallbacks of _search_shard
+_NORMALIZED_SQL = {
+    "abha": "REPLACE(REPLACE(abha_number, '-', ''), ' ', '')",
+    "aadhaar": "REPLACE(REPLACE(aadhaar_number, '-', ''), ' ', '')",
+    "phone": (
+        "SUBSTR(REPLACE(REPLACE(REPLACE(mobile, '+91', ''), '-', ''), ' ', ''), -10)"
+    ),
+}
+
+
+def search_patients_batch(queries: list, columns=None, budget=None) -> dict:
+    """
+    Run many searches in one pass over the database.
+
+    Each query is a dict with an "id" and the search_patients criteria
+    (name, abha, aadhaar or phone, same priority; hospital_id, gender and
+    birth_year/year_window only narrow name queries). Identifier queries
+    are grouped into one IN (...) query per identifier type. Name queries
+    are answered from the in-memory name index (substring matches first,
+    then fuzzy candidates, top 10 like search_patients), and all their
+    rows are loaded with one query.
+
+    `budget` (app.utils.budget.SearchBudget) is shared by the whole batch:
+    once it runs out, the remaining name queries get their substring
+    matches only and `budget.partial` is set.
+
+    Returns:
+        dict: {query id: [patients]}, one entry per query (empty if no match)
+
+    Identifier values are validated, and values the identifier Bloom filter
+    rules out are not queried.
+
+    Raises:
+        ValueError: If `columns` contains an unknown column
+        ValidationException: If a query's identifier is malformed
+    """
+    cols = select_list(columns, required=("id", *IDENTIFIER_COLUMNS.values()))
+
+    # identifier type -> {normalized value: [query ids]}
+    lookups = {kind: {} for kind in IDENTIFIER_COLUMNS}
+    name_queries = []
+    filters = None
+    if any(query.get(kind) for query in queries for kind in IDENTIFIER_COLUMNS):
+        filters = _identifier_filter()
+    for query in queries:
+        for kind in IDENTIFIER_COLUMNS:
+            if query.get(kind):
+                key = validate_identifier(kind, query[kind])
+                if not _definitely_absent(filters, kind, key):
+                    lookups[kind].setdefault(key, []).append(query["id"])
+                break
         else:
-            # No search criteria provided
-            return []
+            if query.get("name"):
+                name_queries.append(query)
+
+    # query id -> demographic filters, as search_patients builds them
+    demographics = {}
+    for query in name_queries:
+        if query.get("gender") or query.get("birth_year"):
+            year_window = query.get("year_window")
+            demographics[query["id"]] = {
+                "gender": (query.get("gender") or "").upper() or None,
+                "birth_year": query.get("birth_year"),
+                "year_window": (
+                    settings.birth_year_window if year_window is None else year_window
+                ),
+            }
 
-        # Convert all results to regular mutable dicts to allow adding fields later
-        return [dict(row) for row in results]
+    indexes = {}
+    if name_queries:
+        from app.index import index_manager
 
+        indexes["names"] = index_manager.get("names")
+        if len(indexes["names"]) >= settings.candidate_index_min_names:
+            indexes["ngrams"] = index_manager.get("ngrams")
+            indexes["symspell"] = index_manager.get("symspell")
+        if demographics:
+            indexes["patients"] = index_manager.get("patients")
+
+    per_shard = shards.scatter(
+        lambda key, db: _search_shard_batch(
+            db,
+            key,
+            lookups,
+            name_queries,
+            cols,
+            indexes,
+            demographics=demographics,
+            budget=budget,
+        )
+    )
 
-def get_patient_visits(patient_id: str):
+    results = {query["id"]: [] for query in queries}
+    for _, (identifier_hits, _name_hits) in per_shard:
+        for query_id, rows in identifier_hits.items():
+            results[query_id].extend(rows)
+    # Name queries: direct matches of every shard before fuzzy candidates
+    for query in name_queries:
+        hits = [name_hits.get(query["id"], ([], [])) for _, (_, name_hits) in per_shard]
+        rows = [p for direct, _fuzzy in hits for p in direct]
+        rows += [p for _direct, fuzzy in hits for p in fuzzy]
+        results[query["id"]] = rows[:10]
+    return results
+
+
+def _search_shard_batch(
+    db, shard_key, lookups, name_queries, cols, indexes, demographics=None, budget=None
+):
+    """
+    Run search_patients_batch's queries on one shard.
+
+    `demographics` maps query ids to their gender/birth year filters; those
+    queries only match patients passing them (see _search_shard).
+
+    Returns:
+        tuple: ({query id: identifier matches},
+                {query id: (direct name matches, fuzzy candidates)})
+    """
+    identifier_hits = {}
+    for kind, wanted in lookups.items():
+        if not wanted:
+            continue
+        column = IDENTIFIER_COLUMNS[kind]
+        rows = _fetch_in(db, cols, column, list(wanted))
+        # Values stored with separators: normalized comparison (full scan)
+        found = {identifier_key(kind, row[column] or "") for row in rows}
+        missing = [key for key in wanted if key not in found]
+        if missing:
+            rows += _fetch_in(db, cols, _NORMALIZED_SQL[kind], missing)
+        for row in rows:
+            for query_id in wanted.get(identifier_key(kind, row[column] or ""), ()):
+                identifier_hits.setdefault(query_id, []).append(row)
+
+    name_ids = {}
+    lowered_by_scope = {}
+    for query in name_queries:
+        hospital_id = query.get("hospital_id")
+        if shards.layout == SHARDED and hospital_id and hospital_id != shard_key:
+            continue
+        scope = hospital_id or shard_key
+        name = query["name"]
+        allowed = None
+        if demographics and query["id"] in demographics:
+            # Vectorized demographic pre-filter before any matching
+            patient_store = indexes["patients"]
+            positions = patient_store.filter(
+                hospital_id=scope, **demographics[query["id"]]
+            )
+            allowed = patient_store.row_ids[positions]
+        if "ngrams" in indexes:
+            names_map = indexes["ngrams"].shortlist(
+                name, settings.ngram_shortlist_size, hospital_id=scope, row_ids=allowed
+            )
+            names_map.update(
+                indexes["symspell"].candidates(name, hospital_id=scope, row_ids=allowed)
+            )
+            lowered = {row_id: n.lower() for row_id, n in names_map.items()}
+        elif allowed is not None:
+            names_map = patient_store.names_by_row_id(positions)
+            lowered = {row_id: n.lower() for row_id, n in names_map.items()}
+        else:
+            # One name map per hospital scope, shared by all name queries
+            if scope not in lowered_by_scope:
+                names_map = indexes["names"].names_by_row_id(scope)
+                lowered = {row_id: n.lower() for row_id, n in names_map.items()}
+                lowered_by_scope[scope] = (names_map, lowered)
+            names_map, lowered = lowered_by_scope[scope]
+
+        # Substring match (as the SQL LIKE of search_patients), table order
+        needle = name.lower()
+        direct = sorted(row_id for row_id, n in lowered.items() if needle in n)[:20]
+        fuzzy = set()
+        if len(direct) < 5:
+            matched = {r[0] for r in _extract_within_budget(name, names_map, budget)}
+            fuzzy = {row_id for row_id, n in names_map.items() if n in matched}
+            fuzzy.difference_update(direct)
+        name_ids[query["id"]] = (direct, sorted(fuzzy))
+
+    # One query loads the rows of every name query
+    all_ids = {
+        row_id for direct, fuzzy in name_ids.values() for row_id in direct + fuzzy
+    }
+    rows_by_id = {p["id"]: p for p in fetch_patients_by_row_ids(db, all_ids, cols)}
+    name_hits = {
+        query_id: (
+            [rows_by_id[r] for r in direct if r in rows_by_id],
+            [rows_by_id[r] for r in fuzzy if r in rows_by_id],
+        )
+        for query_id, (direct, fuzzy) in name_ids.items()
+    }
+    return identifier_hits, name_hits
+
+
+def _fetch_in(db, cols, expression, values, table="patients") -> list:
+    """Rows whose `expression` (a column or SQL expression) is in `values`."""
+    query = text(
+        f"SELECT {cols} FROM {table} WHERE {expression} IN :vals ORDER BY id"
+    ).bindparams(bindparam("vals", expanding=True))
+    return fetch_dicts(db, query, {"vals": values})
+
+
+def _extract_within_budget(name, names_map, budget, limit=10, score_cutoff=70):
+    """
+    rapidfuzz process.extract over `names_map`, scored chunk by chunk.
+
+    Same result as one process.extract call unless `budget` runs out first;
+    then the best matches of the chunks scored so far are returned and
+    `budget.partial` is set.
+    """
+    # Imported lazily: rapidfuzz is only needed on the fuzzy path
+    from rapidfuzz import process, fuzz
+
+    best = []
+    items = iter(names_map.items())
+    while True:
+        chunk = dict(islice(items, settings.fuzzy_chunk_size))
+        if not chunk:
+            break
+        if budget is not None and budget.exhausted():
+            budget.partial = True
+            break
+        best += process.extract(
+            name, chunk, scorer=fuzz.ratio, limit=limit, score_cutoff=score_cutoff
+        )
+        # Stable sort: ties keep names_map order, as in a single extract call
+        best = sorted(best, key=lambda result: -result[1])[:limit]
+    return best
+
+
+def get_changes(since: int = 0, limit: int = 500, hospital_id: str = None):
+    """
+    Read the change log (see migrations.add_change_log) after `since`.
+
+    Each change carries the current record (None once it has been
+    deleted), loaded with one query per table for the whole page.
+
+    In the sharded layout every hospital file has its own sequence, so
+    `hospital_id` selects the shard; in the single layout it filters the
+    one global sequence.
+
+    Returns:
+        tuple: (changes in seq order, whether more changes follow)
+
+    Raises:
+        ValueError: In the sharded layout without a known hospital_id
+    """
+    sql = "SELECT seq, table_name, record_id, op, hospital_id, changed_at FROM changes"
+    sql += " WHERE seq > :since"
+    params = {"since": since, "limit": limit + 1}
+    if hospital_id:
+        sql += " AND hospital_id = :hosp"
+        params["hosp"] = hospital_id
+    query = text(sql + " ORDER BY seq LIMIT :limit")
+
+    with shards.session(hospital_id) as db:
+        changes = fetch_dicts(db, query, params)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        records = {}
+        for table, key in (("patients", "patient_id"), ("visits", "visit_id")):
+            ids = list({c["record_id"] for c in changes if c["table_name"] == table})
+            if ids:
+                records[table] = {
+                    row[key]: row for row in _fetch_in(db, "*", key, ids, table)
+                }
+    for change in changes:
+        change["record"] = records.get(change["table_name"], {}).get(
+            change["record_id"]
+        )
+    return changes, has_more
+
+
+def get_patient_visits(patient_id: str, columns=None):
     """
     Get all visit records for a specific patient.
 
@@ -261,6 +1008,7 @@ def get_patient_visits(patient_id: str):
 
     Args:
         patient_id: Unique patient identifier (e.g., "HA001")
+        columns: Optional projection (subset of VISIT_COLUMNS)
 
     Returns:
         list[dict]: List of visit records, newest first
@@ -272,17 +1020,19 @@ def get_patient_visits(patient_id: str):
             {'visit_id': 'VA001', 'patient_id': 'HA001', 'admission_date': '2025-10-15', ...}
         ]
     """
-    with get_db() as db:
-        # Query all visits for this patient
-        # ORDER BY admission_date DESC: Most recent visits first
-        query = text(
-            """
-            SELECT * FROM visits
-            WHERE patient_id = :pid
-            ORDER BY admission_date DESC
-        """
-        )
+    # Query all visits for this patient
+    # ORDER BY admission_date DESC: Most recent visits first
+    cols = select_list(columns, allowed=VISIT_COLUMNS)
+    query = text(f"""
+        SELECT {cols} FROM visits
+        WHERE patient_id = :pid
+        ORDER BY admission_date DESC
+    """)
 
-        # Execute and convert results
-        results = db.execute(query, {"pid": patient_id}).mappings().all()
-        return [dict(row) for row in results]
+    # Execute and convert results (visits live in the patient's shard)
+    visits = []
+    for _, rows in shards.scatter(
+        lambda key, db: fetch_dicts(db, query, {"pid": patient_id})
+    ):
+        visits.extend(rows)
+    return visits
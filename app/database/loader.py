@@ -11,32 +11,40 @@ Features:
 - Summary statistics
 """
 
-import pandas as pd  # For CSV file reading and data manipulation
 import sqlite3  # SQLite database operations
 import os  # File system operations
 
+from app.config import settings
+from app.database.migrations import apply_migrations
+from app.database.shards import SHARDED, ShardSet
+
 # Database file path (relative to project root)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DB_PATH = os.path.join(BASE_DIR, "praisa_demo.db")
+# Per-hospital files for the sharded layout (see shards.py)
+SHARD_DIR = os.path.join(BASE_DIR, settings.shard_dir)
 
 
-def get_db_connection():
+def get_db_connection(db_path=None):
     """
     Create and return a SQLite database connection.
 
     Configures the connection to return rows as dictionaries
     instead of tuples for easier data access.
 
+    Args:
+        db_path: Database file (defaults to DB_PATH)
+
     Returns:
         sqlite3.Connection: Database connection with Row factory
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path or DB_PATH)
     # Row factory allows accessing columns by name (dict-like)
     conn.row_factory = sqlite3.Row
     return conn
 
 
-def load_patients_from_csv(csv_path, hospital_id):
+def load_patients_from_csv(csv_path, hospital_id, db_path=None):
     """
     Load patient data from CSV file into database.
 
@@ -46,6 +54,7 @@ def load_patients_from_csv(csv_path, hospital_id):
     Args:
         csv_path: Path to CSV file (e.g., "data/hospital_a_patients.csv")
         hospital_id: Hospital identifier (e.g., "hospital_a" or "hospital_b")
+        db_path: Database file to load into (defaults to DB_PATH)
 
     Returns:
         int: Number of patients successfully loaded
@@ -59,10 +68,12 @@ def load_patients_from_csv(csv_path, hospital_id):
         return 0
 
     # Establish database connection
-    conn = get_db_connection()
+    conn = get_db_connection(db_path)
     cursor = conn.cursor()
 
-    # Read CSV file into pandas DataFrame
+    # Read CSV file into pandas DataFrame (imported lazily; pandas is slow to load)
+    import pandas as pd
+
     df = pd.read_csv(csv_path)
     count = 0  # Track number of patients loaded
 
@@ -118,7 +129,7 @@ def load_patients_from_csv(csv_path, hospital_id):
     return count
 
 
-def load_visits_from_csv(csv_path):
+def load_visits_from_csv(csv_path, db_path=None):
     """
     Load visit data from CSV file into database.
 
@@ -127,6 +138,7 @@ def load_visits_from_csv(csv_path):
 
     Args:
         csv_path: Path to CSV file (e.g., "data/hospital_a_visits.csv")
+        db_path: Database file to load into (defaults to DB_PATH)
 
     Returns:
         int: Number of visits successfully loaded
@@ -140,10 +152,12 @@ def load_visits_from_csv(csv_path):
         return 0
 
     # Establish database connection
-    conn = get_db_connection()
+    conn = get_db_connection(db_path)
     cursor = conn.cursor()
 
-    # Read CSV file into pandas DataFrame
+    # Read CSV file into pandas DataFrame (imported lazily; pandas is slow to load)
+    import pandas as pd
+
     df = pd.read_csv(csv_path)
     count = 0  # Track number of visits loaded
 
@@ -192,7 +206,7 @@ def load_visits_from_csv(csv_path):
     return count
 
 
-def init_db():
+def init_db(db_path=None):
     """
     Initialize the database schema.
 
@@ -204,16 +218,25 @@ def init_db():
     - visits table (medical visit records)
     - Indexes for performance
     - Foreign key constraints
+    - Migrations from migrations.py (also applied to existing databases)
+
+    Args:
+        db_path: Database file to create (defaults to DB_PATH)
     """
-    # Check if database already exists
-    if os.path.exists(DB_PATH):
-        print(f"Database {DB_PATH} already exists.")
+    db_path = db_path or DB_PATH
+
+    # Check if database already exists (only pending migrations are applied)
+    if os.path.exists(db_path):
+        print(f"Database {db_path} already exists.")
+        conn = sqlite3.connect(db_path)
+        apply_migrations(conn)
+        conn.close()
         return
 
     print("Initializing database...")
     try:
         # Create new database connection
-        conn = sqlite3.connect(DB_PATH)
+        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
         # Read and execute SQL schema file
@@ -222,6 +245,9 @@ def init_db():
             schema = f.read()
             cursor.executescript(schema)  # Execute all SQL statements
 
+        # Bring the base schema up to date (row versions, triggers, ...)
+        apply_migrations(conn)
+
         # Commit changes and close connection
         conn.commit()
         conn.close()
@@ -231,7 +257,7 @@ def init_db():
         print(f"Error initializing database: {e}")
 
 
-def load_all_data():
+def load_all_data(layout=None, data_dir=None, shard_dir=None):
     """
     Main function to load all data into database.
 
@@ -241,11 +267,31 @@ def load_all_data():
     3. Load visits from both hospitals
     4. Display summary statistics
 
+    In the sharded layout each hospital's CSVs go into that hospital's own
+    file (data/hospital_a_*.csv -> shards/hospital_a.db).
+
     This function is idempotent - safe to run multiple times.
     Duplicates are automatically skipped.
+
+    Args:
+        layout: "single" or "sharded" (defaults to settings.database_layout)
+        data_dir: Directory with the hospital CSVs (defaults to data/)
+        shard_dir: Shard directory (defaults to SHARD_DIR)
     """
-    # Step 1: Initialize database schema
-    init_db()
+    layout = layout or settings.database_layout
+    data_dir = data_dir or os.path.join(BASE_DIR, "data")
+    shard_dir = shard_dir or SHARD_DIR
+
+    def db_path_for(hospital_id):
+        if layout == SHARDED:
+            return ShardSet.shard_path(shard_dir, hospital_id)
+        return DB_PATH
+
+    # Step 1: Initialize database schema (shards are created per hospital)
+    if layout == SHARDED:
+        os.makedirs(shard_dir, exist_ok=True)
+    else:
+        init_db()
 
     print("Starting data load...")
 
@@ -253,20 +299,25 @@ def load_all_data():
     import glob
 
     # Load all patients
-    patient_files = glob.glob(os.path.join(BASE_DIR, "data", "hospital_*_patients.csv"))
+    patient_files = glob.glob(os.path.join(data_dir, "hospital_*_patients.csv"))
     total_patients = 0
     for p_file in patient_files:
         # Extract hospital_id from filename (e.g., data/hospital_a_patients.csv -> hospital_a)
         hospital_id = os.path.basename(p_file).replace("_patients.csv", "")
-        count = load_patients_from_csv(p_file, hospital_id)
+        if layout == SHARDED:
+            init_db(db_path_for(hospital_id))
+        count = load_patients_from_csv(p_file, hospital_id, db_path_for(hospital_id))
         total_patients += count
         print(f"Loaded {count} patients for {hospital_id}")
 
-    # Load all visits
-    visit_files = glob.glob(os.path.join(BASE_DIR, "data", "hospital_*_visits.csv"))
+    # Load all visits (into the shard of the hospital named in the filename)
+    visit_files = glob.glob(os.path.join(data_dir, "hospital_*_visits.csv"))
     total_visits = 0
     for v_file in visit_files:
-        count = load_visits_from_csv(v_file)
+        hospital_id = os.path.basename(v_file).replace("_visits.csv", "")
+        if layout == SHARDED:
+            init_db(db_path_for(hospital_id))
+        count = load_visits_from_csv(v_file, db_path_for(hospital_id))
         total_visits += count
         print(f"Loaded {count} visits from {os.path.basename(v_file)}")
 
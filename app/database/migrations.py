@@ -0,0 +1,257 @@
+"""
+Schema Migrations for PRAISA
+
+`schema.sql` holds the base schema. Later additions live here as an
+ordered list of migrations, tracked with SQLite's `PRAGMA user_version`,
+so existing demo databases are upgraded in place on first use.
+
+Each migration is a function taking a sqlite3 connection. All pending
+migrations run in one `BEGIN IMMEDIATE` transaction (so concurrent workers
+serialize on it) and `user_version` records the last one applied.
+"""
+
+import sqlite3
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def add_row_versions(conn: sqlite3.Connection):
+    """
+    Migration 1: per-patient row version and a global data version.
+
+    - patients.version is bumped on every update of the patient row and on
+      every insert/update/delete of one of its visits (the history changes)
+    - meta.data_version is bumped on any patients/visits write
+    Both are maintained by triggers, so every writer (API, loader, manual
+    SQL) keeps them current.
+    """
+    if "version" not in _columns(conn, "patients"):
+        conn.execute(
+            "ALTER TABLE patients ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+        )
+    statements = [
+        """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_patients_version
+        AFTER UPDATE ON patients WHEN NEW.version = OLD.version
+        BEGIN
+            UPDATE patients SET version = OLD.version + 1 WHERE id = NEW.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_visits_insert_version
+        AFTER INSERT ON visits
+        BEGIN
+            UPDATE patients SET version = version + 1
+            WHERE patient_id = NEW.patient_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_visits_update_version
+        AFTER UPDATE ON visits
+        BEGIN
+            UPDATE patients SET version = version + 1
+            WHERE patient_id IN (OLD.patient_id, NEW.patient_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_visits_delete_version
+        AFTER DELETE ON visits
+        BEGIN
+            UPDATE patients SET version = version + 1
+            WHERE patient_id = OLD.patient_id;
+        END
+        """,
+    ]
+    for statement in statements:
+        conn.execute(statement)
+    for table in ("patients", "visits"):
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_data_version
+                AFTER {op} ON {table}
+                BEGIN
+                    UPDATE meta SET value = value + 1 WHERE key = 'data_version';
+                END
+                """)
+
+
+def add_change_log(conn: sqlite3.Connection):
+    """
+    Migration 2: change log for incremental downstream sync.
+
+    Every patients/visits write appends a row to `changes` with a
+    monotonically increasing `seq` (patient updates are logged once per
+    version bump, so a visit write also logs its patient). Existing rows are
+    backfilled as inserts, so reading from seq 0 is a full sync.
+    """
+    statements = [
+        """
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            record_id TEXT NOT NULL,
+            op TEXT NOT NULL,
+            hospital_id TEXT,
+            changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        INSERT INTO changes (table_name, record_id, op, hospital_id)
+        SELECT 'patients', patient_id, 'insert', hospital_id
+        FROM patients ORDER BY id
+        """,
+        """
+        INSERT INTO changes (table_name, record_id, op, hospital_id)
+        SELECT 'visits', v.visit_id, 'insert', p.hospital_id
+        FROM visits v LEFT JOIN patients p ON p.patient_id = v.patient_id
+        ORDER BY v.id
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_patients_insert_change
+        AFTER INSERT ON patients
+        BEGIN
+            INSERT INTO changes (table_name, record_id, op, hospital_id)
+            VALUES ('patients', NEW.patient_id, 'insert', NEW.hospital_id);
+        END
+        """,
+        # The version trigger re-updates the row: log only the bumped update
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_patients_update_change
+        AFTER UPDATE ON patients WHEN NEW.version != OLD.version
+        BEGIN
+            INSERT INTO changes (table_name, record_id, op, hospital_id)
+            SELECT 'patients', OLD.patient_id, 'delete', OLD.hospital_id
+            WHERE NEW.patient_id != OLD.patient_id;
+            INSERT INTO changes (table_name, record_id, op, hospital_id)
+            VALUES ('patients', NEW.patient_id, 'update', NEW.hospital_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_patients_delete_change
+        AFTER DELETE ON patients
+        BEGIN
+            INSERT INTO changes (table_name, record_id, op, hospital_id)
+            VALUES ('patients', OLD.patient_id, 'delete', OLD.hospital_id);
+        END
+        """,
+    ]
+    for op, row in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+        statements.append(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_visits_{op}_change
+            AFTER {op.upper()} ON visits
+            BEGIN
+                INSERT INTO changes (table_name, record_id, op, hospital_id)
+                VALUES (
+                    'visits', {row}.visit_id, '{op}',
+                    (SELECT hospital_id FROM patients
+                     WHERE patient_id = {row}.patient_id)
+                );
+            END
+            """)
+    for statement in statements:
+        conn.execute(statement)
+
+
+def add_patients_version(conn: sqlite3.Connection):
+    """
+    Migration 3: meta.patients_version, bumped only by patient content writes.
+
+    In-memory indexes hold patient rows only, so they must not be rebuilt
+    on every visit write. meta.data_version cannot tell the two apart:
+    visit writes bump patients.version, which is itself a patients UPDATE.
+    These triggers ignore UPDATEs that set only the version column.
+    """
+    content = [c for c in _columns(conn, "patients") if c not in ("id", "version")]
+    conn.execute(
+        "INSERT OR IGNORE INTO meta (key, value) "
+        "SELECT 'patients_version', value FROM meta WHERE key = 'data_version'"
+    )
+    events = {
+        "insert": "AFTER INSERT ON patients",
+        "delete": "AFTER DELETE ON patients",
+        "update": f"AFTER UPDATE OF {', '.join(sorted(content))} ON patients",
+    }
+    for op, event in events.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_patients_{op}_patients_version
+            {event}
+            BEGIN
+                UPDATE meta SET value = value + 1 WHERE key = 'patients_version';
+            END
+            """)
+
+
+def add_identifiers_version(conn: sqlite3.Connection):
+    """
+    Migration 4: meta.identifiers_version, bumped when identifiers may vanish.
+
+    The identifier Bloom filters add new patients incrementally, but cannot
+    remove values: deleting a patient or changing its ABHA, Aadhaar or
+    mobile number needs a full rebuild. Inserts do not bump this counter.
+    """
+    conn.execute(
+        "INSERT OR IGNORE INTO meta (key, value) VALUES ('identifiers_version', 0)"
+    )
+    events = {
+        "delete": "AFTER DELETE ON patients",
+        "update": ("AFTER UPDATE OF abha_number, aadhaar_number, mobile ON patients"),
+    }
+    for op, event in events.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_patients_{op}_identifiers_version
+            {event}
+            BEGIN
+                UPDATE meta SET value = value + 1 WHERE key = 'identifiers_version';
+            END
+            """)
+
+
+# Ordered list: position + 1 is the schema version after the migration
+MIGRATIONS = [
+    add_row_versions,
+    add_change_log,
+    add_patients_version,
+    add_identifiers_version,
+]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Apply all pending migrations to an open sqlite3 connection.
+
+    Safe to call repeatedly (and from several processes): already-applied
+    migrations are skipped based on `PRAGMA user_version`.
+
+    Returns:
+        int: Schema version after migrating
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+        return len(MIGRATIONS)
+
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None  # explicit transaction control
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-read under the write lock: another process may have migrated
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            for version, migration in enumerate(MIGRATIONS, start=1):
+                if version > current:
+                    migration(conn)
+                    conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+    return len(MIGRATIONS)
@@ -1,3 +1,6 @@
+-- Base schema. Later additions (row versions, triggers, ...) are applied
+-- by app/database/migrations.py, tracked with PRAGMA user_version.
+
 -- Create patients table
 CREATE TABLE IF NOT EXISTS patients (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -0,0 +1,203 @@
+"""
+Database Shards for PRAISA
+
+Two storage layouts are supported (setting DATABASE_LAYOUT):
+
+- "single":  every hospital in one file, praisa_demo.db (the default)
+- "sharded": one SQLite file per hospital_id in SHARD_DIR, e.g.
+             shards/hospital_a.db, shards/hospital_b.db
+
+In the sharded layout a hospital-scoped query touches only that hospital's
+file, and cross-hospital queries are scattered to all shards in parallel
+threads and merged by the caller. Each shard runs in WAL mode with its own
+lock, so a bulk load into one hospital never blocks readers of the others.
+
+The single layout is represented as a ShardSet with one shard (key None),
+so the query functions in db.py work the same way for both layouts.
+"""
+
+import glob
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.migrations import apply_migrations
+
+SINGLE = "single"
+SHARDED = "sharded"
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: readers never block on a writer of the same shard
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+class Shard:
+    """
+    One SQLite database file with its own engine and session factory.
+
+    Attributes:
+        key: hospital_id of the shard (None for the single-file layout)
+        path: Database file path
+    """
+
+    def __init__(self, key, path: str, wal: bool = True):
+        self.key = key
+        self.path = path
+        # check_same_thread=False: sessions are used from FastAPI/scatter threads
+        self.engine = create_engine(
+            f"sqlite:///{path}", connect_args={"check_same_thread": False}
+        )
+        if wal:
+            event.listen(self.engine, "connect", _set_sqlite_pragmas)
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine
+        )
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def ensure_schema(self):
+        """
+        Apply pending schema migrations (see migrations.py) once per process.
+
+        Skipped when the database has no patients table yet (the loader
+        creates it and migrates right after).
+        """
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            raw = self.engine.raw_connection()
+            try:
+                conn = raw.driver_connection
+                has_patients = conn.execute(
+                    "SELECT 1 FROM sqlite_master "
+                    "WHERE type = 'table' AND name = 'patients'"
+                ).fetchone()
+                if has_patients:
+                    apply_migrations(conn)
+            finally:
+                raw.close()
+            self._schema_ready = True
+
+    @contextmanager
+    def session(self):
+        """Yield a SQLAlchemy session on this shard, always closed afterwards."""
+        self.ensure_schema()  # No-op after the first call
+        db = self.SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+class ShardSet:
+    """
+    The set of shards queries are routed to.
+
+    Example:
+        >>> shards = ShardSet.sharded("/srv/praisa/shards")
+        >>> shards.scatter(lambda key, db: count_rows(db))  # all hospitals
+        >>> shards.scatter(lambda key, db: ..., hospital_id="hospital_a")  # one
+    """
+
+    def __init__(self, layout: str, shards=(), shard_dir: str = None, workers=8):
+        self.layout = layout
+        self.shard_dir = shard_dir
+        self._shards = {shard.key: shard for shard in shards}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="praisa-shard"
+        )
+
+    @classmethod
+    def single(cls, path: str, workers: int = 8):
+        """One database file holding every hospital."""
+        return cls(SINGLE, [Shard(None, path, wal=False)], workers=workers)
+
+    @classmethod
+    def sharded(cls, shard_dir: str, workers: int = 8):
+        """One database file per hospital_id in `shard_dir`."""
+        shard_set = cls(SHARDED, shard_dir=shard_dir, workers=workers)
+        shard_set.refresh()
+        return shard_set
+
+    @staticmethod
+    def shard_path(shard_dir: str, hospital_id: str) -> str:
+        """File path of a hospital's shard (e.g. shards/hospital_a.db)."""
+        return os.path.join(shard_dir, f"{hospital_id}.db")
+
+    def refresh(self):
+        """Pick up shard files created since the last scan (sharded layout)."""
+        if self.layout != SHARDED:
+            return
+        with self._lock:
+            for path in sorted(glob.glob(os.path.join(self.shard_dir, "*.db"))):
+                key = os.path.splitext(os.path.basename(path))[0]
+                if key not in self._shards:
+                    self._shards[key] = Shard(key, path)
+
+    def keys(self, hospital_id: str = None) -> list:
+        """
+        Shard keys a query must touch.
+
+        Single layout: always the one shard. Sharded layout: the hospital's
+        shard when `hospital_id` is given (none if it has no file), else all.
+        """
+        if self.layout != SHARDED:
+            return [None]
+        if hospital_id:
+            if hospital_id not in self._shards:
+                self.refresh()
+            return [hospital_id] if hospital_id in self._shards else []
+        return list(self._shards)
+
+    def get(self, key) -> Shard:
+        return self._shards[key]
+
+    @contextmanager
+    def session(self, hospital_id: str = None):
+        """
+        Session on the shard holding `hospital_id` (or the single database).
+
+        Raises:
+            ValueError: In the sharded layout without a known hospital_id
+        """
+        if self.layout != SHARDED:
+            key = None
+        elif hospital_id and self.keys(hospital_id):
+            key = hospital_id
+        else:
+            raise ValueError(
+                f"Sharded layout: no shard for hospital_id={hospital_id!r}"
+            )
+        with self._shards[key].session() as db:
+            yield db
+
+    def scatter(self, fn, hospital_id: str = None) -> list:
+        """
+        Run `fn(key, db)` on every relevant shard and gather the results.
+
+        A single shard runs inline; several shards run in parallel threads.
+        `fn` must not itself call scatter (the pool is shared).
+
+        Returns:
+            list: [(shard key, fn result)] in shard order
+        """
+        keys = self.keys(hospital_id)
+
+        def run(key):
+            with self._shards[key].session() as db:
+                return key, fn(key, db)
+
+        if len(keys) == 1:
+            return [run(keys[0])]
+        return list(self._pool.map(run, keys))
@@ -0,0 +1,19 @@
+"""
+Federation Package
+
+Fan-out of search and history requests to other PRAISA hospital nodes,
+and Merkle reconciliation of patient records with them.
+"""
+
+from app.federation.breaker import CircuitBreaker
+from app.federation.client import FederatedClient
+from app.federation.reconcile import MerkleReconciler
+from app.federation.registry import HospitalNode, NodeRegistry
+
+__all__ = [
+    "CircuitBreaker",
+    "FederatedClient",
+    "HospitalNode",
+    "MerkleReconciler",
+    "NodeRegistry",
+]
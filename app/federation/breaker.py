@@ -0,0 +1,94 @@
+"""
+Circuit Breaker
+
+Stops sending requests to a node that keeps failing, so a dead hospital
+link costs nothing instead of a full timeout on every federated search.
+
+States:
+- closed: requests flow; consecutive failures are counted
+- open: requests are rejected until `reset_timeout_s` has passed
+- half_open: one trial request is let through; success closes the
+  breaker, failure re-opens it
+"""
+
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Example:
+        >>> breaker = CircuitBreaker(failure_threshold=3, reset_timeout_s=30)
+        >>> if breaker.allow():
+        ...     try:
+        ...         call_node()
+        ...         breaker.record_success()
+        ...     except Exception:
+        ...         breaker.record_failure()
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout_s: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.reset_timeout_s
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout_s:
+                return False
+            # Half-open: allow a single trial request
+            if self._trial_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """End a request without a verdict (cancelled, or the node shed load)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self) -> dict:
+        state = self.state
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._failures}
@@ -0,0 +1,235 @@
+"""
+Federated Fan-out Client
+
+Sends search and history requests to every registered hospital node
+concurrently and merges the answers.
+
+- One pooled keep-alive `httpx.AsyncClient` per node (connections are
+  reused across requests)
+- Per-node timeout: a slow node cannot hold the whole response
+- Per-node circuit breaker: a failing node is skipped until it recovers
+- Partial results: whatever the healthy nodes returned, plus a per-node
+  status and latency report, with `partial: true` if any node was missing
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from app.config import settings
+from app.federation.breaker import CircuitBreaker
+from app.federation.reconcile import MerkleReconciler
+from app.federation.registry import NodeRegistry
+
+
+class FederatedClient:
+    """
+    Concurrent fan-out over a NodeRegistry.
+
+    Args:
+        registry: Nodes to query
+        transports: Optional {node name: httpx transport}; tests pass
+                    httpx.ASGITransport(app=stand_in_app) here
+        max_connections: Connection pool size per node
+
+    Example:
+        >>> client = FederatedClient(NodeRegistry.from_settings())
+        >>> result = await client.search({"name": "Ramesh"})
+        >>> await client.aclose()
+    """
+
+    def __init__(self, registry: NodeRegistry, transports: dict = None, **options):
+        self.registry = registry
+        self._transports = transports or {}
+        self._max_connections = options.get(
+            "max_connections", settings.federation_max_connections
+        )
+        self._failure_threshold = options.get(
+            "failure_threshold", settings.federation_breaker_failures
+        )
+        self._reset_timeout_s = options.get(
+            "reset_timeout_s", settings.federation_breaker_reset_s
+        )
+        self._clients = {}
+        self._breakers = {}
+
+    def _client(self, node) -> httpx.AsyncClient:
+        client = self._clients.get(node.name)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=node.base_url,
+                transport=self._transports.get(node.name),
+                timeout=node.timeout_s,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections,
+                ),
+            )
+            self._clients[node.name] = client
+        return client
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(self._failure_threshold, self._reset_timeout_s)
+            self._breakers[name] = breaker
+        return breaker
+
+    async def _call(self, node, path: str, params: dict = None) -> dict:
+        """
+        GET `path` on one node, never raising.
+
+        Returns:
+            dict: {"status": ok|not_found|timeout|error|circuit_open,
+                   "latency_ms": float, "body": parsed JSON or None, ...}
+        """
+        breaker = self.breaker(node.name)
+        if not breaker.allow():
+            return {"status": "circuit_open", "latency_ms": 0.0, "body": None}
+
+        started = time.perf_counter()
+        outcome = {"status": "ok", "body": None}
+        try:
+            response = await asyncio.wait_for(
+                self._client(node).get(path, params=params), node.timeout_s
+            )
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            breaker.record_failure()
+            outcome["status"] = "timeout"
+        except asyncio.CancelledError:
+            # The caller went away; let the next request be the trial
+            breaker.release()
+            raise
+        except Exception as e:  # httpx.HTTPError, InvalidURL, transport bugs, ...
+            breaker.record_failure()
+            outcome.update(status="error", error=f"{type(e).__name__}: {e}")
+        else:
+            outcome["http_status"] = response.status_code
+            if response.status_code == 503:
+                # Shedding load (admission control), not down: no verdict
+                breaker.release()
+                outcome["status"] = "error"
+            elif response.status_code >= 500:
+                breaker.record_failure()
+                outcome["status"] = "error"
+            elif response.status_code == 404:
+                breaker.record_success()
+                outcome["status"] = "not_found"
+            elif response.status_code >= 400:
+                breaker.record_success()
+                outcome["status"] = "error"
+            else:
+                try:
+                    body = response.json()
+                    if not isinstance(body, dict):
+                        raise ValueError(f"expected a JSON object, got {type(body)}")
+                except ValueError as e:
+                    # Something other than a PRAISA node answered
+                    breaker.record_failure()
+                    outcome.update(status="error", error=f"{type(e).__name__}: {e}")
+                else:
+                    outcome["body"] = body
+                    breaker.record_success()
+        outcome["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return outcome
+
+    async def _fan_out(self, path: str, params: dict = None) -> dict:
+        nodes = list(self.registry)
+        outcomes = await asyncio.gather(
+            *(self._call(node, path, params) for node in nodes)
+        )
+        return dict(zip((node.name for node in nodes), outcomes))
+
+    @staticmethod
+    def _report(outcomes: dict) -> dict:
+        """Per-node status/latency, without response bodies."""
+        return {
+            name: {k: v for k, v in outcome.items() if k != "body"}
+            for name, outcome in outcomes.items()
+        }
+
+    async def search(self, params: dict) -> dict:
+        """
+        Run /api/patients/search on every node and merge the results.
+
+        Each result is tagged with the node it came from.
+        """
+        outcomes = await self._fan_out("/api/patients/search", params)
+        results = []
+        for name, outcome in outcomes.items():
+            body = outcome["body"] or {}
+            outcome["count"] = len(body.get("results", []))
+            results.extend({**p, "node": name} for p in body.get("results", []))
+        return {
+            "results": results,
+            "count": len(results),
+            "partial": any(o["status"] != "ok" for o in outcomes.values()),
+            "nodes": self._report(outcomes),
+        }
+
+    async def history(self, patient_id: str) -> dict:
+        """
+        Fetch /api/patients/{id}/history from every node that knows the patient.
+
+        A 404 from a node is a normal answer ("not there"), not a failure.
+        """
+        outcomes = await self._fan_out(f"/api/patients/{patient_id}/history")
+        histories = [
+            {**outcome["body"], "node": name}
+            for name, outcome in outcomes.items()
+            if outcome["body"] is not None
+        ]
+        return {
+            "patient_id": patient_id,
+            "histories": histories,
+            "visit_count": sum(h.get("visit_count", 0) for h in histories),
+            "partial": any(
+                o["status"] not in ("ok", "not_found") for o in outcomes.values()
+            ),
+            "nodes": self._report(outcomes),
+        }
+
+    async def reconcile(self, name: str, local_tree) -> dict:
+        """
+        Merkle diff of `local_tree` against node `name` (see reconcile.py).
+
+        Raises:
+            KeyError: No node registered under `name`
+            ValueError: The nodes use different Merkle depths
+            httpx.HTTPError: The node failed
+        """
+        node = self.registry.get(name)
+        return await MerkleReconciler(self._client(node)).diff(local_tree)
+
+    def node_states(self) -> dict:
+        """Circuit breaker state of every registered node."""
+        return {
+            node.name: {"base_url": node.base_url, **self.breaker(node.name).snapshot()}
+            for node in self.registry
+        }
+
+    async def aclose(self):
+        """Close all pooled connections."""
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(client.aclose() for client in clients.values()))
+
+
+# Process-wide client, created on first federated request
+_federated_client = None
+
+
+def get_federated_client() -> FederatedClient:
+    """Return the shared FederatedClient built from settings."""
+    global _federated_client
+    if _federated_client is None:
+        _federated_client = FederatedClient(NodeRegistry.from_settings())
+    return _federated_client
+
+
+async def close_federated_client():
+    """Close the shared client (called on application shutdown)."""
+    global _federated_client
+    if _federated_client is not None:
+        await _federated_client.aclose()
+        _federated_client = None
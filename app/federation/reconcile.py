@@ -0,0 +1,140 @@
+"""
+Merkle Reconciliation with Another Node
+
+Finds the patients on which this node and a remote PRAISA node differ by
+walking both Merkle trees (app/index/merkle.py) from the root down:
+
+1. GET /api/merkle - equal roots: in sync after one exchange
+2. GET /api/merkle/nodes - one call per level, only for differing nodes
+3. GET /api/merkle/buckets - digests of the differing leaf buckets
+4. POST /api/patients/batch - the remote records that differ
+
+Cost grows with the number of differences and the tree depth, not with
+the size of the patient tables. Nothing is written: the caller decides how
+to apply the differences.
+"""
+
+from app.config import settings
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class MerkleReconciler:
+    """
+    Compares a local MerkleTree with the tree of the node behind `client`.
+
+    Args:
+        client: httpx.AsyncClient with the remote node's base_url (tests
+                pass an httpx.ASGITransport to a second app instance)
+
+    Example:
+        >>> async with httpx.AsyncClient(base_url="http://10.0.0.12:8000") as c:
+        ...     diff = await MerkleReconciler(c).diff(index_manager.get("merkle"))
+        >>> diff["missing_locally"]  # Remote records this node lacks
+    """
+
+    def __init__(self, client, max_prefixes: int = None, max_ids: int = None):
+        self.client = client
+        self.max_prefixes = max_prefixes or settings.merkle_max_prefixes
+        self.max_ids = max_ids or settings.batch_max_ids
+        self.exchanges = 0
+
+    async def _get(self, path: str, params=None) -> dict:
+        self.exchanges += 1
+        response = await self.client.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def _post(self, path: str, body: dict) -> dict:
+        self.exchanges += 1
+        response = await self.client.post(path, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    async def _remote(self, path: str, key: str, prefixes: list) -> dict:
+        """Merged {prefix: value} of a prefix endpoint, in chunked calls."""
+        merged = {}
+        for chunk in _chunks(prefixes, self.max_prefixes):
+            body = await self._get(path, [("prefix", p) for p in chunk])
+            merged.update(body[key])
+        return merged
+
+    async def diff(self, local) -> dict:
+        """
+        Differences between the local tree and the remote node.
+
+        Returns:
+            {
+                "in_sync": bool,
+                "buckets": [...],           # Differing leaf prefixes
+                "missing_locally": [...],   # Remote records absent here
+                "changed": [...],           # Remote version of records that differ
+                "missing_remotely": [...],  # Local patient IDs absent there
+                "exchanges": int            # Requests made
+            }
+
+        Raises:
+            ValueError: The trees have different depths
+            httpx.HTTPError: The remote node failed
+        """
+        self.exchanges = 0
+        remote = await self._get("/api/merkle")
+        if remote["depth"] != local.depth:
+            raise ValueError(
+                f"Merkle depth differs (local {local.depth}, remote {remote['depth']})"
+            )
+        result = {
+            "in_sync": remote["root"]["hash"] == local.root["hash"],
+            "buckets": [],
+            "missing_locally": [],
+            "changed": [],
+            "missing_remotely": [],
+        }
+        if result["in_sync"]:
+            result["exchanges"] = self.exchanges
+            return result
+
+        # Descend level by level into the children whose hashes differ
+        frontier = [""]
+        for _ in range(local.depth):
+            remote_nodes = await self._remote("/api/merkle/nodes", "nodes", frontier)
+            differing = []
+            for prefix in frontier:
+                mine = local.children(prefix)
+                theirs = remote_nodes.get(prefix, {})
+                differing += sorted(
+                    child
+                    for child in mine.keys() | theirs.keys()
+                    if (mine.get(child) or {}).get("hash")
+                    != (theirs.get(child) or {}).get("hash")
+                )
+            frontier = differing
+        result["buckets"] = frontier
+
+        remote_buckets = await self._remote("/api/merkle/buckets", "buckets", frontier)
+        fetch, new_ids = [], set()
+        for prefix in frontier:
+            mine = local.bucket(prefix)
+            theirs = remote_buckets.get(prefix, {})
+            result["missing_remotely"] += sorted(mine.keys() - theirs.keys())
+            new_ids.update(theirs.keys() - mine.keys())
+            fetch += sorted(pid for pid in theirs if mine.get(pid) != theirs[pid])
+
+        # Imported lazily: app.index pulls in the matching libraries
+        from app.index.merkle import RECORD_FIELDS
+
+        fields = ",".join(RECORD_FIELDS)
+        for chunk in _chunks(fetch, self.max_ids):
+            body = await self._post(
+                "/api/patients/batch", {"ids": chunk, "fields": fields}
+            )
+            for record in body["results"]:
+                key = (
+                    "missing_locally" if record["patient_id"] in new_ids else "changed"
+                )
+                result[key].append(record)
+        result["exchanges"] = self.exchanges
+        return result
@@ -0,0 +1,59 @@
+"""
+Hospital Node Registry
+
+Lists the PRAISA nodes a federated request fans out to. Configured via the
+FEDERATION_NODES setting, a JSON object of node name -> base URL, e.g.:
+
+    FEDERATION_NODES={"hospital_a": "http://10.0.0.11:8000",
+                      "hospital_b": "http://10.0.0.12:8000"}
+"""
+
+from dataclasses import dataclass
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class HospitalNode:
+    """
+    One remote PRAISA node.
+
+    Fields:
+        name: Node name used in responses (e.g. "hospital_b")
+        base_url: HTTP base URL of the node's API
+        timeout_s: Per-request timeout for this node
+    """
+
+    name: str
+    base_url: str
+    timeout_s: float
+
+
+class NodeRegistry:
+    """Ordered collection of hospital nodes."""
+
+    def __init__(self, nodes=()):
+        self._nodes = {node.name: node for node in nodes}
+
+    @classmethod
+    def from_settings(cls):
+        """Build the registry from FEDERATION_NODES / FEDERATION_TIMEOUT_S."""
+        return cls(
+            HospitalNode(name, url.rstrip("/"), settings.federation_timeout_s)
+            for name, url in settings.federation_nodes.items()
+        )
+
+    def add(self, node: HospitalNode):
+        self._nodes[node.name] = node
+
+    def remove(self, name: str):
+        self._nodes.pop(name, None)
+
+    def get(self, name: str) -> HospitalNode:
+        return self._nodes[name]
+
+    def __iter__(self):
+        return iter(list(self._nodes.values()))
+
+    def __len__(self):
+        return len(self._nodes)
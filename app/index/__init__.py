@@ -0,0 +1,45 @@
+"""
+In-Memory Search Indexes
+
+Indexes are built lazily on first use (or eagerly by the startup warmup)
+and rebuilt when the underlying patient data changes.
+
+Set NAME_INDEX_PATH to share one memory-mapped name index file between
+all workers (see mapped_index.py).
+
+Usage:
+    from app.index import index_manager
+    names = index_manager.get("names")
+"""
+
+from app.index.identifier_filter import BloomFilter, IdentifierFilter
+from app.index.manager import IndexManager, index_manager
+from app.index.mapped_index import MappedNameIndex, build_names
+from app.index.merkle import MerkleTree
+from app.index.name_index import NameIndex
+from app.index.ngram_index import NgramIndex
+from app.index.patient_store import PatientStore
+from app.index.suggest_index import SuggestIndex
+from app.index.symspell import SymSpellIndex
+
+index_manager.register("names", build_names)
+index_manager.register("patients", PatientStore.build)
+index_manager.register("ngrams", NgramIndex.build)
+index_manager.register("symspell", SymSpellIndex.build)
+index_manager.register("suggest", SuggestIndex.build)
+index_manager.register("identifiers", IdentifierFilter.build)
+index_manager.register("merkle", MerkleTree.build)
+
+__all__ = [
+    "BloomFilter",
+    "IdentifierFilter",
+    "IndexManager",
+    "MappedNameIndex",
+    "MerkleTree",
+    "NameIndex",
+    "NgramIndex",
+    "PatientStore",
+    "SuggestIndex",
+    "SymSpellIndex",
+    "index_manager",
+]
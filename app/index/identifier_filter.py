@@ -0,0 +1,188 @@
+"""
+Identifier Bloom Filters
+
+Most ABHA/Aadhaar/phone searches at intake are for patients who are not
+registered yet. Without help, each such miss costs the exact lookup plus a
+full-scan fallback over normalized values. One Bloom filter per identifier
+type (over the normalized values, see app/utils/identifiers.py) answers
+"definitely not registered" from memory; only possible hits go to SQLite.
+
+A Bloom filter has no false negatives, so a filter built from the current
+data never hides a patient. New patients are added by refresh() (only rows
+with a higher id than the last one seen are read); deletes and identifier
+changes need a rebuild, since values cannot be removed. The filters record
+the data signature they are current for, and lookups skip filters that lag
+behind the index manager's signature (see db._identifier_filter).
+"""
+
+import hashlib
+import math
+
+import numpy as np
+
+from app.utils.identifiers import identifier_key
+
+IDENTIFIER_KINDS = ("abha", "aadhaar", "phone")
+_UINT64_MASK = (1 << 64) - 1
+
+
+class BloomFilter:
+    """
+    Bit-array Bloom filter sized for `capacity` values at `error_rate`.
+
+    Example:
+        >>> bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        >>> bloom.add_many(["12345678901234"])
+        >>> "12345678901234" in bloom
+        True
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.num_bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    @staticmethod
+    def _base_hashes(value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(
+            digest[8:], "little"
+        )
+
+    def _positions(self, h1, h2):
+        # Double hashing: position_i = h1 + i * h2 (mod number of bits)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps * h2[:, None]) % np.uint64(self.num_bits)
+
+    def add_many(self, values):
+        """Add an iterable of strings."""
+        pairs = [self._base_hashes(v) for v in values]
+        if not pairs:
+            return
+        hashes = np.array(pairs, dtype=np.uint64)
+        positions = self._positions(hashes[:, 0], hashes[:, 1]).ravel()
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, (positions >> np.uint64(3)).astype(np.int64), masks)
+        self.count += len(pairs)
+
+    def __contains__(self, value: str) -> bool:
+        h1, h2 = self._base_hashes(value)
+        for i in range(self.num_hashes):
+            # Wrap at 64 bits like the uint64 arithmetic of add_many()
+            position = ((h1 + i * h2) & _UINT64_MASK) % self.num_bits
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class IdentifierFilter:
+    """
+    Bloom filters over normalized ABHA, Aadhaar and mobile (last 10) values.
+
+    Args:
+        rows: (id, hospital_id, abha_number, aadhaar_number, mobile) rows
+        error_rate: False-positive rate at capacity
+        signature: db.get_data_signature() read before `rows` (None: unknown)
+        identifiers_signature: db.get_identifiers_signature() read likewise
+        headroom: Extra capacity for patients added by refresh()
+
+    Example:
+        >>> filters = IdentifierFilter(
+        ...     [(1, "hospital_a", "12-3456-7890-1234", None, "9876543210")]
+        ... )
+        >>> filters.might_contain("abha", "12345678901234")
+        True
+        >>> filters.might_contain("phone", "9000000000")
+        False
+    """
+
+    def __init__(
+        self,
+        rows=(),
+        error_rate: float = 0.01,
+        signature=None,
+        identifiers_signature=None,
+        headroom: float = 0.25,
+    ):
+        self.signature = signature
+        self._identifiers_signature = identifiers_signature
+        self._last_ids = {}  # hospital_id -> highest indexed patients.id
+        values = self._collect(rows)
+        self.filters = {}
+        for kind, keys in values.items():
+            bloom = BloomFilter(math.ceil(len(keys) * (1 + headroom)), error_rate)
+            bloom.add_many(keys)
+            self.filters[kind] = bloom
+
+    def _collect(self, rows) -> dict:
+        """{kind: normalized values} of `rows`, advancing the last seen ids."""
+        values = {kind: set() for kind in IDENTIFIER_KINDS}
+        for row_id, hospital_id, *identifiers in rows:
+            self._last_ids[hospital_id] = max(
+                row_id, self._last_ids.get(hospital_id, 0)
+            )
+            for kind, value in zip(IDENTIFIER_KINDS, identifiers):
+                if value:
+                    values[kind].add(identifier_key(kind, value))
+        return values
+
+    @classmethod
+    def build(cls):
+        """Build the filters from the patients table."""
+        from app.config import settings
+        from app.database.db import (
+            get_data_signature,
+            get_identifiers_signature,
+            iter_patient_identifiers,
+        )
+
+        # Read first: a write during the build leaves the filters behind
+        signature = get_data_signature()
+        identifiers_signature = get_identifiers_signature()
+        return cls(
+            iter_patient_identifiers(),
+            error_rate=settings.identifier_filter_error_rate,
+            signature=signature,
+            identifiers_signature=identifiers_signature,
+        )
+
+    def refresh(self) -> bool:
+        """
+        Add the identifiers of patients inserted since the last build/refresh.
+
+        Returns False (rebuild needed) when patients were deleted or had an
+        identifier changed, or when the filters are over capacity.
+        """
+        from app.database.db import (
+            get_data_signature,
+            get_identifiers_signature,
+            iter_patient_identifiers,
+        )
+
+        signature = get_data_signature()
+        if get_identifiers_signature() != self._identifiers_signature:
+            return False
+        new = self._collect(iter_patient_identifiers(dict(self._last_ids)))
+        for kind, keys in new.items():
+            self.filters[kind].add_many(keys)
+        self.signature = signature
+        return all(bloom.count <= bloom.capacity for bloom in self.filters.values())
+
+    def __len__(self):
+        return sum(bloom.count for bloom in self.filters.values())
+
+    def might_contain(self, kind: str, key: str) -> bool:
+        """False: no patient has this normalized identifier."""
+        return key in self.filters[kind]
+
+    def stats(self) -> dict:
+        """Sizes reported by the readiness endpoint."""
+        return {
+            "entries": len(self),
+            "bytes": sum(bloom.bits.nbytes for bloom in self.filters.values()),
+        }
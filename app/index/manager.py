@@ -0,0 +1,231 @@
+"""
+Index Manager
+
+Keeps a registry of named in-memory indexes, builds them on demand and
+rebuilds them when the patient data signature changes (indexes that can
+update incrementally expose refresh() instead).
+
+Each index is built by a builder function that reads from the database.
+Staleness is checked at most once per `index_refresh_interval_s` so the
+check does not add a query to every request.
+
+Builds never hold the registry lock: a stale index keeps being served
+while its replacement is built in a background thread, and only the very
+first build of an index makes its callers wait (for that index alone).
+The staleness check (signature read, refresh() calls) runs outside the
+lock too, in one caller at a time; the others keep using the current
+indexes meanwhile.
+"""
+
+import threading
+import time
+
+from app.config import settings
+
+
+class IndexManager:
+    """
+    Registry of lazily-built, refreshable in-memory indexes.
+
+    Example:
+        >>> manager = IndexManager()
+        >>> manager.register("names", NameIndex.build)
+        >>> names = manager.get("names")
+    """
+
+    def __init__(
+        self,
+        signature_fn=None,
+        refresh_interval_s: float = None,
+        background_rebuild: bool = True,
+    ):
+        self._builders = {}
+        self._indexes = {}
+        self._build_ms = {}
+        self._lock = threading.RLock()
+        self._build_locks = {}
+        self._stale = {}  # name -> generation it was marked stale in
+        self._generation = 0
+        self._rebuilding = set()
+        self._signature_fn = signature_fn
+        self._signature = None
+        self._checked_at = 0.0
+        self._checking = False
+        self._refresh_interval_s = (
+            settings.index_refresh_interval_s
+            if refresh_interval_s is None
+            else refresh_interval_s
+        )
+        # False: stale indexes are rebuilt by the caller that finds them
+        # stale (deterministic, for tests and scripts)
+        self.background_rebuild = background_rebuild
+
+    def register(self, name: str, builder):
+        """Register a builder for index `name` (called with no arguments)."""
+        self._builders[name] = builder
+        self._build_locks[name] = threading.Lock()
+
+    def _current_signature(self):
+        if self._signature_fn is None:
+            # Imported lazily to keep app.index free of DB imports at import time
+            from app.database.db import get_data_signature
+
+            self._signature_fn = get_data_signature
+        return self._signature_fn()
+
+    def _check_fresh(self):
+        """Refresh or mark stale the built indexes if the data signature changed."""
+        with self._lock:
+            now = time.monotonic()
+            if self._checking or now - self._checked_at < self._refresh_interval_s:
+                return
+            self._checking = True
+            self._checked_at = now
+            previous = self._signature
+            indexes = list(self._indexes.items())
+        try:
+            signature = self._current_signature()
+            if signature == previous:
+                return
+            # Indexes with a refresh() method update themselves in place
+            # (returning False when they need a full rebuild); the rest are
+            # marked stale and rebuilt while still being served
+            stale = [
+                name
+                for name, index in indexes
+                if not getattr(index, "refresh", lambda: False)()
+            ]
+            with self._lock:
+                self._generation += 1
+                for name in stale:
+                    self._stale[name] = self._generation
+                self._signature = signature
+        finally:
+            with self._lock:
+                self._checking = False
+
+    def _build(self, name: str):
+        """Build index `name` and swap it in (outside the registry lock)."""
+        with self._lock:
+            generation = self._generation
+        started = time.perf_counter()
+        index = self._builders[name]()
+        with self._lock:
+            self._build_ms[name] = (time.perf_counter() - started) * 1000
+            self._indexes[name] = index
+            # Marked stale again during the build: keep the mark
+            if self._stale.get(name, generation + 1) <= generation:
+                del self._stale[name]
+        return index
+
+    def _rebuild_stale(self, name: str):
+        try:
+            with self._build_locks[name]:
+                self._build(name)
+        finally:
+            with self._lock:
+                self._rebuilding.discard(name)
+
+    def get(self, name: str):
+        """
+        Return index `name`, building it if needed.
+
+        A stale index is returned as is while it is rebuilt in the
+        background (see background_rebuild).
+
+        Raises:
+            KeyError: If no builder is registered under `name`
+        """
+        self._check_fresh()
+        with self._lock:
+            index = self._indexes.get(name)
+            stale = name in self._stale
+            if index is not None and stale and self.background_rebuild:
+                if name not in self._rebuilding:
+                    self._rebuilding.add(name)
+                    threading.Thread(
+                        target=self._rebuild_stale,
+                        args=(name,),
+                        name=f"praisa-index-{name}",
+                        daemon=True,
+                    ).start()
+                return index
+            if index is not None and not stale:
+                return index
+        with self._build_locks[name]:
+            # Built (or rebuilt) by another caller while we waited
+            with self._lock:
+                index = self._indexes.get(name)
+                if index is not None and name not in self._stale:
+                    return index
+            return self._build(name)
+
+    @property
+    def signature(self):
+        """Data signature of the last freshness check (None: not checked yet)."""
+        return self._signature
+
+    @property
+    def names(self) -> list:
+        """Registered index names."""
+        return list(self._builders)
+
+    def rebuild(self, name: str):
+        """
+        Build index `name` afresh and swap it in.
+
+        Unlike invalidate(), readers keep using the current index while the
+        new one is built (e.g. by a background job).
+        """
+        with self._build_locks[name]:
+            return self._build(name)
+
+    def build_all(self) -> dict:
+        """
+        Build (or rebuild) every registered index.
+
+        Returns:
+            dict: {index_name: build time in milliseconds}
+        """
+        with self._lock:
+            self._signature = self._current_signature()
+            self._checked_at = time.monotonic()
+        for name in self._builders:
+            self.rebuild(name)
+        with self._lock:
+            return dict(self._build_ms)
+
+    def wait_for_rebuilds(self, timeout_s: float = 30.0):
+        """Wait until no background rebuild is running (tests, shutdown)."""
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._rebuilding:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def invalidate(self):
+        """Force all indexes to be rebuilt on next access."""
+        with self._lock:
+            self._indexes.clear()
+            self._stale.clear()
+            self._signature = None
+            self._checked_at = 0.0
+
+    def stats(self) -> dict:
+        """Return {index_name: {"built", "build_ms", **index.stats()}}."""
+        with self._lock:
+            result = {}
+            for name in self._builders:
+                index = self._indexes.get(name)
+                entry = {"built": index is not None, "stale": name in self._stale}
+                if index is not None:
+                    entry["build_ms"] = round(self._build_ms.get(name, 0.0), 2)
+                    entry.update(index.stats())
+                result[name] = entry
+            return result
+
+
+# Global index manager used by the database layer and the startup warmup
+index_manager = IndexManager()
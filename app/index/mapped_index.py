@@ -0,0 +1,301 @@
+"""
+Memory-Mapped Name Index
+
+Serializes a NameIndex to a single read-only file that every uvicorn worker
+maps with mmap, so the name/phonetic columns exist once in the page cache
+instead of once per worker.
+
+File layout (native byte order, sections 8-byte aligned):
+
+    b"PRNIDX01"                 magic
+    uint64                      header length
+    header (JSON)               count, data signature, hospitals, sections
+    row_ids        int64[n]
+    hospital_codes int32[n]     index into header["hospitals"]
+    name_offsets   uint64[n+1]  + name_blob (UTF-8)
+    norm_offsets   uint64[n+1]  + norm_blob (normalize_indian_name forms)
+    phon_offsets   uint64[k+1]  + phon_blob (sorted metaphone keys)
+    phon_starts    uint64[k+1]  + phon_positions int32[n]
+    hosp_starts    uint64[h+1]  + hosp_positions int32[n]
+
+A rebuilt index is written to a temporary file and renamed over the old one
+(atomic on POSIX); workers still mapping the old file keep reading it until
+they reopen.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+
+from app.config import settings
+from app.index.name_index import NameIndex, phonetic_key
+
+MAGIC = b"PRNIDX01"
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _pad(size: int) -> int:
+    return (8 - size % 8) % 8
+
+
+def _string_section(strings):
+    """Return (offsets array, UTF-8 blob) for a list of strings."""
+    offsets = array("Q", [0])
+    blob = bytearray()
+    for value in strings:
+        blob += (value or "").encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def _postings_section(groups):
+    """Return (start offsets, concatenated int32 positions) for position lists."""
+    starts = array("Q", [0])
+    positions = array("i")
+    for group in groups:
+        positions.extend(group)
+        starts.append(len(positions))
+    return starts, positions
+
+
+def normalize_signature(signature):
+    """Data signature as it round-trips through the JSON header."""
+    return json.loads(json.dumps(signature))
+
+
+def write_name_index(index: NameIndex, path: str, signature=None) -> int:
+    """
+    Serialize `index` to `path`, atomically replacing any existing file.
+
+    Returns:
+        int: Size of the written file in bytes
+    """
+    hospitals = list(dict.fromkeys(index.hospital_ids))
+    codes = {hospital_id: code for code, hospital_id in enumerate(hospitals)}
+    phonetic_keys = sorted(index.phonetic)
+
+    name_offsets, name_blob = _string_section(index.names)
+    norm_offsets, norm_blob = _string_section(index.normalized)
+    phon_offsets, phon_blob = _string_section(phonetic_keys)
+    phon_starts, phon_positions = _postings_section(
+        index.phonetic[key] for key in phonetic_keys
+    )
+    by_hospital = {hospital_id: [] for hospital_id in hospitals}
+    for position, hospital_id in enumerate(index.hospital_ids):
+        by_hospital[hospital_id].append(position)
+    hosp_starts, hosp_positions = _postings_section(by_hospital.values())
+
+    sections = [
+        ("row_ids", "q", array("q", index.row_ids).tobytes()),
+        ("hospital_codes", "i", array("i", map(codes.get, index.hospital_ids))),
+        ("name_offsets", "Q", name_offsets),
+        ("name_blob", None, name_blob),
+        ("norm_offsets", "Q", norm_offsets),
+        ("norm_blob", None, norm_blob),
+        ("phon_offsets", "Q", phon_offsets),
+        ("phon_blob", None, phon_blob),
+        ("phon_starts", "Q", phon_starts),
+        ("phon_positions", "i", phon_positions),
+        ("hosp_starts", "Q", hosp_starts),
+        ("hosp_positions", "i", hosp_positions),
+    ]
+
+    layout = {}
+    offset = 0
+    for name, fmt, data in sections:
+        data = data.tobytes() if isinstance(data, array) else data
+        layout[name] = [offset, len(data), fmt]
+        offset += len(data) + _pad(len(data))
+
+    header = json.dumps(
+        {
+            "count": len(index.row_ids),
+            "signature": signature,
+            "byteorder": sys.byteorder,
+            "hospitals": hospitals,
+            "sections": layout,
+        }
+    ).encode("utf-8")
+    header += b" " * _pad(len(MAGIC) + 8 + len(header))
+
+    # Write next to the target so os.replace is a same-filesystem rename
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for _, _, data in sections:
+                data = data.tobytes() if isinstance(data, array) else data
+                f.write(data)
+                f.write(b"\0" * _pad(len(data)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return os.path.getsize(path)
+
+
+class StringColumn(Sequence):
+    """Read-only list of strings stored as (offsets, UTF-8 blob)."""
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = range(len(self))[i]  # Negative indices / IndexError
+        return str(self._blob[self._offsets[i] : self._offsets[i + 1]], "utf-8")
+
+
+class CodedColumn(Sequence):
+    """Read-only list of dictionary-encoded values (codes into `values`)."""
+
+    def __init__(self, codes, values):
+        self._codes = codes
+        self._values = values
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._values[code] for code in self._codes[i]]
+        return self._values[self._codes[i]]
+
+
+class MappedNameIndex:
+    """
+    NameIndex backed by a memory-mapped file (same read interface).
+
+    Attributes:
+        row_ids, names, hospital_ids, normalized: Read-only columns
+        signature: Data signature the file was built from
+        path: Mapped file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if bytes(view[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a PRAISA name index file")
+        (header_len,) = struct.unpack("<Q", view[len(MAGIC) : len(MAGIC) + 8])
+        base = len(MAGIC) + 8
+        header = json.loads(bytes(view[base : base + header_len]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {header['byteorder']} host")
+        base += header_len
+
+        def section(name):
+            offset, size, fmt = header["sections"][name]
+            data = view[base + offset : base + offset + size]
+            return data.cast(fmt) if fmt else data
+
+        self.signature = header["signature"]
+        self.row_ids = section("row_ids")
+        self.names = StringColumn(section("name_offsets"), section("name_blob"))
+        self.normalized = StringColumn(section("norm_offsets"), section("norm_blob"))
+        self.hospital_ids = CodedColumn(section("hospital_codes"), header["hospitals"])
+        self._hospital_codes = {h: code for code, h in enumerate(header["hospitals"])}
+        self._phonetic_keys = StringColumn(
+            section("phon_offsets"), section("phon_blob")
+        )
+        self._phon_starts = section("phon_starts")
+        self._phon_positions = section("phon_positions")
+        self._hosp_starts = section("hosp_starts")
+        self._hosp_positions = section("hosp_positions")
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def positions(self, hospital_id: str = None):
+        """Positions of all entries, optionally restricted to one hospital."""
+        if hospital_id:
+            code = self._hospital_codes.get(hospital_id)
+            if code is None:
+                return []
+            start, end = self._hosp_starts[code], self._hosp_starts[code + 1]
+            return self._hosp_positions[start:end]
+        return range(len(self.row_ids))
+
+    def names_by_row_id(self, hospital_id: str = None) -> dict:
+        """Return {row_id: name} for scoring with rapidfuzz.process."""
+        return {self.row_ids[i]: self.names[i] for i in self.positions(hospital_id)}
+
+    def phonetic_row_ids(self, name: str, hospital_id: str = None) -> list:
+        """Row ids whose phonetic key equals that of `name` (binary search)."""
+        key = phonetic_key(name)
+        if not key:
+            return []
+        k = bisect_left(self._phonetic_keys, key)
+        if k == len(self._phonetic_keys) or self._phonetic_keys[k] != key:
+            return []
+        start, end = self._phon_starts[k], self._phon_starts[k + 1]
+        return [
+            self.row_ids[i]
+            for i in self._phon_positions[start:end]
+            if not hospital_id or self.hospital_ids[i] == hospital_id
+        ]
+
+    def stats(self) -> dict:
+        """Sizes reported by the readiness endpoint."""
+        return {
+            "entries": len(self.row_ids),
+            "phonetic_keys": len(self._phonetic_keys),
+            "hospitals": len(self._hospital_codes),
+            "mapped_bytes": len(self._mmap),
+        }
+
+
+def load_or_build(path: str, signature=None):
+    """
+    Map the index file at `path`, rebuilding it first if it is missing,
+    unreadable or was built from different data.
+
+    The first worker to notice a data change rebuilds and renames the file
+    into place; workers checking later simply map the new file.
+    """
+    if signature is None:
+        from app.database.db import get_data_signature
+
+        signature = get_data_signature()
+    signature = normalize_signature(signature)
+
+    if os.path.exists(path):
+        try:
+            mapped = MappedNameIndex(path)
+            if mapped.signature == signature:
+                return mapped
+        except (OSError, ValueError, KeyError):
+            pass  # Corrupt or foreign file: rebuild below
+
+    write_name_index(NameIndex.build(), path, signature)
+    return MappedNameIndex(path)
+
+
+def build_names():
+    """
+    Builder registered for the "names" index.
+
+    Uses the shared mapped file when settings.name_index_path is set,
+    otherwise a private in-process NameIndex.
+    """
+    if not settings.name_index_path:
+        return NameIndex.build()
+    return load_or_build(os.path.join(BASE_DIR, settings.name_index_path))
@@ -0,0 +1,134 @@
+"""
+Merkle Tree over Patient Records
+
+Two PRAISA nodes holding overlapping patient sets find their differences
+without comparing full tables. Patients are bucketed by a hash prefix of
+their patient_id (a fixed-depth tree with 16 children per node) and every
+node of the tree carries a hash of everything below it:
+
+- leaf (bucket): hash of its sorted (patient_id, record digest) pairs
+- inner node: hash of its sorted (child prefix, child hash) pairs
+
+Equal hashes mean equal subtrees, so reconciliation (see
+app/federation/reconcile.py) only descends into differing children:
+O(depth) exchanges, after which only the rows of differing buckets are
+transferred.
+
+Record digests cover the shared content columns (RECORD_FIELDS), not the
+node-local row id or version counter.
+"""
+
+import hashlib
+import json
+
+# Columns whose values must agree between nodes
+RECORD_FIELDS = (
+    "patient_id",
+    "hospital_id",
+    "name",
+    "dob",
+    "mobile",
+    "gender",
+    "abha_number",
+    "aadhaar_number",
+    "address",
+    "state",
+)
+FANOUT = 16  # One hex digit per level
+
+
+def _hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def bucket_of(patient_id: str, depth: int) -> str:
+    """Leaf prefix (`depth` hex digits) a patient_id belongs to."""
+    return hashlib.blake2b(patient_id.encode(), digest_size=8).hexdigest()[:depth]
+
+
+def record_digest(record: dict) -> str:
+    """Digest of a patient record's RECORD_FIELDS."""
+    return _hash(json.dumps([record.get(f) for f in RECORD_FIELDS], default=str))
+
+
+class MerkleTree:
+    """
+    Fixed-depth hash tree over patient records.
+
+    Only non-empty nodes are stored; a prefix missing from the tree is an
+    empty subtree.
+
+    Example:
+        >>> tree = MerkleTree([{"patient_id": "HA001", "name": "Ramesh"}], depth=3)
+        >>> tree.root
+        {'hash': '...', 'count': 1}
+        >>> tree.children("")  # {"7": {"hash": ..., "count": 1}}
+    """
+
+    def __init__(self, records=(), depth: int = 3):
+        self.depth = depth
+        self.buckets = {}  # leaf prefix -> {patient_id: record digest}
+        for record in records:
+            patient_id = record["patient_id"]
+            self.buckets.setdefault(bucket_of(patient_id, depth), {})[patient_id] = (
+                record_digest(record)
+            )
+
+        self.nodes = {}  # prefix -> (hash, count), every level
+        level = {}
+        for prefix, bucket in self.buckets.items():
+            pairs = "".join(f"{pid}:{bucket[pid]}\n" for pid in sorted(bucket))
+            level[prefix] = (_hash(pairs), len(bucket))
+        self.nodes.update(level)
+        for _ in range(depth):
+            parents = {}
+            for prefix in sorted(level):
+                parents.setdefault(prefix[:-1], []).append(prefix)
+            level = {
+                parent: (
+                    _hash("".join(f"{c}:{self.nodes[c][0]}\n" for c in children)),
+                    sum(self.nodes[c][1] for c in children),
+                )
+                for parent, children in parents.items()
+            }
+            self.nodes.update(level)
+        self.nodes.setdefault("", (_hash(""), 0))
+
+    @classmethod
+    def build(cls):
+        """Build the tree from the patients table."""
+        from app.config import settings
+        from app.database.db import iter_patient_records
+
+        return cls(iter_patient_records(RECORD_FIELDS), depth=settings.merkle_depth)
+
+    def __len__(self):
+        return self.nodes[""][1]
+
+    @property
+    def root(self) -> dict:
+        return self.node("")
+
+    def node(self, prefix: str) -> dict:
+        """{"hash", "count"} of the subtree at `prefix` (None if empty)."""
+        entry = self.nodes.get(prefix)
+        return {"hash": entry[0], "count": entry[1]} if entry else None
+
+    def children(self, prefix: str) -> dict:
+        """Non-empty children of `prefix`: {child prefix: {"hash", "count"}}."""
+        if len(prefix) >= self.depth:
+            return {}
+        found = {}
+        for digit in "0123456789abcdef":
+            child = self.node(prefix + digit)
+            if child is not None:
+                found[prefix + digit] = child
+        return found
+
+    def bucket(self, prefix: str) -> dict:
+        """{patient_id: record digest} of the leaf bucket at `prefix`."""
+        return dict(self.buckets.get(prefix, {}))
+
+    def stats(self) -> dict:
+        """Sizes reported by the readiness endpoint."""
+        return {"entries": len(self), "depth": self.depth, "buckets": len(self.buckets)}
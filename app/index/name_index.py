@@ -0,0 +1,99 @@
+"""
+Name / Phonetic Index
+
+Holds the (row id, name, hospital) columns of the patients table in memory,
+together with each name's Indian-normalized form and metaphone key.
+
+The fuzzy search fallback scores names from this index instead of
+re-reading every patient row, and phonetic lookups become a dict probe.
+"""
+
+import jellyfish
+
+from app.matching.phonetic_match import normalize_indian_name
+
+
+def phonetic_key(name: str) -> str:
+    """
+    Phonetic key used by the index: metaphone of the normalized name.
+
+    Example:
+        >>> phonetic_key("Vijay Kumar") == phonetic_key("Wijay Kumar")
+        True
+    """
+    normalized = normalize_indian_name(name)
+    return jellyfish.metaphone(normalized) if normalized else ""
+
+
+class NameIndex:
+    """
+    Column-oriented in-memory index over patient names.
+
+    Attributes:
+        row_ids: Database primary keys (patients.id), in table order
+        names: Patient names
+        hospital_ids: Hospital of each patient
+        normalized: normalize_indian_name() of each name
+        phonetic: {phonetic_key: [positions]}
+    """
+
+    def __init__(self, rows):
+        self.row_ids = []
+        self.names = []
+        self.hospital_ids = []
+        self.normalized = []
+        self.phonetic = {}
+        self._by_hospital = {}
+
+        for row_id, name, hospital_id in rows:
+            self.add(row_id, name, hospital_id)
+
+    @classmethod
+    def build(cls):
+        """Build the index from the patients table."""
+        from app.database.db import iter_patient_names
+
+        return cls(iter_patient_names())
+
+    def add(self, row_id: int, name: str, hospital_id: str):
+        """Append one patient to the index."""
+        position = len(self.row_ids)
+        name = name or ""
+        self.row_ids.append(row_id)
+        self.names.append(name)
+        self.hospital_ids.append(hospital_id)
+        self.normalized.append(normalize_indian_name(name))
+        self.phonetic.setdefault(phonetic_key(name), []).append(position)
+        self._by_hospital.setdefault(hospital_id, []).append(position)
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def positions(self, hospital_id: str = None):
+        """Positions of all entries, optionally restricted to one hospital."""
+        if hospital_id:
+            return self._by_hospital.get(hospital_id, [])
+        return range(len(self.row_ids))
+
+    def names_by_row_id(self, hospital_id: str = None) -> dict:
+        """Return {row_id: name} for scoring with rapidfuzz.process."""
+        return {self.row_ids[i]: self.names[i] for i in self.positions(hospital_id)}
+
+    def phonetic_row_ids(self, name: str, hospital_id: str = None) -> list:
+        """Row ids whose phonetic key equals that of `name`."""
+        key = phonetic_key(name)
+        if not key:
+            return []
+        return [
+            self.row_ids[i]
+            for i in self.phonetic.get(key, [])
+            if not hospital_id or self.hospital_ids[i] == hospital_id
+        ]
+
+    def stats(self) -> dict:
+        """Sizes reported by the readiness endpoint."""
+        return {
+            "entries": len(self.row_ids),
+            "phonetic_keys": len(self.phonetic),
+            "hospitals": len(self._by_hospital),
+        }
@@ -0,0 +1,147 @@
+"""
+Character N-gram TF-IDF Name Retrieval
+
+Vectorizes every distinct normalized name (normalize_indian_name) into a
+sparse TF-IDF vector of character 2-3-grams. A query is answered with one
+sparse matrix-vector product (cosine similarity, vectors are L2-normalized)
+and a top-k selection, instead of scoring every name with rapidfuzz.
+
+The matrix is stored column-major (CSC): a query only reads the columns of
+its own ~20 n-grams.
+
+The shortlist is then re-ranked with the usual rapidfuzz scorers by the
+caller, so final scores are unchanged; only candidates outside the top-k
+by n-gram similarity are skipped.
+"""
+
+import numpy as np
+
+from app.matching.phonetic_match import normalize_indian_name
+
+
+class NgramIndex:
+    """
+    TF-IDF shortlist index over patient names.
+
+    Attributes:
+        row_ids: patients.id of each entry (int64)
+        names: Original name of each entry
+        name_ids: Entry -> row of the distinct-name matrix
+        matrix: Sparse TF-IDF matrix (CSC), one row per distinct normalized name
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: Iterable of (row_id, name, hospital_id)
+        """
+        # Imported lazily: scikit-learn is slow to import
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        row_ids, names, hospital_ids = [], [], []
+        for row_id, name, hospital_id in rows:
+            row_ids.append(row_id)
+            names.append(name or "")
+            hospital_ids.append(hospital_id)
+
+        # Vectorize each distinct normalized form once
+        distinct = {}
+        name_ids = [
+            distinct.setdefault(normalize_indian_name(name), len(distinct))
+            for name in names
+        ]
+        hospitals = {h: code for code, h in enumerate(dict.fromkeys(hospital_ids))}
+
+        self.row_ids = np.array(row_ids, dtype=np.int64)
+        self.names = names
+        self.name_ids = np.array(name_ids, dtype=np.int32)
+        self._hospital_codes = hospitals
+        self._hospital_code = np.array(
+            [hospitals[h] for h in hospital_ids], dtype=np.int16
+        )
+        self.vectorizer = TfidfVectorizer(
+            analyzer="char_wb", ngram_range=(2, 3), lowercase=True, dtype=np.float32
+        )
+        self.matrix = (
+            self.vectorizer.fit_transform(list(distinct)).tocsc() if distinct else None
+        )
+
+        # Entries grouped by distinct name: entries of name n are
+        # _by_name[_name_starts[n]:_name_starts[n + 1]]
+        self._by_name = np.argsort(self.name_ids, kind="stable")
+        self._name_starts = np.searchsorted(
+            self.name_ids[self._by_name], np.arange(len(distinct) + 1)
+        )
+
+    @classmethod
+    def build(cls):
+        """Build the index from the patients table."""
+        from app.database.db import iter_patient_names
+
+        return cls(iter_patient_names())
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def _scope(self, hospital_id=None, row_ids=None):
+        """Boolean mask of the hospital / allowed row id restriction (or None)."""
+        if not hospital_id and row_ids is None:
+            return None
+        keep = np.ones(len(self.row_ids), dtype=bool)
+        if hospital_id:
+            code = self._hospital_codes.get(hospital_id, -1)
+            keep &= self._hospital_code == code
+        if row_ids is not None:
+            keep &= np.isin(self.row_ids, row_ids)
+        return keep
+
+    def top_names(self, query: str, k: int, scope=None) -> np.ndarray:
+        """Distinct-name ids of the k names most similar to `query`."""
+        normalized = normalize_indian_name(query)
+        if self.matrix is None or not normalized or k <= 0:
+            return np.array([], dtype=np.int32)
+        query_vector = self.vectorizer.transform([normalized])
+        # Cosine similarity: only the query's own n-gram columns are read
+        scores = self.matrix[:, query_vector.indices] @ query_vector.data
+
+        if scope is not None:
+            # Only names that occur inside the scope compete for the shortlist
+            in_scope = np.zeros(len(scores), dtype=bool)
+            in_scope[self.name_ids[scope]] = True
+            scores[~in_scope] = 0.0
+
+        candidates = np.flatnonzero(scores > 0.0)
+        if len(candidates) > k:
+            top = np.argpartition(scores[candidates], -k)[-k:]
+            candidates = candidates[top]
+        return candidates
+
+    def shortlist(
+        self, query: str, k: int, hospital_id: str = None, row_ids=None
+    ) -> dict:
+        """
+        Return {row_id: name} for every patient carrying one of the top-k
+        names by n-gram cosine similarity.
+
+        Args:
+            query: Name searched for
+            k: Number of distinct names to keep
+            hospital_id: Restrict to one hospital
+            row_ids: Restrict to these patients.id values (e.g. pre-filtered)
+        """
+        scope = self._scope(hospital_id, row_ids)
+        result = {}
+        for name_id in self.top_names(query, k, scope):
+            start, end = self._name_starts[name_id], self._name_starts[name_id + 1]
+            for i in self._by_name[start:end].tolist():
+                if scope is None or scope[i]:
+                    result[int(self.row_ids[i])] = self.names[i]
+        return result
+
+    def stats(self) -> dict:
+        """Sizes reported by the readiness endpoint."""
+        return {
+            "entries": len(self.row_ids),
+            "distinct_names": 0 if self.matrix is None else self.matrix.shape[0],
+            "ngrams": 0 if self.matrix is None else self.matrix.shape[1],
+        }
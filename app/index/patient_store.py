@@ -0,0 +1,194 @@
+"""
+Columnar Patient Store
+
+Compact in-memory copy of the demographic columns of the patients table,
+one NumPy array per field instead of one dict per patient:
+
+    row_ids        int64   patients.id
+    birth_year     int16   from dob (0 = unknown)
+    gender_code    int8    GENDER_CODES (0 = unknown)
+    hospital_code  int16   code into `hospitals`
+    mobile_last10  int64   last 10 digits of mobile (0 = unknown)
+    name_code      int32   code into `names` (dictionary-encoded)
+    state_code     int16   code into `states` (dictionary-encoded)
+
+Demographic pre-filters (gender, birth-year window, hospital) are single
+vectorized comparisons over these arrays, so fuzzy name scoring only sees
+the patients that can still match.
+"""
+
+import sys
+
+import numpy as np
+
+GENDER_CODES = {"M": 1, "F": 2, "O": 3}
+
+
+class StringDictionary:
+    """Interned strings: each distinct value is stored once and given a code."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, value: str) -> int:
+        """Code of `value`, adding it to the dictionary if new."""
+        value = sys.intern(value or "")
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value: str):
+        """Code of `value`, or None if it never occurred."""
+        return self._codes.get(value or "")
+
+    def __len__(self):
+        return len(self.values)
+
+    def memory_bytes(self) -> int:
+        return (
+            sys.getsizeof(self.values)
+            + sys.getsizeof(self._codes)
+            + sum(sys.getsizeof(value) for value in self.values)
+        )
+
+
+def birth_year(dob) -> int:
+    """Year of a YYYY-MM-DD date of birth (0 if missing or malformed)."""
+    try:
+        return int(str(dob)[:4])
+    except (TypeError, ValueError):
+        return 0
+
+
+def gender_code(gender) -> int:
+    """GENDER_CODES code of a stored gender ("M", "Other", ...; 0 if unknown)."""
+    # Stored values may be spelt out; their first letter is the code
+    return GENDER_CODES.get(str(gender or "")[:1].upper(), 0)
+
+
+def mobile_last10(mobile) -> int:
+    """Last 10 digits of a mobile number as an int (0 if missing)."""
+    digits = "".join(ch for ch in str(mobile or "") if ch.isdigit())
+    return int(digits[-10:]) if digits else 0
+
+
+class PatientStore:
+    """
+    Column-oriented in-memory patient demographics.
+
+    Example:
+        >>> store = PatientStore.build()
+        >>> positions = store.filter(gender="F", birth_year=1990, hospital_id="hospital_a")
+        >>> names = store.names_by_row_id(positions)
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: Iterable of (id, name, hospital_id, dob, gender, mobile, state)
+        """
+        self.names = StringDictionary()
+        self.states = StringDictionary()
+        self.hospitals = StringDictionary()
+
+        row_ids, years, genders, hospitals, mobiles, names, states = (
+            [] for _ in range(7)
+        )
+        for row_id, name, hospital_id, dob, gender, mobile, state in rows:
+            row_ids.append(row_id)
+            years.append(birth_year(dob))
+            genders.append(gender_code(gender))
+            hospitals.append(self.hospitals.encode(hospital_id))
+            mobiles.append(mobile_last10(mobile))
+            names.append(self.names.encode(name))
+            states.append(self.states.encode(state))
+
+        self.row_ids = np.array(row_ids, dtype=np.int64)
+        self.birth_year = np.array(years, dtype=np.int16)
+        self.gender_code = np.array(genders, dtype=np.int8)
+        self.hospital_code = np.array(hospitals, dtype=np.int16)
+        self.mobile_last10 = np.array(mobiles, dtype=np.int64)
+        self.name_code = np.array(names, dtype=np.int32)
+        self.state_code = np.array(states, dtype=np.int16)
+
+    @classmethod
+    def build(cls):
+        """Build the store from the patients table."""
+        from app.database.db import iter_patient_demographics
+
+        return cls(iter_patient_demographics())
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def mask(
+        self,
+        gender: str = None,
+        birth_year: int = None,
+        year_window: int = 0,
+        hospital_id: str = None,
+    ) -> np.ndarray:
+        """
+        Boolean mask of patients passing every given filter.
+
+        Patients with an unknown value are excluded by a filter on that field.
+
+        Args:
+            gender: "M", "F" or "O"
+            birth_year: Keep birth years within +/- `year_window` of this
+            hospital_id: Keep one hospital's patients
+        """
+        keep = np.ones(len(self.row_ids), dtype=bool)
+        if gender:
+            keep &= self.gender_code == (gender_code(gender) or -1)
+        if birth_year:
+            keep &= np.abs(self.birth_year.astype(np.int32) - birth_year) <= year_window
+        if hospital_id:
+            code = self.hospitals.code(hospital_id)
+            keep &= self.hospital_code == (-1 if code is None else code)
+        return keep
+
+    def filter(self, **filters) -> np.ndarray:
+        """Positions of patients passing `mask(**filters)`."""
+        return np.flatnonzero(self.mask(**filters))
+
+    def names_by_row_id(self, positions) -> dict:
+        """Return {row_id: name} for the given positions (rapidfuzz input)."""
+        values = self.names.values
+        return dict(
+            zip(
+                self.row_ids[positions].tolist(),
+                (values[code] for code in self.name_code[positions].tolist()),
+            )
+        )
+
+    def memory_bytes(self) -> dict:
+        """Bytes used per column and dictionary, plus the total."""
+        usage = {
+            column: getattr(self, column).nbytes
+            for column in (
+                "row_ids",
+                "birth_year",
+                "gender_code",
+                "hospital_code",
+                "mobile_last10",
+                "name_code",
+                "state_code",
+            )
+        }
+        usage["names"] = self.names.memory_bytes()
+        usage["states"] = self.states.memory_bytes()
+        usage["hospitals"] = self.hospitals.memory_bytes()
+        usage["total"] = sum(usage.values())
+        return usage
+
+    def stats(self) -> dict:
+        """Sizes reported by the readiness endpoint."""
+        return {
+            "entries": len(self.row_ids),
+            "distinct_names": len(self.names),
+            "memory_bytes": self.memory_bytes()["total"],
+        }
@@ -0,0 +1,159 @@
+"""
+Type-ahead Suggestion Index
+
+Sorted array of the distinct lowercase name tokens with their frequencies
+(overall and per hospital). A prefix maps to a contiguous slice of the
+array (two binary searches); the top-N tokens of that slice by frequency
+are picked with a vectorized partial sort.
+
+New patients are appended incrementally (refresh() after an ingest reads
+only rows with a higher id than the last one indexed) instead of
+re-reading the whole table. Their tokens are merged into the published
+arrays (binary-search insert of the new tokens, vectorized count update)
+rather than re-sorting everything; each merge still copies the arrays so
+readers keep an immutable view, which is why refresh() only runs on the
+index manager's freshness check (at most once per index_refresh_interval_s)
+and not on every write.
+"""
+
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+import numpy as np
+
+from app.index.symspell import tokenize
+
+
+class SuggestIndex:
+    """
+    Prefix completion over patient name tokens, ranked by frequency.
+
+    Example:
+        >>> index = SuggestIndex([(1, "Ramesh Singh", "hospital_a")])
+        >>> index.suggest("ram")
+        [{'text': 'Ramesh', 'count': 1}]
+    """
+
+    def __init__(self, rows=()):
+        self._counts = Counter()
+        self._hospital_counts = {}
+        self._last_ids = {}  # hospital_id -> highest indexed patients.id
+        self._entries = 0
+        self._lock = threading.Lock()
+        self._view = ([], np.zeros(0, dtype=np.int64), {})
+        self.add_many(rows)
+
+    @classmethod
+    def build(cls):
+        """Build the index from the patients table."""
+        from app.database.db import iter_patient_names
+
+        return cls(iter_patient_names())
+
+    def __len__(self):
+        return self._entries
+
+    def add_many(self, rows):
+        """Index (row_id, name, hospital_id) rows and publish a new view."""
+        delta = Counter()
+        hospital_delta = {}
+        with self._lock:
+            for row_id, name, hospital_id in rows:
+                tokens = tokenize(name)
+                delta.update(tokens)
+                hospital_delta.setdefault(hospital_id, Counter()).update(tokens)
+                self._last_ids[hospital_id] = max(
+                    row_id, self._last_ids.get(hospital_id, 0)
+                )
+                self._entries += 1
+            if delta:
+                self._merge(delta, hospital_delta)
+
+    def _merge(self, delta, hospital_delta):
+        tokens, totals, per_hospital = self._view
+        new = sorted(token for token in delta if token not in self._counts)
+        self._counts.update(delta)
+        for hospital_id, counts in hospital_delta.items():
+            self._hospital_counts.setdefault(hospital_id, Counter()).update(counts)
+        if len(new) * 8 > len(tokens):
+            # Initial build or bulk ingest: a full sort is cheaper than inserts
+            self._publish()
+            return
+
+        positions = [bisect_left(tokens, token) for token in new]
+        merged = list(tokens)
+        for position, token in zip(reversed(positions), reversed(new)):
+            merged.insert(position, token)
+
+        def updated(counts, changes):
+            # Fresh copy: the published arrays are never written to
+            counts = np.insert(counts, positions, 0) if new else counts.copy()
+            index = [bisect_left(merged, token) for token in changes]
+            counts[index] += np.fromiter(changes.values(), np.int64, len(changes))
+            return counts
+
+        empty = np.zeros(len(tokens), np.int64)
+        per_hospital = {
+            hospital_id: (
+                updated(counts, hospital_delta[hospital_id])
+                if hospital_id in hospital_delta
+                else np.insert(counts, positions, 0) if new else counts
+            )
+            for hospital_id, counts in per_hospital.items()
+        }
+        for hospital_id, changes in hospital_delta.items():
+            if hospital_id not in per_hospital:
+                per_hospital[hospital_id] = updated(empty, changes)
+        # Readers take the whole tuple at once, never a half-updated view
+        self._view = (merged, updated(totals, delta), per_hospital)
+
+    def _publish(self):
+        tokens = sorted(self._counts)
+        totals = np.array([self._counts[t] for t in tokens], dtype=np.int64)
+        per_hospital = {
+            hospital_id: np.array([counts[t] for t in tokens], dtype=np.int64)
+            for hospital_id, counts in self._hospital_counts.items()
+        }
+        self._view = (tokens, totals, per_hospital)
+
+    def refresh(self) -> bool:
+        """
+        Index patients added since the last build/refresh.
+
+        Returns False (rebuild needed) when patients were removed. Renamed
+        patients keep their old tokens until the next full rebuild.
+        """
+        from app.database.db import count_patients, iter_patient_names_after
+
+        self.add_many(iter_patient_names_after(dict(self._last_ids)))
+        return count_patients() == self._entries
+
+    def suggest(self, prefix: str, hospital_id: str = None, limit: int = 10) -> list:
+        """
+        Top `limit` tokens starting with `prefix`, most frequent first.
+
+        Returns:
+            list: [{"text": "Ramesh", "count": 42}, ...]
+        """
+        prefix = (prefix or "").strip().lower()
+        tokens, totals, per_hospital = self._view
+        counts = per_hospital.get(hospital_id) if hospital_id else totals
+        if not prefix or counts is None or limit <= 0:
+            return []
+
+        lo = bisect_left(tokens, prefix)
+        hi = bisect_left(tokens, prefix + "\uffff", lo)
+        window = counts[lo:hi]
+        if len(window) > limit:
+            top = np.argpartition(-window, limit - 1)[:limit]
+        else:
+            top = np.arange(len(window))
+        ranked = sorted(
+            (int(-window[i]), tokens[lo + i]) for i in top.tolist() if window[i] > 0
+        )
+        return [{"text": token.title(), "count": -count} for count, token in ranked]
+
+    def stats(self) -> dict:
+        """Sizes reported by the readiness endpoint."""
+        return {"entries": self._entries, "tokens": len(self._view[0])}
@@ -0,0 +1,193 @@
+"""
+SymSpell Deletion Index over Name Tokens
+
+Finds every name token within a bounded edit distance of a query token
+(Ramehs -> Ramesh, Kumarr -> Kumar, Prya -> Priya) without comparing the
+query against every name.
+
+For each distinct token, all strings obtained by deleting up to
+`max_distance` characters (of its first `prefix_length` characters) are
+stored in a dict. A query token generates its own deletes and probes the
+dict: two strings within edit distance d always share a delete. Candidates
+are then verified with the optimal string alignment distance, which counts
+a transposition (Ramehs/Ramesh) as one edit.
+
+Lookups cost O(deletes of the query), independent of the corpus size, and
+new patients are indexed incrementally with add() (refresh() after an
+ingest reads only rows with a higher id than the last one indexed).
+"""
+
+import re
+import threading
+
+from rapidfuzz.distance import OSA
+
+_TOKEN = re.compile(r"[a-z]+")
+
+
+def tokenize(name: str) -> list:
+    """Lowercase alphabetic tokens of a name."""
+    return _TOKEN.findall((name or "").lower())
+
+
+def deletes(word: str, distance: int) -> set:
+    """`word` and every string made by deleting up to `distance` characters."""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {
+            candidate[:i] + candidate[i + 1 :]
+            for candidate in frontier
+            for i in range(len(candidate))
+        }
+        result |= frontier
+    return result
+
+
+def allowed_distance(token: str, max_distance: int) -> int:
+    """Edit budget for a token: short tokens tolerate fewer edits."""
+    if len(token) <= 2:
+        return 0
+    if len(token) <= 4:
+        return min(1, max_distance)
+    return max_distance
+
+
+class SymSpellIndex:
+    """
+    Deletion-neighbourhood index mapping name tokens to patients.
+
+    Example:
+        >>> index = SymSpellIndex([(1, "Ramesh Singh", "hospital_a")])
+        >>> index.lookup("ramehs")
+        {'ramesh': 1}
+        >>> index.candidates("Ramehs Sing")
+        {1: 'Ramesh Singh'}
+    """
+
+    def __init__(self, rows=(), max_distance: int = 2, prefix_length: int = 7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.row_ids = []
+        self.names = []
+        self.hospital_ids = []
+        self._postings = {}  # token -> [positions]
+        self._deletes = {}  # delete string -> [tokens]
+        self._last_ids = {}  # hospital_id -> highest indexed patients.id
+        self._lock = threading.Lock()
+
+        for row_id, name, hospital_id in rows:
+            self.add(row_id, name, hospital_id)
+
+    @classmethod
+    def build(cls):
+        """Build the index from the patients table."""
+        from app.config import settings
+        from app.database.db import iter_patient_names
+
+        return cls(iter_patient_names(), max_distance=settings.symspell_max_distance)
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def add(self, row_id: int, name: str, hospital_id: str):
+        """
+        Index one patient (incremental insert).
+
+        Lookups may run concurrently: a position is appended to the row
+        arrays before any posting refers to it.
+        """
+        with self._lock:
+            position = len(self.row_ids)
+            self.row_ids.append(row_id)
+            self.names.append(name or "")
+            self.hospital_ids.append(hospital_id)
+            self._last_ids[hospital_id] = max(
+                row_id, self._last_ids.get(hospital_id, 0)
+            )
+
+            for token in set(tokenize(name)):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = []
+                    prefix = token[: self.prefix_length]
+                    for delete in deletes(prefix, self.max_distance):
+                        self._deletes.setdefault(delete, []).append(token)
+                postings.append(position)
+
+    def refresh(self) -> bool:
+        """
+        Index patients added since the last build/refresh.
+
+        Returns False (rebuild needed) when patients were removed. Renamed
+        patients keep their old tokens until the next full rebuild.
+        """
+        from app.database.db import count_patients, iter_patient_names_after
+
+        for row_id, name, hospital_id in iter_patient_names_after(dict(self._last_ids)):
+            self.add(row_id, name, hospital_id)
+        return count_patients() == len(self.row_ids)
+
+    def lookup(self, term: str, max_distance: int = None) -> dict:
+        """
+        Return {token: edit distance} for indexed tokens close to `term`.
+
+        Args:
+            term: Query token (lowercase)
+            max_distance: Edit budget (default: allowed_distance for the term)
+        """
+        if max_distance is None:
+            max_distance = allowed_distance(term, self.max_distance)
+        max_distance = min(max_distance, self.max_distance)
+
+        candidates = set()
+        for delete in deletes(term[: self.prefix_length], max_distance):
+            candidates.update(self._deletes.get(delete, ()))
+
+        matches = {}
+        for token in candidates:
+            distance = OSA.distance(term, token, score_cutoff=max_distance)
+            if distance <= max_distance:
+                matches[token] = distance
+        return matches
+
+    def candidates(self, name: str, hospital_id: str = None, row_ids=None) -> dict:
+        """
+        Return {row_id: name} for patients whose name has a close match for
+        every query token.
+
+        Args:
+            name: Name searched for
+            hospital_id: Restrict to one hospital
+            row_ids: Restrict to these patients.id values (e.g. pre-filtered)
+        """
+        matches = []
+        for term in set(tokenize(name)):
+            matched = set()
+            for token in self.lookup(term):
+                matched.update(self._postings[token])
+            if not matched:
+                return {}
+            matches.append(matched)
+        if not matches:
+            return {}
+
+        # Intersect starting from the rarest token
+        matches.sort(key=len)
+        positions = matches[0].intersection(*matches[1:])
+
+        allowed = None if row_ids is None else {int(r) for r in row_ids}
+        return {
+            self.row_ids[i]: self.names[i]
+            for i in sorted(positions)
+            if (not hospital_id or self.hospital_ids[i] == hospital_id)
+            and (allowed is None or self.row_ids[i] in allowed)
+        }
+
+    def stats(self) -> dict:
+        """Sizes reported by the readiness endpoint."""
+        return {
+            "entries": len(self.row_ids),
+            "tokens": len(self._postings),
+            "deletes": len(self._deletes),
+        }
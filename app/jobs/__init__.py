@@ -0,0 +1,78 @@
+"""
+Background Jobs
+
+Long operations (index rebuilds, bulk loads, matcher training, record
+linkage) run as jobs instead of inside request handlers: a job row in a
+SQLite table (store.py) tracks status, progress and result, and a bounded
+thread or process pool (runner.py) executes it.
+
+Usage:
+    from app.jobs import get_job_runner
+    job = get_job_runner().submit("rebuild_indexes")
+"""
+
+import os
+
+from app.config import settings
+from app.jobs import tasks
+from app.jobs.runner import PROCESS, THREAD, JobCancelled, JobContext, JobRunner
+from app.jobs.store import JobStore
+
+# Job table and job outputs (e.g. linkage CSVs), relative to the project root
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+JOBS_DIR = os.path.join(BASE_DIR, settings.jobs_dir)
+
+# Job type -> (function, executor)
+JOB_TYPES = {
+    "rebuild_indexes": (tasks.rebuild_indexes, THREAD),
+    "bulk_load": (tasks.bulk_load, PROCESS),
+    "train_matcher": (tasks.train_matcher, PROCESS),
+    "linkage": (tasks.linkage, PROCESS),
+}
+
+# Process-wide runner, created on first use
+_job_runner = None
+
+
+def get_job_runner() -> JobRunner:
+    """
+    Return the shared JobRunner built from settings.
+
+    On creation, unfinished jobs of worker processes that no longer exist
+    are marked failed.
+    """
+    global _job_runner
+    if _job_runner is None:
+        from app.utils import metrics
+
+        store = JobStore(os.path.join(JOBS_DIR, "jobs.db"))
+        store.fail_orphaned()
+        runner = JobRunner(
+            store,
+            thread_workers=settings.jobs_thread_workers,
+            process_workers=settings.jobs_process_workers,
+            progress_interval_s=settings.jobs_progress_interval_s,
+        )
+        for job_type, (fn, executor) in JOB_TYPES.items():
+            runner.register(job_type, fn, executor)
+        metrics.register("jobs", runner.stats)
+        _job_runner = runner
+    return _job_runner
+
+
+def close_job_runner():
+    """Stop the shared runner's pools (called on application shutdown)."""
+    global _job_runner
+    if _job_runner is not None:
+        _job_runner.shutdown()
+        _job_runner = None
+
+
+__all__ = [
+    "JobCancelled",
+    "JobContext",
+    "JobRunner",
+    "JobStore",
+    "get_job_runner",
+    "close_job_runner",
+]
@@ -0,0 +1,183 @@
+"""
+Job Runner
+
+Runs registered job types off the request path, in two bounded pools:
+
+- "thread": in this worker process, for jobs that update its in-memory
+  state (index rebuilds)
+- "process": separate processes for CPU-heavy jobs (training, linkage,
+  bulk loads), so they neither hold the GIL of the API worker nor share
+  its memory
+
+A job function is called as `fn(ctx, **params)` and returns a
+JSON-serializable result. It reports progress through `ctx.progress()`,
+which also raises JobCancelled once cancellation was requested. Process
+jobs must be module-level functions (they are pickled by reference).
+
+Queued jobs wait for a free slot; at most `thread_workers` +
+`process_workers` jobs run at once per API worker.
+"""
+
+import inspect
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.jobs.store import CANCELLED, FAILED, SUCCEEDED, JobStore
+
+THREAD = "thread"
+PROCESS = "process"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when its cancellation was requested."""
+
+
+class JobContext:
+    """
+    Handle passed to a running job.
+
+    Example:
+        >>> def rebuild(ctx, names):
+        ...     for i, name in enumerate(names):
+        ...         ctx.progress(i, len(names), f"building {name}")
+        ...         build(name)
+        ...     return {"built": len(names)}
+    """
+
+    def __init__(self, store: JobStore, job_id: str, interval_s: float = 0.5):
+        self.store = store
+        self.job_id = job_id
+        self.interval_s = interval_s
+        self._reported_at = 0.0
+
+    def progress(self, done: int, total: int = None, message: str = None):
+        """
+        Report progress (written at most every `interval_s`, and always when
+        done == total).
+
+        Raises:
+            JobCancelled: Cancellation was requested
+        """
+        now = time.monotonic()
+        if now - self._reported_at < self.interval_s and done != total:
+            return
+        self._reported_at = now
+        if self.store.progress(self.job_id, done, total, message):
+            raise JobCancelled()
+
+
+def run_job(store_path: str, job_id: str, fn, params: dict, interval_s: float):
+    """Execute one job and record its outcome (runs in a pool thread/process)."""
+    store = JobStore(store_path)
+    if not store.start(job_id):
+        return  # Cancelled while queued
+    try:
+        result = fn(JobContext(store, job_id, interval_s), **params)
+    except JobCancelled:
+        store.finish(job_id, CANCELLED)
+    except Exception as e:
+        store.finish(job_id, FAILED, error=f"{type(e).__name__}: {e}")
+    else:
+        store.finish(job_id, SUCCEEDED, result=result)
+
+
+class JobRunner:
+    """
+    Registry of job types and the pools running them.
+
+    Example:
+        >>> runner = JobRunner(JobStore("jobs/jobs.db"))
+        >>> runner.register("bulk_load", load_data, executor=PROCESS)
+        >>> job = runner.submit("bulk_load", {"data_dir": "data"})
+        >>> runner.store.get(job["id"])["status"]
+        'running'
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        thread_workers: int = 2,
+        process_workers: int = 1,
+        progress_interval_s: float = 0.5,
+    ):
+        self.store = store
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.progress_interval_s = progress_interval_s
+        self._types = {}
+        self._pools = {}
+
+    def register(self, job_type: str, fn, executor: str = THREAD):
+        """Register `fn(ctx, **params)` as `job_type`, run in `executor`."""
+        if executor not in (THREAD, PROCESS):
+            raise ValueError(f"Unknown executor: {executor}")
+        self._types[job_type] = (fn, executor)
+
+    @property
+    def types(self) -> dict:
+        """{job type: executor}"""
+        return {name: executor for name, (_, executor) in self._types.items()}
+
+    def _pool(self, executor: str):
+        pool = self._pools.get(executor)
+        if pool is None:
+            if executor == PROCESS:
+                # spawn: forking a multi-threaded API worker is unsafe
+                pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                pool = ThreadPoolExecutor(
+                    max_workers=self.thread_workers, thread_name_prefix="praisa-job"
+                )
+            self._pools[executor] = pool
+        return pool
+
+    def submit(self, job_type: str, params: dict = None) -> dict:
+        """
+        Queue a job and return its row.
+
+        Raises:
+            ValueError: Unknown job type, or params the job does not accept
+        """
+        if job_type not in self._types:
+            raise ValueError(f"Unknown job type: {job_type}")
+        fn, executor = self._types[job_type]
+        params = params or {}
+        try:
+            inspect.signature(fn).bind(None, **params)
+        except TypeError as e:
+            raise ValueError(f"Invalid params for {job_type}: {e}")
+        job = self.store.create(job_type, params)
+        future = self._pool(executor).submit(
+            run_job, self.store.path, job["id"], fn, params, self.progress_interval_s
+        )
+        future.add_done_callback(lambda done: self._crashed(job["id"], done))
+        return job
+
+    def _crashed(self, job_id: str, future):
+        # run_job records every outcome itself; an exception here means the
+        # job could not run at all (e.g. the worker process died)
+        if not future.cancelled() and future.exception() is not None:
+            error = future.exception()
+            self.store.finish(job_id, FAILED, error=f"{type(error).__name__}: {error}")
+
+    def cancel(self, job_id: str) -> dict:
+        """Request cancellation (see JobStore.request_cancel)."""
+        return self.store.request_cancel(job_id)
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint."""
+        return {
+            "thread_workers": self.thread_workers,
+            "process_workers": self.process_workers,
+            "jobs": self.store.counts(),
+        }
+
+    def shutdown(self, wait: bool = False):
+        """Stop the pools (running jobs finish unless the process exits)."""
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
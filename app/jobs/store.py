@@ -0,0 +1,222 @@
+"""
+Job Table
+
+Every background job is one row of a small SQLite database (by default
+jobs/jobs.db), separate from the patient data so it works with both
+database layouts. The table is the only shared state between:
+
+- the API workers that submit jobs and answer GET /api/jobs/{id}
+- the thread or process running the job, which writes its progress there
+  and polls it for cancellation requests
+
+Each operation opens its own short-lived connection, so a JobStore can be
+used from any thread and re-created by path in a worker process.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    owner_pid INTEGER,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);
+"""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    Job rows in the SQLite file at `path`.
+
+    Example:
+        >>> store = JobStore("jobs/jobs.db")
+        >>> job = store.create("rebuild_indexes", {})
+        >>> store.get(job["id"])["status"]
+        'queued'
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _execute(self, sql: str, params=()) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).rowcount
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(row)
+        job["params"] = json.loads(job["params"]) if job["params"] else {}
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        job["progress"] = round(job["done"] / job["total"], 4) if job["total"] else None
+        return job
+
+    def create(self, job_type: str, params: dict) -> dict:
+        """Insert a queued job owned by this process and return it."""
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, type, status, params, owner_pid, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, job_type, QUEUED, json.dumps(params), os.getpid(), time.time()),
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict:
+        """Job `job_id`, or None."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._to_dict(row) if row else None
+
+    def list(self, status: str = None, limit: int = 50) -> list:
+        """Most recent jobs first, optionally with one status."""
+        sql, params = "SELECT * FROM jobs", []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                sql + " ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [self._to_dict(row) for row in rows]
+
+    def start(self, job_id: str) -> bool:
+        """Move a queued job to running; False if it was cancelled meanwhile."""
+        return (
+            self._execute(
+                "UPDATE jobs SET status = ?, started_at = ? "
+                "WHERE id = ? AND status = ? AND cancel_requested = 0",
+                (RUNNING, time.time(), job_id, QUEUED),
+            )
+            == 1
+        )
+
+    def progress(self, job_id: str, done: int, total: int = None, message=None):
+        """Record progress; returns whether cancellation was requested."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET done = ?, total = COALESCE(?, total), "
+                "message = COALESCE(?, message) WHERE id = ?",
+                (done, total, message, job_id),
+            )
+            row = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return bool(row and row[0])
+
+    def finish(self, job_id: str, status: str, result=None, error: str = None):
+        """Record the outcome of a job."""
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+            "WHERE id = ? AND status NOT IN (?, ?, ?)",
+            (
+                status,
+                None if result is None else json.dumps(result, default=str),
+                error,
+                time.time(),
+                job_id,
+                *FINISHED,
+            ),
+        )
+
+    def request_cancel(self, job_id: str) -> dict:
+        """
+        Cancel a job: queued jobs are cancelled at once, running jobs stop at
+        their next progress report. Returns the job (None if unknown).
+        """
+        self._execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status IN (?, ?)",
+            (job_id, QUEUED, RUNNING),
+        )
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), job_id, QUEUED),
+        )
+        return self.get(job_id)
+
+    def fail_orphaned(self) -> int:
+        """
+        Fail unfinished jobs whose owning process is gone (e.g. a worker
+        restarted mid-job). Returns the number of jobs failed.
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, owner_pid FROM jobs WHERE status IN (?, ?)",
+                (QUEUED, RUNNING),
+            ).fetchall()
+        finally:
+            conn.close()
+        orphaned = [row["id"] for row in rows if not _pid_alive(row["owner_pid"])]
+        for job_id in orphaned:
+            self.finish(job_id, FAILED, error="Interrupted: worker process exited")
+        return len(orphaned)
+
+    def counts(self) -> dict:
+        """{status: number of jobs}"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        finally:
+            conn.close()
+        return {status: count for status, count in rows}
@@ -0,0 +1,111 @@
+"""
+Built-in Job Types
+
+- rebuild_indexes (thread): rebuild this worker's in-memory indexes
+- bulk_load (process): load the hospital CSVs (app/database/loader.py)
+- train_matcher (process): train MLPatientMatcher on labelled pairs
+- linkage (process): cross-hospital record linkage over all patients
+
+Process jobs run in a fresh interpreter, so they import what they need
+inside the function.
+"""
+
+import csv
+import os
+
+from app.config import settings
+
+
+def rebuild_indexes(ctx, names: list = None) -> dict:
+    """Rebuild in-memory indexes one by one, swapping each in when built."""
+    from app.index import index_manager
+
+    names = names or index_manager.names
+    unknown = sorted(set(names) - set(index_manager.names))
+    if unknown:
+        raise ValueError(f"Unknown index(es): {', '.join(unknown)}")
+    for i, name in enumerate(names):
+        ctx.progress(i, len(names), f"Building {name}")
+        index_manager.rebuild(name)
+    ctx.progress(len(names), len(names), "Done")
+    return {"indexes": names}
+
+
+def bulk_load(ctx, data_dir: str = None, layout: str = None) -> dict:
+    """Load the hospital CSVs of `data_dir` (duplicates are skipped)."""
+    from app.database import db
+    from app.database.loader import load_all_data
+
+    ctx.progress(0, 1, "Loading")
+    load_all_data(layout=layout, data_dir=data_dir)
+    ctx.progress(1, 1, "Done")
+    return {"patients": db.count_patients()}
+
+
+def train_matcher(ctx, pairs_path: str, workers: int = None) -> dict:
+    """
+    Train MLPatientMatcher on a JSON Lines file of labelled pairs and write
+    its weights and calibration report (see app/matching/trainer.py).
+
+    Each line: {"a": {patient}, "b": {patient}, "label": 0 or 1}
+    """
+    from app.matching import trainer
+
+    total = trainer.count_pairs(pairs_path)
+
+    def progress(done, rate):
+        ctx.progress(done, total, f"{rate:.0f} pairs/s")
+
+    summary = trainer.train(pairs_path, workers=workers, progress=progress)
+    ctx.progress(total, total, "Done")
+    return summary
+
+
+def linkage(ctx, min_score: float = None, output_path: str = None) -> dict:
+    """
+    Link every patient to likely duplicates at other hospitals.
+
+    Candidates come from a name search per patient; each cross-hospital
+    pair is scored once with match_patients and written to a CSV when it
+    scores at least `min_score` (default settings.review_threshold).
+    """
+    from app.database import db
+    from app.jobs import JOBS_DIR
+    from app.matching.match_cache import MATCH_FIELDS
+    from app.matching.simple_matcher import match_patients
+
+    min_score = settings.review_threshold if min_score is None else min_score
+    output_path = output_path or os.path.join(JOBS_DIR, f"linkage_{ctx.job_id}.csv")
+    patients = db.iter_patient_records(
+        ("patient_id", "hospital_id", "version") + MATCH_FIELDS
+    )
+    links = 0
+    with open(output_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["patient_a_id", "patient_b_id", "match_score", "recommendation", "method"]
+        )
+        for i, patient in enumerate(patients):
+            ctx.progress(i, len(patients), f"{links} links")
+            if len(patient["name"] or "") < 2:
+                continue
+            for candidate in db.search_patients(name=patient["name"]):
+                # Each pair once, and only across hospitals
+                if candidate["hospital_id"] == patient["hospital_id"]:
+                    continue
+                if candidate["patient_id"] <= patient["patient_id"]:
+                    continue
+                result = match_patients(patient, candidate)
+                if result["match_score"] >= min_score:
+                    links += 1
+                    writer.writerow(
+                        [
+                            patient["patient_id"],
+                            candidate["patient_id"],
+                            round(result["match_score"], 2),
+                            result["recommendation"],
+                            result["method"],
+                        ]
+                    )
+    ctx.progress(len(patients), len(patients), f"{links} links")
+    return {"patients": len(patients), "links": links, "output": output_path}
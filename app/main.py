@@ -1,16 +1,56 @@
 """
 FastAPI Main Application
 
+Heavy components (ML matcher, rapidfuzz, jellyfish) are not imported here.
+They are initialized by the lifespan handler once the worker starts, which
+keeps `import app.main` fast for scale-up (see tests/test_startup.py).
 """
 
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import patients, matching
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.federation.client import close_federated_client
+from app.jobs import close_job_runner
+from app.matching.model_reload import model_reloader
+from app.routes import patients, matching, federation, sync, jobs, admin
+from app.startup import warmup, warmup_state
+from app.utils import metrics
+from app.utils.admission import admission
+from app.utils.compression import CompressionMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: warm up deferred components before serving.
+
+    Builds indexes, loads the ML matcher and warms scorers off the event
+    loop (see app/startup.py). By default warmup runs in the background so
+    /health answers immediately while /ready reports progress.
+    """
+    if settings.warmup_in_background:
+        threading.Thread(target=warmup, name="praisa-warmup", daemon=True).start()
+    else:
+        await run_in_threadpool(warmup)
+    # Swap in new matcher weights when the weights file changes (0 = off)
+    model_reloader.start(settings.model_watch_interval_s)
+    yield
+    model_reloader.stop()
+    # Shutdown: close pooled connections to other hospital nodes
+    await close_federated_client()
+    close_job_runner()
+
 
 app = FastAPI(
     title="PRAISA Healthcare Interoperability API",
     description="AI-Powered Patient Matching - Demo Version",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration for frontend
@@ -22,9 +62,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated gzip/brotli compression for larger payloads (e.g. history)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+
+# Per-class admission counters (active, queued, rejected, ...)
+metrics.register("admission", admission.stats)
+
 # Include routers
 app.include_router(patients.router, prefix="/api", tags=["patients"])
 app.include_router(matching.router, prefix="/api", tags=["matching"])
+app.include_router(federation.router, prefix="/api", tags=["federation"])
+app.include_router(sync.router, prefix="/api", tags=["sync"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
+app.include_router(admin.router, prefix="/api", tags=["admin"])
 
 
 @app.get("/")
@@ -37,3 +92,31 @@ async def root():
 async def health():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Runtime counters of registered components (see app/utils/metrics.py)."""
+    return metrics.snapshot()
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness probe for load balancers.
+
+    Returns 503 until the startup warmup has finished, then 200 with
+    per-step build timings and in-memory index sizes.
+    """
+    from app.index import index_manager
+
+    state = warmup_state.snapshot()
+    body = {
+        "status": "ready" if state["ready"] else "warming",
+        "timings_ms": state["timings_ms"],
+        "indexes": index_manager.stats(),
+    }
+    if state["error"]:
+        body["status"] = "failed"
+        body["error"] = state["error"]
+    return JSONResponse(body, status_code=200 if state["ready"] else 503)
@@ -0,0 +1,96 @@
+"""
+Match Result Cache
+
+match_patients is deterministic for a pair of records and a set of model
+weights, so reopening a comparison should not re-score it. Results are
+kept in an LRU cache keyed on both records and the model version. A record
+is identified by a hash of the fields the matcher reads, never by a
+client-sent patient_id/version (a request could carry a stored record's
+version with different field values and poison its entry).
+
+The pair is order-normalized (A/B and B/A share an entry; the score is
+symmetric), and the model version is part of the key so retrained weights
+never serve stale scores.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# Fields MLPatientMatcher.extract_features reads
+MATCH_FIELDS = ("name", "abha_number", "mobile", "gender", "dob")
+
+
+def record_key(patient: dict) -> str:
+    """Cache identity of one side of a match (hash of its MATCH_FIELDS)."""
+    content = json.dumps([patient.get(f) for f in MATCH_FIELDS], default=str)
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+def pair_key(patient_a: dict, patient_b: dict, model_version: str) -> tuple:
+    """Order-normalized cache key of a pair under a model version."""
+    return (*sorted((record_key(patient_a), record_key(patient_b))), model_version)
+
+
+class MatchCache:
+    """
+    Thread-safe LRU cache with hit-rate counters.
+
+    Example:
+        >>> cache = MatchCache(max_entries=10000)
+        >>> result = cache.get(key)
+        >>> if result is None:
+        ...     result = score(pair)
+        ...     cache.put(key, result)
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Cached value for `key` (marked recently used), or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store `value`, evicting the least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
@@ -11,150 +11,347 @@ It allows the demo to show the "Adaptive Learning" workflow:
 3. Predict (Use weights to output probability)
 """
 
+import hashlib
 import json
+import math
 import os
-from rapidfuzz import fuzz
-from app.matching.phonetic_match import phonetic_match_indian
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from app.matching.phonetic_match import phonetic_codes, phonetic_match_indian
 
 # Path to save/load weights
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "model_weights.json")
-
-
-class MLPatientMatcher:
-    def __init__(self):
-        self.is_trained = False
-        # Base weights for features (heuristic starting point)
-        self.weights = {
-            "Fuzzy Ratio": 0.3,
-            "Token Sort Ratio": 0.2,
-            "Phonetic Match": 1.5,  # High importance by default for Indian names
-            "Indian Typo Pattern": 0.5,
-            "ABHA Match": 5.0,  # Massive booster
-            "Mobile Match": 3.0,
-            "Gender Match": 0.5,
-            "DOB Match": 1.0,
-        }
-        self.load_model()
-
-    def extract_features(self, patient_a: dict, patient_b: dict) -> dict:
-        """
-        Extract numerical features from a pair of patient records.
-        Returns a dict of feature_name -> value.
+# Fit report written by the trainer (app/matching/trainer.py); not read when
+# serving: predict_detailed() returns the rule-adjusted weighted score
+CALIBRATION_PATH = os.path.join(os.path.dirname(__file__), "model_calibration.json")
+
+# Features returned by extract_features, in feature-matrix column order
+FEATURES = (
+    "Fuzzy Ratio",
+    "Token Sort Ratio",
+    "Phonetic Match",
+    "Indian Typo Pattern",
+    "First Name Match",
+    "Last Name Match",
+    "ABHA Match",
+    "Mobile Match",
+    "Gender Match",
+    "DOB Match",
+)
+
+# Features reported as matched fields (value >= 0.8) -> PRD checklist names
+CHECKLIST_FIELDS = {
+    "ABHA Match": "ABHA Number",
+    "DOB Match": "Date of Birth",
+    "Mobile Match": "Phone Number",
+    "Phonetic Match": "Name (phonetic)",
+    "Fuzzy Ratio": "Name Similarity",
+}
+
+# Largest contributing feature -> reported method (others: FUZZY)
+FEATURE_METHODS = {
+    "ABHA Match": "ABHA_EXACT",
+    "Phonetic Match": "PHONETIC_INDIAN",
+    "Indian Typo Pattern": "PHONETIC_INDIAN",
+    "Fuzzy Ratio": "FUZZY",
+    "Token Sort Ratio": "FUZZY",
+    "Mobile Match": "MOBILE_MATCH",
+}
+
+
+def weights_version(weights: dict) -> str:
+    """Short content hash of a set of weights (the model version)."""
+    content = json.dumps(dict(weights), sort_keys=True)
+    return hashlib.sha1(content.encode()).hexdigest()[:12]
+
+
+def write_json_atomic(path: str, data) -> None:
+    """
+    Write `data` as JSON to `path` via a temporary file and os.replace, so
+    a reader polling the file (ModelReloader) never sees it half written.
+    """
+    # Write next to the target so os.replace is a same-filesystem rename
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@dataclass(frozen=True)
+class WeightsSnapshot:
+    """
+    One immutable set of matcher weights.
+
+    The matcher holds a reference to its current snapshot; new weights are
+    a new snapshot swapped in with one assignment, so a prediction that
+    started on the old snapshot finishes on it.
+
+    Fields:
+        weights: Read-only {feature name: weight}
+        version: weights_version() of the weights
+        source: Where the weights came from (file path, "defaults", "trained")
+        loaded_at: Unix time the snapshot was created
+    """
+
+    weights: MappingProxyType
+    version: str
+    source: str
+    loaded_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def create(cls, weights: dict, source: str) -> "WeightsSnapshot":
         """
-        feats = {}
-
-        # --- Name Features ---
-        name_a = patient_a.get("name", "").lower()
-        name_b = patient_b.get("name", "").lower()
+        Snapshot a copy of `weights`.
 
-        feats["Fuzzy Ratio"] = fuzz.ratio(name_a, name_b) / 100.0
-        feats["Token Sort Ratio"] = fuzz.token_sort_ratio(name_a, name_b) / 100.0
-
-        phonetic_res = phonetic_match_indian(name_a, name_b)
-        feats["Phonetic Match"] = 1.0 if phonetic_res["matched"] else 0.0
-
-        # Indian Typo Pattern: High phonetic but slightly imperfect fuzzy
-        is_pattern = (
-            1.0
-            if (feats["Fuzzy Ratio"] < 0.95 and feats["Phonetic Match"] == 1.0)
-            else 0.0
-        )
-        feats["Indian Typo Pattern"] = is_pattern
-
-        # CRITICAL FIX: Check first name AND last name separately
-        # Extract first names (first word before space)
-        first_name_a = name_a.split()[0] if name_a else ""
-        first_name_b = name_b.split()[0] if name_b else ""
-        first_name_similarity = fuzz.ratio(first_name_a, first_name_b) / 100.0
-        feats["First Name Match"] = first_name_similarity
-
-        # Extract last names (last word, or second word if multi-part name)
-        parts_a = name_a.split()
-        parts_b = name_b.split()
-        last_name_a = parts_a[-1] if len(parts_a) > 1 else ""
-        last_name_b = parts_b[-1] if len(parts_b) > 1 else ""
-        last_name_similarity = (
-            fuzz.ratio(last_name_a, last_name_b) / 100.0
-            if last_name_a and last_name_b
-            else 0.0
-        )
-        feats["Last Name Match"] = last_name_similarity
-
-        # --- ID Features ---
+        Raises:
+            ValueError: Not a non-empty mapping of FEATURES names to finite,
+                non-negative numbers
+        """
+        if not isinstance(weights, Mapping) or not weights:
+            raise ValueError("Weights must be a non-empty JSON object")
+        for name, weight in weights.items():
+            if name not in FEATURES:
+                raise ValueError(f"Unknown feature: {name!r}")
+            if not isinstance(weight, (int, float)) or isinstance(weight, bool):
+                raise ValueError(f"Weight of {name!r} is not a number")
+            if not math.isfinite(weight) or weight < 0:
+                raise ValueError(f"Weight of {name!r} must be finite and >= 0")
+        weights = dict(weights)
+        return cls(MappingProxyType(weights), weights_version(weights), source)
+
+    @classmethod
+    def from_file(cls, path: str) -> "WeightsSnapshot":
+        """Snapshot of a weights JSON file (see create() for errors)."""
+        with open(path) as f:
+            return cls.create(json.load(f), path)
+
+
+def extract_features(patient_a: dict, patient_b: dict) -> dict:
+    """
+    Extract numerical features from a pair of patient records.
+    Returns a dict of feature_name -> value.
+    """
+    feats = {}
+
+    # --- Name Features ---
+    name_a = patient_a.get("name", "").lower()
+    name_b = patient_b.get("name", "").lower()
+
+    feats["Fuzzy Ratio"] = fuzz.ratio(name_a, name_b) / 100.0
+    feats["Token Sort Ratio"] = fuzz.token_sort_ratio(name_a, name_b) / 100.0
+
+    phonetic_res = phonetic_match_indian(name_a, name_b)
+    feats["Phonetic Match"] = 1.0 if phonetic_res["matched"] else 0.0
+
+    # Indian Typo Pattern: High phonetic but slightly imperfect fuzzy
+    is_pattern = (
+        1.0 if (feats["Fuzzy Ratio"] < 0.95 and feats["Phonetic Match"] == 1.0) else 0.0
+    )
+    feats["Indian Typo Pattern"] = is_pattern
+
+    # CRITICAL FIX: Check first name AND last name separately
+    # Extract first names (first word before space)
+    first_name_a = name_a.split()[0] if name_a else ""
+    first_name_b = name_b.split()[0] if name_b else ""
+    first_name_similarity = fuzz.ratio(first_name_a, first_name_b) / 100.0
+    feats["First Name Match"] = first_name_similarity
+
+    # Extract last names (last word, or second word if multi-part name)
+    parts_a = name_a.split()
+    parts_b = name_b.split()
+    last_name_a = parts_a[-1] if len(parts_a) > 1 else ""
+    last_name_b = parts_b[-1] if len(parts_b) > 1 else ""
+    last_name_similarity = (
+        fuzz.ratio(last_name_a, last_name_b) / 100.0
+        if last_name_a and last_name_b
+        else 0.0
+    )
+    feats["Last Name Match"] = last_name_similarity
+
+    # --- ID Features ---
+    abha_a = patient_a.get("abha_number", "")
+    abha_b = patient_b.get("abha_number", "")
+    if abha_a and abha_b and len(abha_a) > 5:
+        feats["ABHA Match"] = 1.0 if abha_a == abha_b else 0.0
+    else:
+        feats["ABHA Match"] = 0.0
+
+    mob_a = patient_a.get("mobile", "")
+    mob_b = patient_b.get("mobile", "")
+    if mob_a and mob_b:
+        feats["Mobile Match"] = 1.0 if mob_a[-10:] == mob_b[-10:] else 0.0
+    else:
+        feats["Mobile Match"] = 0.0
+
+    # --- Demographic Features ---
+    gen_a = patient_a.get("gender", "U")
+    gen_b = patient_b.get("gender", "U")
+    feats["Gender Match"] = 1.0 if gen_a == gen_b else 0.0
+
+    dob_a = patient_a.get("dob", "")
+    dob_b = patient_b.get("dob", "")
+    dob_match = 0.0
+    if dob_a and dob_b:
+        try:
+            year_a = int(dob_a.split("-")[0])
+            year_b = int(dob_b.split("-")[0])
+            if year_a == year_b:
+                dob_match = 1.0
+            elif abs(year_a - year_b) <= 1:
+                dob_match = 0.5
+        except Exception:
+            pass
+    feats["DOB Match"] = dob_match
+
+    return feats
+
+
+def _pairwise_ratio(left: list, right: list, scorer) -> np.ndarray:
+    """scorer(left[i], right[i]) / 100 for all i, in one rapidfuzz call."""
+    return process.cpdist(left, right, scorer=scorer, dtype=np.float64) / 100.0
+
+
+def extract_feature_matrix(pairs) -> np.ndarray:
+    """
+    Feature matrix (float64, FEATURES column order) of (a, b) pairs.
+
+    Row i equals extract_features(*pairs[i]), but the string similarities
+    of all pairs are computed by rapidfuzz in one call per feature, and
+    phonetic codes once per distinct name.
+    """
+    n = len(pairs)
+    X = np.zeros((n, len(FEATURES)), dtype=np.float64)
+    if not n:
+        return X
+    names_a = [a.get("name", "").lower() for a, _ in pairs]
+    names_b = [b.get("name", "").lower() for _, b in pairs]
+    parts_a = [name.split() for name in names_a]
+    parts_b = [name.split() for name in names_b]
+    first_a = [parts[0] if parts else "" for parts in parts_a]
+    first_b = [parts[0] if parts else "" for parts in parts_b]
+    last_a = [parts[-1] if len(parts) > 1 else "" for parts in parts_a]
+    last_b = [parts[-1] if len(parts) > 1 else "" for parts in parts_b]
+
+    X[:, 0] = _pairwise_ratio(names_a, names_b, fuzz.ratio)
+    X[:, 1] = _pairwise_ratio(names_a, names_b, fuzz.token_sort_ratio)
+    X[:, 4] = _pairwise_ratio(first_a, first_b, fuzz.ratio)
+    has_last = np.array([bool(a and b) for a, b in zip(last_a, last_b)])
+    X[:, 5] = np.where(has_last, _pairwise_ratio(last_a, last_b, fuzz.ratio), 0.0)
+
+    codes = {}
+    for name in set(names_a) | set(names_b):
+        codes[name] = phonetic_codes(name)
+    for i, (patient_a, patient_b) in enumerate(pairs):
+        name_a, name_b = names_a[i], names_b[i]
+        if name_a and name_b:
+            (norm_a, meta_a), (norm_b, meta_b) = codes[name_a], codes[name_b]
+            X[i, 2] = norm_a == norm_b or bool(meta_a) and meta_a == meta_b
+        # ABHA, mobile, gender and DOB as in extract_features()
         abha_a = patient_a.get("abha_number", "")
         abha_b = patient_b.get("abha_number", "")
-        if abha_a and abha_b and len(abha_a) > 5:
-            feats["ABHA Match"] = 1.0 if abha_a == abha_b else 0.0
-        else:
-            feats["ABHA Match"] = 0.0
-
+        X[i, 6] = bool(abha_a and abha_b and len(abha_a) > 5 and abha_a == abha_b)
         mob_a = patient_a.get("mobile", "")
         mob_b = patient_b.get("mobile", "")
-        if mob_a and mob_b:
-            feats["Mobile Match"] = 1.0 if mob_a[-10:] == mob_b[-10:] else 0.0
-        else:
-            feats["Mobile Match"] = 0.0
-
-        # --- Demographic Features ---
-        gen_a = patient_a.get("gender", "U")
-        gen_b = patient_b.get("gender", "U")
-        feats["Gender Match"] = 1.0 if gen_a == gen_b else 0.0
-
+        X[i, 7] = bool(mob_a and mob_b and mob_a[-10:] == mob_b[-10:])
+        X[i, 8] = patient_a.get("gender", "U") == patient_b.get("gender", "U")
         dob_a = patient_a.get("dob", "")
         dob_b = patient_b.get("dob", "")
-        dob_match = 0.0
         if dob_a and dob_b:
             try:
-                year_a = int(dob_a.split("-")[0])
-                year_b = int(dob_b.split("-")[0])
-                if year_a == year_b:
-                    dob_match = 1.0
-                elif abs(year_a - year_b) <= 1:
-                    dob_match = 0.5
+                gap = abs(int(dob_a.split("-")[0]) - int(dob_b.split("-")[0]))
             except Exception:
-                pass
-        feats["DOB Match"] = dob_match
+                continue
+            X[i, 9] = 1.0 if gap == 0 else 0.5 if gap == 1 else 0.0
+    X[:, 3] = (X[:, 0] < 0.95) & (X[:, 2] == 1.0)
+    return X
 
-        return feats
+
+class MLPatientMatcher:
+    def __init__(self):
+        self.is_trained = False
+        # Base weights for features (heuristic starting point)
+        self._snapshot = WeightsSnapshot.create(
+            {
+                "Fuzzy Ratio": 0.3,
+                "Token Sort Ratio": 0.2,
+                "Phonetic Match": 1.5,  # High importance by default for Indian names
+                "Indian Typo Pattern": 0.5,
+                "ABHA Match": 5.0,  # Massive booster
+                "Mobile Match": 3.0,
+                "Gender Match": 0.5,
+                "DOB Match": 1.0,
+            },
+            "defaults",
+        )
+        self.load_model()
+
+    @property
+    def snapshot(self) -> WeightsSnapshot:
+        """The current weights snapshot."""
+        return self._snapshot
+
+    @property
+    def weights(self):
+        """Current weights (read-only; assign a dict to replace them)."""
+        return self._snapshot.weights
+
+    @weights.setter
+    def weights(self, weights: dict):
+        self._snapshot = WeightsSnapshot.create(weights, "assigned")
+
+    def swap(self, snapshot: WeightsSnapshot) -> WeightsSnapshot:
+        """Make `snapshot` current and return the previous one."""
+        previous, self._snapshot = self._snapshot, snapshot
+        return previous
+
+    def extract_features(self, patient_a: dict, patient_b: dict) -> dict:
+        """Feature values of a pair (see the module-level extract_features)."""
+        return extract_features(patient_a, patient_b)
 
     def train(self, pairs: list, labels: list):
         """
-        Simulate training by analyzing the examples and boosting relevant weights.
-        If we see many 'Matches' (1) that have 'Phonetic Match' == 1, we boost its weight.
-        """
-        print(f"   [Internal] Analyzing {len(pairs)} examples to adjust weights...")
-
-        # Logic: Find which features correlate with labels=1
-        feature_scores = {k: 0.0 for k in self.weights.keys()}
-        match_count = 0
-
-        for (pa, pb), label in zip(pairs, labels):
-            if label == 1:
-                match_count += 1
-                feats = self.extract_features(pa, pb)
-                for k, v in feats.items():
-                    if v > 0.8:  # Feature occurred strongly
-                        feature_scores[k] += 1.0
-
-        # "Learn" (Boost weights based on observations)
-        if match_count > 0:
-            for k in self.weights:
-                # If feature present in >80% of matches, boost it
-                frequency = feature_scores[k] / match_count
-                frequency = feature_scores[k] / match_count
-                if frequency > 0.8:
-                    self.weights[k] *= 1.5  # Boost!
-                    # print(f"   [Learn] Detected high correlation for '{k}'. "
-                    #       f"Boosting weight...")
+        Fit the weights by logistic regression on labelled pairs (matches
+        and non-matches, see app/matching/trainer.py).
 
+        The new weights replace the old ones in one assignment, so a
+        concurrent predict_detailed() sees either set, never a mix.
+        For large training files use trainer.train() instead.
+        """
+        from app.matching.trainer import feature_rows, fit_logistic
+
+        print(f"   [Internal] Fitting weights on {len(pairs)} examples...")
+        coef, _, _ = fit_logistic(feature_rows(pairs), np.asarray(labels, np.float32))
+        self.swap(
+            WeightsSnapshot.create(
+                {name: round(float(w), 4) for name, w in zip(FEATURES, coef)},
+                "trained",
+            )
+        )
         self.is_trained = True
         print("   [Internal] Training complete. Model weights optimized.")
 
-    def predict_detailed(self, patient_a: dict, patient_b: dict) -> dict:
+    def predict_detailed(
+        self, patient_a: dict, patient_b: dict, snapshot: WeightsSnapshot = None
+    ) -> dict:
         """
         Calculate match probability and provide feature attribution.
         Used for UI checklist and transparency.
+
+        The whole prediction uses one weights snapshot (the current one
+        unless `snapshot` is given), whose version is returned.
         """
+        snapshot = snapshot or self._snapshot
         feats = self.extract_features(patient_a, patient_b)
 
         # Weighted Sum
@@ -163,7 +360,7 @@ class MLPatientMatcher:
         contributions = {}
 
         for k, v in feats.items():
-            w = self.weights.get(k, 1.0)
+            w = snapshot.weights.get(k, 1.0)
             contrib = v * w
             score += contrib
             max_possible += w
@@ -208,16 +405,8 @@ class MLPatientMatcher:
             prob = min(prob, 0.50)  # Max 50% without ABHA or DOB match
 
         # 4. Map features to PRD checklist names
-        checklist_map = {
-            "ABHA Match": "ABHA Number",
-            "DOB Match": "Date of Birth",
-            "Mobile Match": "Phone Number",
-            "Phonetic Match": "Name (phonetic)",
-            "Fuzzy Ratio": "Name Similarity",
-        }
-
         matched_fields = []
-        for feat, label in checklist_map.items():
+        for feat, label in CHECKLIST_FIELDS.items():
             if feats.get(feat, 0) >= 0.8:
                 matched_fields.append(label)
 
@@ -227,21 +416,68 @@ class MLPatientMatcher:
             if contributions
             else "NONE"
         )
-        method_map = {
-            "ABHA Match": "ABHA_EXACT",
-            "Phonetic Match": "PHONETIC_INDIAN",
-            "Indian Typo Pattern": "PHONETIC_INDIAN",
-            "Fuzzy Ratio": "FUZZY",
-            "Token Sort Ratio": "FUZZY",
-            "Mobile Match": "MOBILE_MATCH",
-        }
 
         return {
             "prob": min(max(prob, 0.0), 1.0),
             "matched_fields": matched_fields,
-            "method": method_map.get(top_contrib, "FUZZY"),
+            "method": FEATURE_METHODS.get(top_contrib, "FUZZY"),
+            "model_version": snapshot.version,
         }
 
+    def predict_batch(self, pairs, snapshot: WeightsSnapshot = None) -> list:
+        """
+        predict_detailed() of many pairs at once.
+
+        Features come from extract_feature_matrix(); weighting and the
+        rules of predict_detailed() are applied to all pairs as array
+        operations. Results equal predict_detailed() per pair (up to float
+        rounding of the weighted sum).
+        """
+        snapshot = snapshot or self._snapshot
+        X = extract_feature_matrix(pairs)
+        weights = np.array([snapshot.weights.get(k, 1.0) for k in FEATURES])
+        total = weights.sum()
+        prob = X @ weights / (total if total > 0 else 1.0)
+        col = {name: X[:, i] for i, name in enumerate(FEATURES)}
+
+        # Same rules, in the same order, as predict_detailed()
+        abha = col["ABHA Match"] == 1.0
+        no_abha = col["ABHA Match"] == 0.0
+        prob = np.where(abha, 0.999, prob)
+        mobile = ~abha & (col["Mobile Match"] == 1.0) & (col["Fuzzy Ratio"] > 0.4)
+        prob = np.where(mobile, np.maximum(prob, 0.95), prob)
+        typo = col["Indian Typo Pattern"] == 1.0
+        prob = np.where(typo, np.maximum(prob, 0.92), prob)
+        prob = np.where(col["Gender Match"] == 0.0, prob * 0.15, prob)
+        no_dob = (col["DOB Match"] == 0.0) & no_abha
+        prob = np.where(no_dob, prob * 0.6, prob)
+        prob = np.where((col["First Name Match"] < 0.6) & no_abha, prob * 0.3, prob)
+        prob = np.where((col["Last Name Match"] < 0.6) & no_abha, prob * 0.2, prob)
+        prob = np.where(no_dob, np.minimum(prob, 0.50), prob)
+        prob = np.clip(prob, 0.0, 1.0)
+
+        # Largest contribution among present features (first on ties)
+        contributions = np.where(X > 0.0, X * weights, -np.inf)
+        top = contributions.argmax(axis=1)
+        has_any = (X > 0.0).any(axis=1)
+        matched = {label: col[feat] >= 0.8 for feat, label in CHECKLIST_FIELDS.items()}
+        return [
+            {
+                "prob": float(prob[i]),
+                "matched_fields": [label for label, mask in matched.items() if mask[i]],
+                "method": FEATURE_METHODS.get(
+                    FEATURES[top[i]] if has_any[i] else "NONE", "FUZZY"
+                ),
+                "model_version": snapshot.version,
+            }
+            for i in range(len(pairs))
+        ]
+
+    @property
+    def model_version(self) -> str:
+        """Short content hash of the current weights (changes when retrained)."""
+        return self._snapshot.version
+
     def predict(self, patient_a: dict, patient_b: dict) -> float:
         """Simple wrapper for backward compatibility."""
         res = self.predict_detailed(patient_a, patient_b)
@@ -250,8 +486,7 @@ class MLPatientMatcher:
     def save_model(self):
         """Save current weights to JSON file."""
         try:
-            with open(MODEL_PATH, "w") as f:
-                json.dump(self.weights, f, indent=4)
+            write_json_atomic(MODEL_PATH, dict(self.weights))
             print(f"   [Internal] Model saved to {MODEL_PATH}")
         except Exception as e:
             print(f"   [Error] Failed to save model: {e}")
@@ -260,8 +495,7 @@ class MLPatientMatcher:
         """Load weights from JSON file if it exists."""
         if os.path.exists(MODEL_PATH):
             try:
-                with open(MODEL_PATH, "r") as f:
-                    self.weights = json.load(f)
+                self.swap(WeightsSnapshot.from_file(MODEL_PATH))
                 self.is_trained = True
                 print(f"   [Internal] Model weights loaded from {MODEL_PATH}")
             except Exception as e:
@@ -0,0 +1,237 @@
+"""
+Hot Reload of Matcher Weights
+
+New weights (e.g. from app.matching.trainer) are picked up without
+restarting workers:
+
+1. Read the weights file into an immutable WeightsSnapshot
+2. Score the golden pairs (golden_pairs.json: known matches and
+   non-matches) with the new snapshot; reject it below the required accuracy
+3. Swap it into the shared matcher with one reference assignment
+
+Requests scoring meanwhile finish on the snapshot they started with, and
+every match result reports the model_version it was scored with. A reload
+is triggered by POST /api/admin/model/reload or by the file watcher, which
+polls the file's mtime every `model_watch_interval_s` seconds.
+
+Each API worker process has its own matcher and reloads it independently.
+"""
+
+import json
+import os
+import threading
+import time
+
+from app.config import settings
+from app.utils import metrics
+
+GOLDEN_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "golden_pairs.json"
+)
+
+SWAPPED = "swapped"
+UNCHANGED = "unchanged"
+REJECTED = "rejected"
+
+
+def load_golden(path: str = GOLDEN_PATH) -> list:
+    """Golden pairs: [{"a": {...}, "b": {...}, "expected": "MATCH"|"NO_MATCH"}]"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def validate_golden(matcher, snapshot, pairs: list) -> dict:
+    """
+    Score golden pairs with `snapshot` (without making it current).
+
+    A pair passes when match_patients would give it the expected
+    recommendation.
+
+    Returns:
+        dict: {passed, total, accuracy, failures: [{index, expected, got, score}]}
+    """
+    from app.matching.simple_matcher import _score_pair
+
+    failures = []
+    for index, pair in enumerate(pairs):
+        scored = _score_pair(matcher, pair["a"], pair["b"], snapshot)
+        if scored["recommendation"] != pair["expected"]:
+            failures.append(
+                {
+                    "index": index,
+                    "expected": pair["expected"],
+                    "got": scored["recommendation"],
+                    "score": round(scored["match_score"], 2),
+                }
+            )
+    total = len(pairs)
+    passed = total - len(failures)
+    return {
+        "passed": passed,
+        "total": total,
+        "accuracy": round(passed / total, 4) if total else 1.0,
+        "failures": failures,
+    }
+
+
+class ModelReloader:
+    """
+    Validates and swaps matcher weights from a file, on demand or on change.
+
+    Example:
+        >>> reloader = ModelReloader()
+        >>> reloader.reload()["status"]
+        'unchanged'
+        >>> reloader.start(interval_s=5.0)  # Reload when the file changes
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        golden_path: str = GOLDEN_PATH,
+        min_accuracy: float = 1.0,
+    ):
+        self._path = path  # None: ml_matcher.MODEL_PATH
+        self.golden_path = golden_path
+        self.min_accuracy = min_accuracy
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._interval_s = 0.0
+        self._file_state = None
+        self._swaps = 0
+        self._rejected = 0
+        self._last = None
+
+    @property
+    def path(self) -> str:
+        if self._path is not None:
+            return self._path
+        from app.matching import ml_matcher
+
+        return ml_matcher.MODEL_PATH
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def reload(self) -> dict:
+        """
+        Load the weights file and swap it in if it is new and valid.
+
+        Returns:
+            dict: {status: swapped|unchanged|rejected, model_version,
+                   previous_version, golden, error, at}
+        """
+        from app.matching.ml_matcher import WeightsSnapshot
+        from app.matching.simple_matcher import get_ml_matcher
+
+        with self._lock:
+            matcher = get_ml_matcher()
+            current = matcher.snapshot
+            result = {
+                "status": UNCHANGED,
+                "model_version": current.version,
+                "previous_version": None,
+                "golden": None,
+                "error": None,
+                "at": time.time(),
+            }
+            self._file_state = self._stat()
+            try:
+                snapshot = WeightsSnapshot.from_file(self.path)
+            except (OSError, ValueError) as e:
+                self._rejected += 1
+                result.update(status=REJECTED, error=f"{type(e).__name__}: {e}")
+                self._last = result
+                return result
+
+            if snapshot.version != current.version:
+                golden = validate_golden(
+                    matcher, snapshot, load_golden(self.golden_path)
+                )
+                result["golden"] = golden
+                if golden["accuracy"] < self.min_accuracy:
+                    self._rejected += 1
+                    result.update(
+                        status=REJECTED,
+                        error=(
+                            f"Golden set accuracy {golden['accuracy']} "
+                            f"below {self.min_accuracy}"
+                        ),
+                    )
+                else:
+                    previous = matcher.swap(snapshot)
+                    matcher.is_trained = True
+                    self._swaps += 1
+                    result.update(
+                        status=SWAPPED,
+                        model_version=snapshot.version,
+                        previous_version=previous.version,
+                    )
+            self._last = result
+            return result
+
+    def check(self):
+        """Reload if the weights file changed since the last look (else None)."""
+        state = self._stat()
+        if state is None or state == self._file_state:
+            return None
+        return self.reload()
+
+    def _watch(self):
+        while not self._stop.wait(self._interval_s):
+            try:
+                self.check()
+            except Exception as e:  # Keep watching; the next change may be fine
+                print(f"   [Internal] Model reload failed: {e}")
+
+    def start(self, interval_s: float):
+        """Watch the weights file in a daemon thread (no-op if interval_s <= 0)."""
+        if interval_s <= 0 or self._thread is not None:
+            return
+        # The matcher loads the file at construction; only later changes count
+        self._file_state = self._stat()
+        self._interval_s = interval_s
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="praisa-model-watch", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def status(self) -> dict:
+        """Current model and reload counters (GET /api/admin/model)."""
+        from app.matching.simple_matcher import get_ml_matcher
+
+        snapshot = get_ml_matcher().snapshot
+        return {
+            "model_version": snapshot.version,
+            "source": snapshot.source,
+            "loaded_at": snapshot.loaded_at,
+            **self.stats(),
+        }
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint (does not load the matcher)."""
+        return {
+            "path": self.path,
+            "watching": self._thread is not None,
+            "watch_interval_s": self._interval_s,
+            "swaps": self._swaps,
+            "rejected": self._rejected,
+            "last_reload": self._last,
+        }
+
+
+model_reloader = ModelReloader(min_accuracy=settings.model_golden_min_accuracy)
+metrics.register("model", model_reloader.stats)
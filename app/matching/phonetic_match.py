@@ -39,6 +39,21 @@ def normalize_indian_name(name: str) -> str:
     return name
 
 
+def phonetic_codes(name: str) -> tuple:
+    """
+    (normalized name, metaphone code) of a name.
+
+    Two non-empty names match in phonetic_match_indian() exactly when their
+    normalized names are equal or their metaphone codes are equal and
+    non-empty; batch scoring computes the codes once per distinct name.
+    """
+    normalized = normalize_indian_name(name)
+    try:
+        return normalized, jellyfish.metaphone(normalized)
+    except Exception:
+        return normalized, ""
+
+
 def phonetic_match_indian(name1: str, name2: str) -> dict:
     """
     Match names using phonetic algorithm optimized for Indian names.
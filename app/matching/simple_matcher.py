@@ -15,10 +15,47 @@ This approach ensures we use the most reliable matching method available.
 
 """
 
-from app.matching.ml_matcher import MLPatientMatcher
+import threading
 
-# Initialize the global ML matcher (loads weights from disk if available)
-ml_matcher = MLPatientMatcher()
+from app.config import settings
+from app.matching.match_cache import MatchCache, pair_key
+from app.utils import metrics
+
+# The ML matcher pulls in rapidfuzz/jellyfish and reads weights from disk, so it
+# is built on first use (or by the app lifespan) instead of at import time.
+_ml_matcher = None
+_ml_matcher_lock = threading.Lock()
+
+# Scored pairs, keyed on both records and the model version (see match_cache.py)
+match_cache = MatchCache(max_entries=settings.match_cache_size)
+metrics.register("match_cache", match_cache.stats)
+
+
+def get_ml_matcher():
+    """
+    Return the shared ML matcher, constructing it on first call.
+
+    Construction is guarded by a lock so concurrent first requests
+    load the weights file only once.
+
+    Returns:
+        MLPatientMatcher: Process-wide matcher instance
+    """
+    global _ml_matcher
+    if _ml_matcher is None:
+        with _ml_matcher_lock:
+            if _ml_matcher is None:
+                from app.matching.ml_matcher import MLPatientMatcher
+
+                _ml_matcher = MLPatientMatcher()
+    return _ml_matcher
+
+
+def __getattr__(name):
+    # Backward compatibility: `simple_matcher.ml_matcher` used to be a module global
+    if name == "ml_matcher":
+        return get_ml_matcher()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def match_patients(patient_a: dict, patient_b: dict) -> dict:
@@ -75,11 +112,31 @@ def match_patients(patient_a: dict, patient_b: dict) -> dict:
     patient_a_id = patient_a.get("patient_id", "UNKNOWN")
     patient_b_id = patient_b.get("patient_id", "UNKNOWN")
 
+    # The score does not depend on the order of the pair, so one cache
+    # entry serves A/B and B/A; the IDs are filled in per call
+    # One weights snapshot for the whole call: a model reload mid-request
+    # cannot mix versions between the cache key and the score
+    matcher = get_ml_matcher()
+    snapshot = matcher.snapshot
+    key = pair_key(patient_a, patient_b, snapshot.version)
+    scored = match_cache.get(key)
+    if scored is None:
+        scored = _score_pair(matcher, patient_a, patient_b, snapshot)
+        match_cache.put(key, scored)
+    return {**scored, "patient_a_id": patient_a_id, "patient_b_id": patient_b_id}
+
+
+def _score_pair(matcher, patient_a: dict, patient_b: dict, snapshot=None) -> dict:
+    """Run the matcher on a pair (the cacheable part of match_patients)."""
     # Step 1: Run ML Decision Engine
     # The ML model extracts features (ABHA, Phonetic, Fuzzy, DOB, etc.)
     # and returns a probability based on learned weights.
-    ml_res = ml_matcher.predict_detailed(patient_a, patient_b)
+    ml_res = matcher.predict_detailed(patient_a, patient_b, snapshot)
+    return _from_ml_result(ml_res)
+
 
+def _from_ml_result(ml_res: dict) -> dict:
+    """Match result (without patient IDs) of a predict_detailed() result."""
     match_score = ml_res["prob"] * 100
     method = ml_res["method"]
     matched_fields = ml_res["matched_fields"]
@@ -102,7 +159,37 @@ def match_patients(patient_a: dict, patient_b: dict) -> dict:
         "method": method,
         "recommendation": recommendation,
         "matched_fields": matched_fields,
-        "patient_a_id": patient_a_id,
-        "patient_b_id": patient_b_id,
+        "model_version": ml_res["model_version"],
         "details": {"ml_result": ml_res, "is_ml_driven": True},
     }
+
+
+def match_patients_batch(pairs: list) -> list:
+    """
+    match_patients() of many (patient_a, patient_b) pairs.
+
+    Cache misses are scored together by MLPatientMatcher.predict_batch()
+    (vectorized features, one weights snapshot for the whole batch); used
+    by the /api/match micro-batcher (see app/utils/micro_batch.py).
+
+    Returns:
+        list: match_patients() result of each pair, in order
+    """
+    matcher = get_ml_matcher()
+    snapshot = matcher.snapshot
+    keys = [pair_key(a, b, snapshot.version) for a, b in pairs]
+    scored = [match_cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(scored) if result is None]
+    if missing:
+        ml_results = matcher.predict_batch([pairs[i] for i in missing], snapshot)
+        for i, ml_res in zip(missing, ml_results):
+            scored[i] = _from_ml_result(ml_res)
+            match_cache.put(keys[i], scored[i])
+    return [
+        {
+            **result,
+            "patient_a_id": patient_a.get("patient_id", "UNKNOWN"),
+            "patient_b_id": patient_b.get("patient_id", "UNKNOWN"),
+        }
+        for result, (patient_a, patient_b) in zip(scored, pairs)
+    ]
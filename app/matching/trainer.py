@@ -0,0 +1,300 @@
+"""
+ML Matcher Trainer
+
+Fits MLPatientMatcher weights by logistic regression on labelled pairs:
+
+1. Stream pairs from a JSON Lines file, one {"a": {...}, "b": {...},
+   "label": 0|1} per line (matches and non-matches)
+2. Extract features in batches, in parallel worker processes, into one
+   NumPy matrix (rows = pairs, columns = ml_matcher.FEATURES)
+3. Fit weights and intercept with vectorized (accelerated) gradient descent
+   on the log loss; weights are kept non-negative so they stay valid for
+   the weighted-average score of predict_detailed()
+4. Write the weights in the existing model_weights.json format, and a
+   calibration report of the fit
+
+Because the weights are non-negative, the fitted model is exactly
+P(match) = sigmoid(slope * score + intercept), where score is the
+weighted average predict_detailed() computes before its rules and slope
+is the sum of the weights; model_calibration.json records slope and
+intercept plus a reliability table. The report is for evaluating the
+fit only: the matcher does not read it, and the probability it serves is
+the weighted average after its identity rules and penalties, which is
+not calibrated.
+
+Both files are replaced atomically (temporary file + os.replace), the
+report first, so ModelReloader, which polls model_weights.json, never
+loads a partially written file.
+
+Usage:
+    python -m app.matching.trainer pairs.jsonl --workers 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from app.matching.ml_matcher import (
+    CALIBRATION_PATH,
+    FEATURES,
+    MODEL_PATH,
+    extract_features,
+    weights_version,
+    write_json_atomic,
+)
+
+
+def feature_rows(pairs) -> np.ndarray:
+    """Feature matrix (float32, FEATURES column order) of (a, b) pairs."""
+    rows = np.zeros((len(pairs), len(FEATURES)), dtype=np.float32)
+    for i, (patient_a, patient_b) in enumerate(pairs):
+        feats = extract_features(patient_a, patient_b)
+        rows[i] = [feats[name] for name in FEATURES]
+    return rows
+
+
+def _extract_batch(lines: list):
+    """Parse and featurize a batch of JSON lines (runs in a worker process)."""
+    pairs, labels = [], []
+    for line in lines:
+        example = json.loads(line)
+        pairs.append((example["a"], example["b"]))
+        labels.append(int(example["label"]))
+    return feature_rows(pairs), np.array(labels, dtype=np.float32)
+
+
+def _batches(path: str, batch_size: int):
+    with open(path) as f:
+        lines = (line for line in f if line.strip())
+        while True:
+            batch = list(islice(lines, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+def count_pairs(path: str) -> int:
+    """Number of non-empty lines of a pairs file."""
+    with open(path) as f:
+        return sum(1 for line in f if line.strip())
+
+
+def load_features(path: str, workers: int = None, batch_size=10000, progress=None):
+    """
+    Stream a pairs file into a feature matrix.
+
+    Args:
+        path: JSON Lines file of {"a", "b", "label"} examples
+        workers: Feature extraction processes (default: CPU count; 1 = in
+                 this process)
+        batch_size: Pairs per batch handed to a worker
+        progress: Optional callback(pairs done) after each batch
+
+    Returns:
+        tuple: (X float32 [pairs, features], y float32 [pairs])
+    """
+    workers = workers or os.cpu_count() or 1
+    features, labels, done = [], [], 0
+
+    def collect(result):
+        nonlocal done
+        features.append(result[0])
+        labels.append(result[1])
+        done += len(result[1])
+        if progress is not None:
+            progress(done)
+
+    if workers == 1:
+        for batch in _batches(path, batch_size):
+            collect(_extract_batch(batch))
+    else:
+        # spawn: safe from threaded callers (API workers, job threads)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            # At most 2 batches per worker in flight, results in file order
+            pending = deque()
+            for batch in _batches(path, batch_size):
+                pending.append(pool.submit(_extract_batch, batch))
+                if len(pending) >= 2 * workers:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+
+    if not features:
+        return np.zeros((0, len(FEATURES)), np.float32), np.zeros(0, np.float32)
+    return np.concatenate(features), np.concatenate(labels)
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35, 35)))
+
+
+def log_loss(y, prob) -> float:
+    prob = np.clip(prob, 1e-12, 1 - 1e-12)
+    return float(-np.mean(y * np.log(prob) + (1 - y) * np.log(1 - prob)))
+
+
+def fit_logistic(X, y, l2: float = 1e-4, max_iter: int = 2000, tol: float = 1e-8):
+    """
+    Logistic regression by projected accelerated gradient descent (FISTA).
+
+    Each iteration is two matrix-vector products over all pairs; the step
+    size is 1/L for the Lipschitz constant L of the gradient, and weights
+    are projected onto w >= 0 (the intercept is free).
+
+    Returns:
+        tuple: (weights array, intercept, iterations run)
+    """
+    n, k = X.shape
+    X = X.astype(np.float64)
+    y = y.astype(np.float64)
+    # L <= 0.25 * largest eigenvalue of [X 1]^T [X 1] / n, plus the L2 term
+    augmented = np.hstack([X, np.ones((n, 1))])
+    lipschitz = 0.25 * np.linalg.eigvalsh(augmented.T @ augmented / n)[-1] + l2
+    step = 1.0 / lipschitz
+
+    theta = np.zeros(k + 1)  # weights..., intercept
+    momentum = theta.copy()
+    t = 1.0
+    previous = np.inf
+    for iteration in range(1, max_iter + 1):
+        prob = _sigmoid(augmented @ momentum)
+        gradient = augmented.T @ (prob - y) / n
+        gradient[:k] += l2 * momentum[:k]
+        updated = momentum - step * gradient
+        np.maximum(updated[:k], 0.0, out=updated[:k])
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = updated + ((t - 1) / t_next) * (updated - theta)
+        theta, t = updated, t_next
+        if iteration % 25 == 0:
+            loss = log_loss(y, _sigmoid(augmented @ theta))
+            if previous - loss < tol:
+                break
+            previous = loss
+    return theta[:k], float(theta[k]), iteration
+
+
+def reliability(prob, y, bins: int = 10) -> list:
+    """Mean predicted probability vs observed match rate per probability bin."""
+    edges = np.linspace(0, 1, bins + 1)
+    index = np.clip(np.digitize(prob, edges) - 1, 0, bins - 1)
+    table = []
+    for b in range(bins):
+        mask = index == b
+        if mask.any():
+            table.append(
+                {
+                    "bin": f"{edges[b]:.1f}-{edges[b + 1]:.1f}",
+                    "count": int(mask.sum()),
+                    "mean_predicted": round(float(prob[mask].mean()), 4),
+                    "observed_rate": round(float(y[mask].mean()), 4),
+                }
+            )
+    return table
+
+
+def train(
+    pairs_path: str,
+    weights_path: str = MODEL_PATH,
+    calibration_path: str = CALIBRATION_PATH,
+    workers: int = None,
+    batch_size: int = 10000,
+    l2: float = 1e-4,
+    progress=None,
+) -> dict:
+    """
+    Train on a pairs file and write the weights and calibration files.
+
+    Args:
+        progress: Optional callback(pairs featurized, pairs per second)
+
+    Returns:
+        dict: Summary (pairs, positives, timings, throughput, metrics,
+              model_version)
+
+    Raises:
+        ValueError: The file has no pairs, or only one label
+    """
+    started = time.perf_counter()
+
+    def report(done):
+        if progress is not None:
+            progress(done, done / max(time.perf_counter() - started, 1e-9))
+
+    X, y = load_features(pairs_path, workers, batch_size, report)
+    featurized = time.perf_counter()
+    positives = int(y.sum())
+    if not len(y) or positives in (0, len(y)):
+        raise ValueError("Training needs both matching and non-matching pairs")
+
+    coef, intercept, iterations = fit_logistic(X, y, l2=l2)
+    fitted = time.perf_counter()
+
+    weights = {name: round(float(w), 4) for name, w in zip(FEATURES, coef)}
+    prob = _sigmoid(X.astype(np.float64) @ coef + intercept)
+    summary = {
+        "pairs": len(y),
+        "positives": positives,
+        "feature_seconds": round(featurized - started, 2),
+        "pairs_per_second": round(len(y) / max(featurized - started, 1e-9)),
+        "fit_seconds": round(fitted - featurized, 2),
+        "iterations": iterations,
+        "log_loss": round(log_loss(y, prob), 5),
+        "accuracy": round(float(((prob >= 0.5) == (y == 1)).mean()), 4),
+        "model_version": weights_version(weights),
+    }
+    calibration = {
+        "model_version": summary["model_version"],
+        "method": "logistic",
+        # P(match) = sigmoid(slope * weighted-average score + intercept)
+        "slope": round(float(coef.sum()), 6),
+        "intercept": round(intercept, 6),
+        "reliability": reliability(prob, y),
+        "metrics": {
+            key: summary[key] for key in ("pairs", "positives", "log_loss", "accuracy")
+        },
+    }
+    write_json_atomic(calibration_path, calibration)
+    write_json_atomic(weights_path, weights)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the PRAISA ML matcher")
+    parser.add_argument("pairs", help='JSON Lines of {"a", "b", "label"}')
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--weights", default=MODEL_PATH)
+    parser.add_argument("--calibration", default=CALIBRATION_PATH)
+    args = parser.parse_args(argv)
+
+    total = count_pairs(args.pairs)
+    print(f"Training on {total} pairs from {args.pairs}")
+
+    def progress(done, rate):
+        print(f"  {done:>10} / {total} pairs  {rate:>10.0f} pairs/s", flush=True)
+
+    summary = train(
+        args.pairs,
+        args.weights,
+        args.calibration,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        l2=args.l2,
+        progress=progress,
+    )
+    for key, value in summary.items():
+        print(f"{key:>18}: {value}")
+    print(f"Weights: {args.weights}\nCalibration: {args.calibration}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Pydantic Models for Background Jobs
+
+Request body of POST /api/jobs (see app/jobs/ and app/routes/jobs.py).
+
+Models:
+- JobRequest: Job type and its keyword arguments
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class JobRequest(BaseModel):
+    """
+    Request body for starting a background job.
+
+    Example:
+        {"type": "linkage", "params": {"min_score": 80}}
+    """
+
+    type: str = Field(..., description="Job type (see GET /api/jobs)")
+    params: Optional[dict] = Field(None, description="Keyword arguments of the job")
@@ -113,6 +113,7 @@ class MatchResult(BaseModel):
         recommendation: Action to take (MATCH/REVIEW/NO_MATCH)
         patient_a_id: ID of first patient
         patient_b_id: ID of second patient
+        model_version: Version of the matcher weights that scored the pair
         details: Full results from all 3 strategies
 
     Example:
@@ -123,6 +124,7 @@ class MatchResult(BaseModel):
             "recommendation": "MATCH",
             "patient_a_id": "HA001",
             "patient_b_id": "HB001",
+            "model_version": "3f2a9c1b7d04",
             "details": {
                 "abha_result": {"score": 100.0, "matched": true, ...},
                 "phonetic_result": {"score": 90.0, "matched": true, ...},
@@ -149,6 +151,68 @@ class MatchResult(BaseModel):
     matched_fields: Optional[list[str]] = Field(
         None, description="List of fields that the AI identified as matching"
     )
+    model_version: Optional[str] = Field(
+        None, description="Version (content hash) of the matcher weights used"
+    )
     details: Dict[str, Any] = Field(
         ..., description="Detailed results from all matching strategies"  # Required
     )
+
+
+class BatchSearchQuery(BaseModel):
+    """
+    One query of a batch search.
+
+    Same criteria and priority as GET /api/patients/search
+    (ABHA > Aadhaar > phone > name); `hospital_id`, `gender` and
+    `birth_year` (+/- `year_window`) only narrow name queries.
+
+    Example:
+        {"id": "row-17", "abha": "12-3456-7890-1234"}
+        {"id": "row-18", "name": "Priya", "gender": "F", "birth_year": 1990}
+    """
+
+    id: str = Field(..., description="Caller's query id; results are keyed by it")
+    name: Optional[str] = Field(None, min_length=2)
+    abha: Optional[str] = Field(None, min_length=5)
+    aadhaar: Optional[str] = Field(None, min_length=12)
+    phone: Optional[str] = Field(None, min_length=10)
+    hospital_id: Optional[str] = None
+    gender: Optional[str] = Field(None, pattern="^[MFOmfo]$")
+    birth_year: Optional[int] = Field(None, ge=1900, le=2100)
+    year_window: Optional[int] = Field(None, ge=0, le=10)
+
+
+class BatchSearchRequest(BaseModel):
+    """
+    Request body for the batch search endpoint.
+
+    Example:
+        {
+            "queries": [
+                {"id": "1", "abha": "12-3456-7890-1234"},
+                {"id": "2", "phone": "9876543210"},
+                {"id": "3", "name": "Ramesh Singh", "hospital_id": "hospital_a"}
+            ],
+            "fields": "patient_id,name,hospital_id"
+        }
+    """
+
+    queries: list[BatchSearchQuery] = Field(..., min_length=1)
+    fields: Optional[str] = Field(
+        None, description="Comma-separated projection applied to every result"
+    )
+
+
+class PatientIdsRequest(BaseModel):
+    """
+    Request body for fetching several patients by ID.
+
+    Example:
+        {"ids": ["HA001", "HB001"], "fields": "patient_id,name"}
+    """
+
+    ids: list[str] = Field(..., min_length=1, description="Patient IDs")
+    fields: Optional[str] = Field(
+        None, description="Comma-separated projection applied to every record"
+    )
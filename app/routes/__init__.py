@@ -1,5 +1,5 @@
 """Routes package"""
 
-from app.routes import patients, matching
+from app.routes import patients, matching, federation, sync, jobs, admin
 
-__all__ = ["patients", "matching"]
+__all__ = ["patients", "matching", "federation", "sync", "jobs", "admin"]
@@ -0,0 +1,46 @@
+"""
+Admin API Routes
+
+Operational endpoints of one API worker (each worker process has its own
+matcher; see app/matching/model_reload.py).
+
+Endpoints:
+- GET /api/admin/model - Current matcher weights version and reload counters
+- POST /api/admin/model/reload - Validate and swap in the weights file
+"""
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+
+from app.matching.model_reload import REJECTED, model_reloader
+from app.utils.responses import FastJSONResponse
+
+router = APIRouter()
+
+
+@router.get("/admin/model", response_class=FastJSONResponse)
+async def model_status():
+    """Version, source and load time of the current weights, plus reload counters."""
+    return FastJSONResponse(await run_in_threadpool(model_reloader.status))
+
+
+@router.post("/admin/model/reload", response_class=FastJSONResponse)
+async def reload_model():
+    """
+    Reload the matcher weights file without restarting the worker.
+
+    The new weights are scored on the golden pairs first; scoring requests
+    keep using the previous weights until the swap.
+
+    Returns:
+        {"status": "swapped"|"unchanged", "model_version": "...",
+         "previous_version": "...", "golden": {"passed": 10, "total": 10, ...}}
+
+    Raises:
+        422: The file is invalid or the weights fail the golden set (body:
+             the same result with "status": "rejected" and "error")
+    """
+    result = await run_in_threadpool(model_reloader.reload)
+    return FastJSONResponse(
+        result, status_code=422 if result["status"] == REJECTED else 200
+    )
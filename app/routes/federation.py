@@ -0,0 +1,126 @@
+"""
+Federation API Routes
+
+Fan-out search and history across all connected hospital nodes
+(see app/federation/client.py).
+
+Endpoints:
+- GET /api/federation/nodes - Registered nodes and circuit breaker state
+- GET /api/federation/search - Search every node, merge results
+- GET /api/federation/patients/{id}/history - History from every node
+- GET /api/federation/nodes/{name}/diff - Merkle diff of patients with a node
+"""
+
+import httpx
+from fastapi import APIRouter, HTTPException, Query
+
+from app.federation.client import get_federated_client
+from app.routes.sync import merkle_tree
+from app.utils.responses import FastJSONResponse
+
+router = APIRouter()
+
+
+@router.get("/federation/nodes", response_class=FastJSONResponse)
+async def list_nodes():
+    """List registered hospital nodes with their circuit breaker state."""
+    return FastJSONResponse({"nodes": get_federated_client().node_states()})
+
+
+@router.get("/federation/search", response_class=FastJSONResponse)
+async def federated_search(
+    name: str = Query(None, min_length=2),
+    abha: str = Query(None, min_length=5),
+    aadhaar: str = Query(None, min_length=12),
+    phone: str = Query(None, min_length=10),
+):
+    """
+    Search patients on all connected hospital nodes concurrently.
+
+    Takes the same query parameters as GET /api/patients/search. Nodes that
+    time out, fail, or have an open circuit are reported in "nodes" and the
+    response is marked partial instead of failing.
+
+    Returns:
+        {
+            "results": [...],   # Each result tagged with "node"
+            "count": int,
+            "partial": bool,    # True if any node did not answer
+            "nodes": {"hospital_b": {"status": "ok", "latency_ms": 12.3, "count": 2}}
+        }
+
+    Raises:
+        HTTPException 400: If no search parameter is provided
+    """
+    params = {
+        key: value
+        for key, value in (
+            ("name", name),
+            ("abha", abha),
+            ("aadhaar", aadhaar),
+            ("phone", phone),
+        )
+        if value
+    }
+    if not params:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide 'name', 'abha', 'aadhaar', or 'phone' query parameter",
+        )
+    return FastJSONResponse(await get_federated_client().search(params))
+
+
+@router.get(
+    "/federation/patients/{patient_id}/history", response_class=FastJSONResponse
+)
+async def federated_history(patient_id: str):
+    """
+    Fetch a patient's visit history from every node that knows the patient.
+
+    Returns:
+        {
+            "patient_id": str,
+            "histories": [{"node": "hospital_b", "patient": {...}, "visits": [...]}],
+            "visit_count": int,
+            "partial": bool,
+            "nodes": {...}      # Per-node status and latency
+        }
+    """
+    return FastJSONResponse(await get_federated_client().history(patient_id))
+
+
+@router.get("/federation/nodes/{name}/diff", response_class=FastJSONResponse)
+async def diff_with_node(name: str):
+    """
+    Compare this node's patients with node `name` through Merkle trees.
+
+    Only differing tree nodes are descended and only differing records are
+    transferred; nothing is written locally.
+
+    Returns:
+        {
+            "in_sync": bool,
+            "buckets": ["3a7"],             # Differing leaf buckets
+            "missing_locally": [{...}],     # Remote records absent here
+            "changed": [{...}],             # Remote version of differing records
+            "missing_remotely": ["HA001"],  # Local patients absent there
+            "exchanges": 6
+        }
+
+    Raises:
+        HTTPException 404: Unknown node
+        HTTPException 409: The nodes use different Merkle depths
+        HTTPException 502: The node failed or timed out
+    """
+    local_tree = await merkle_tree()
+    try:
+        diff = await get_federated_client().reconcile(name, local_tree)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown node: {name}")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except httpx.HTTPError as e:
+        raise HTTPException(
+            status_code=502, detail=f"Node {name} failed: {type(e).__name__}: {e}"
+        )
+    return FastJSONResponse(diff)
@@ -0,0 +1,104 @@
+"""
+Job API Routes
+
+Starts and tracks background jobs (see app/jobs): heavy work such as
+record linkage, matcher training, bulk loads and index rebuilds runs in a
+bounded thread/process pool instead of inside the request.
+
+Endpoints:
+- POST /api/jobs - Start a job (202, returns the queued job)
+- GET /api/jobs - Recent jobs and the available job types
+- GET /api/jobs/{id} - Status, progress and result of a job
+- POST /api/jobs/{id}/cancel - Cancel a queued or running job
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+
+from app.jobs import get_job_runner
+from app.models.job import JobRequest
+from app.utils.responses import FastJSONResponse
+
+router = APIRouter()
+
+
+@router.post("/jobs", response_class=FastJSONResponse, status_code=202)
+async def start_job(request: JobRequest):
+    """
+    Queue a background job.
+
+    Request Body:
+        {"type": "linkage", "params": {"min_score": 80}}
+
+    Returns:
+        The queued job (see GET /api/jobs/{id}), with status 202
+
+    Raises:
+        HTTPException 400: Unknown job type or invalid params
+    """
+    try:
+        job = await run_in_threadpool(
+            get_job_runner().submit, request.type, request.params
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(job, status_code=202)
+
+
+@router.get("/jobs", response_class=FastJSONResponse)
+async def list_jobs(
+    status: str = Query(None),  # queued/running/succeeded/failed/cancelled
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Most recent jobs first, plus {job type: executor}."""
+    runner = get_job_runner()
+    jobs = await run_in_threadpool(runner.store.list, status, limit)
+    return FastJSONResponse({"jobs": jobs, "count": len(jobs), "types": runner.types})
+
+
+@router.get("/jobs/{job_id}", response_class=FastJSONResponse)
+async def get_job(job_id: str):
+    """
+    Status of a job.
+
+    Returns:
+        {
+            "id": "3f2a...",
+            "type": "linkage",
+            "status": "running",      # queued/running/succeeded/failed/cancelled
+            "params": {"min_score": 80},
+            "done": 1200,
+            "total": 5000,
+            "progress": 0.24,
+            "message": "85 links",
+            "result": null,           # Job result once succeeded
+            "error": null,
+            "cancel_requested": false,
+            "created_at": 1767523380.1,
+            "started_at": 1767523380.3,
+            "finished_at": null
+        }
+
+    Raises:
+        HTTPException 404: Unknown job
+    """
+    job = await run_in_threadpool(get_job_runner().store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return FastJSONResponse(job)
+
+
+@router.post("/jobs/{job_id}/cancel", response_class=FastJSONResponse)
+async def cancel_job(job_id: str):
+    """
+    Cancel a job. A queued job is cancelled at once; a running job stops at
+    its next progress report (status "running" with cancel_requested until
+    then). Finished jobs are returned unchanged.
+
+    Raises:
+        HTTPException 404: Unknown job
+    """
+    job = await run_in_threadpool(get_job_runner().cancel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return FastJSONResponse(job)
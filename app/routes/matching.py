@@ -9,15 +9,30 @@ Purpose: Match two patient records using combined strategies
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
 from app.models.patient import MatchRequest, MatchResult
-from app.matching.simple_matcher import match_patients
+from app.matching.simple_matcher import match_patients, match_patients_batch
+from app.utils import metrics
+from app.utils.admission import admission
+from app.utils.micro_batch import MicroBatcher
+from app.utils.responses import FastJSONResponse
 
 # Create API router for matching endpoints
 # This router will be included in main.py with prefix "/api"
 router = APIRouter()
 
+# Opt-in (MATCH_BATCHING_ENABLED): concurrent match requests are scored
+# together through the vectorized feature path
+match_batcher = MicroBatcher(
+    match_patients_batch,
+    max_size=settings.match_batch_max_size,
+    max_wait_ms=settings.match_batch_max_wait_ms,
+)
+metrics.register("match_batching", match_batcher.stats)
 
-@router.post("/match", response_model=MatchResult)
+
+@router.post("/match", response_model=MatchResult, response_class=FastJSONResponse)
 async def match_two_patients(request: MatchRequest):
     """
     Match two patients using combined matching strategies.
@@ -63,9 +78,23 @@ async def match_two_patients(request: MatchRequest):
     try:
         # Call the simple matcher with both patient records
         # This runs all 3 strategies and returns the best match
-        result = match_patients(request.patient_a, request.patient_b)
-        return result
+        async with admission.admit("match"):
+            if settings.match_batching_enabled:
+                result = await match_batcher.submit(
+                    (request.patient_a, request.patient_b)
+                )
+            else:
+                result = await run_in_threadpool(
+                    match_patients, request.patient_a, request.patient_b
+                )
+
+        # match_patients already produces the MatchResult shape; skip the
+        # response_model re-validation and serialize directly (see
+        # tests/test_responses.py for the schema check)
+        return FastJSONResponse(result)
 
+    except HTTPException:
+        raise  # 503 from admission control
     except Exception as e:
         # If any error occurs during matching, return 500 error
         # In production, we'd log this error for debugging
@@ -6,26 +6,111 @@ Includes search, details retrieval, and visit history endpoints.
 
 Endpoints:
 - GET /api/patients/search - Search patients by name or ABHA
+- GET /api/patients/suggest - Type-ahead name completions
 - GET /api/patients/{id} - Get patient details
 - GET /api/patients/{id}/history - Get patient visit history
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
 from app.database import db
+from app.models.patient import BatchSearchRequest, PatientIdsRequest
 from app.utils.quality_scorer import calculate_data_quality
+from app.utils.http_cache import (
+    etag_matches,
+    not_modified,
+    set_cache_headers,
+    weak_etag,
+)
+from app.utils import metrics
+from app.utils.admission import admission
+from app.utils.budget import SearchBudget, run_until_disconnect
+from app.utils.exceptions import ValidationException
+from app.utils.identifiers import validate_identifier
+from app.utils.responses import FastJSONResponse
+from app.utils.single_flight import SingleFlight
 
 # Create API router for patient endpoints
 # This router will be included in main.py with prefix "/api"
 router = APIRouter()
 
+# Coalesces concurrent identical searches (e.g. one emergency admission
+# looked up from several terminals at once)
+search_flight = SingleFlight()
+metrics.register("search_coalescing", search_flight.stats)
 
-@router.get("/patients/search")
+# Derived fields computed by calculate_data_quality, and the columns they read
+QUALITY_FIELDS = ("quality_score", "missing_fields")
+QUALITY_COLUMNS = ("name", "abha_number", "mobile", "dob", "gender", "address")
+
+
+def parse_fields(fields: str, allowed) -> list:
+    """
+    Parse a comma-separated `fields=` projection.
+
+    Returns:
+        list[str] | None: Requested fields in order, or None for "all fields"
+
+    Raises:
+        HTTPException 400: If a field is not in `allowed`
+    """
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown)}. "
+            f"Allowed: {', '.join(allowed)}",
+        )
+    return requested
+
+
+def patient_columns(requested: list) -> list:
+    """SQL columns needed to produce the requested patient fields."""
+    if requested is None:
+        return None
+    columns = [f for f in requested if f not in QUALITY_FIELDS]
+    if any(f in QUALITY_FIELDS for f in requested):
+        columns.extend(QUALITY_COLUMNS)
+    return list(dict.fromkeys(columns))
+
+
+def shape_patient(patient: dict, requested: list, quality: bool = True) -> dict:
+    """
+    Add data quality fields (if wanted) and apply the projection.
+
+    Args:
+        patient: Patient row (mutated in place when no projection is given)
+        requested: Projected fields, or None for all fields
+        quality: Whether quality fields are part of the default shape
+    """
+    wants_quality = (
+        quality if requested is None else any(f in QUALITY_FIELDS for f in requested)
+    )
+    if wants_quality:
+        score, missing = calculate_data_quality(patient)
+        patient["quality_score"] = score
+        patient["missing_fields"] = missing
+    if requested is None:
+        return patient
+    return {f: patient[f] for f in requested if f in patient}
+
+
+@router.get("/patients/search", response_class=FastJSONResponse)
 async def search_patients(
+    request: Request,
     name: str = Query(None, min_length=2),  # Name search (min 2 chars)
     abha: str = Query(None, min_length=5),  # ABHA search (min 5 chars for flexibility)
     aadhaar: str = Query(None, min_length=12),  # Aadhaar search (min 12 chars)
     phone: str = Query(None, min_length=10),  # Phone search (min 10 digits)
     hospital_id: str = Query(None),  # Optional hospital filter
+    fields: str = Query(None),  # Optional comma-separated projection
+    gender: str = Query(None, pattern="^[MFOmfo]$"),  # Name search filter
+    birth_year: int = Query(None, ge=1900, le=2100),  # Name search filter
+    year_window: int = Query(None, ge=0, le=10),  # +/- years around birth_year
 ):
     """
     Search for patients by name, ABHA, Aadhaar, or phone number.
@@ -43,10 +128,17 @@ async def search_patients(
 
     Query Parameters:
         name: Patient name (partial match, min 2 characters)
-        abha: ABHA number (exact match across ALL hospitals, min 5 characters)
-        aadhaar: Aadhaar number (exact match across ALL hospitals, min 12 digits)
+        abha: ABHA number (exact match across ALL hospitals, 14 digits)
+        aadhaar: Aadhaar number (exact match across ALL hospitals, 12 digits
+                 with a valid Verhoeff checksum)
         phone: Phone/mobile number (exact match across ALL hospitals, min 10 digits)
         hospital_id: Optional hospital filter (only applies to name search)
+        gender: Optional gender filter, M/F/O (only applies to name search)
+        birth_year: Optional birth year filter (only applies to name search)
+        year_window: Years either side of birth_year (default 1)
+        fields: Optional comma-separated field list (e.g. "patient_id,name,dob").
+                Only these columns are read from the database; "quality_score"
+                and "missing_fields" may be requested too.
 
     Returns:
         {
@@ -57,12 +149,15 @@ async def search_patients(
 
     Raises:
         HTTPException 400: If no search parameter is provided
+        HTTPException 400: If the ABHA/Aadhaar/phone number is malformed
 
     Examples:
         GET /api/patients/search?name=Ramesh&hospital_id=hospital_a
         GET /api/patients/search?abha=12-3456-7890-1234
         GET /api/patients/search?aadhaar=123412341234
         GET /api/patients/search?phone=9876543210
+        GET /api/patients/search?name=Ramesh&fields=patient_id,name,hospital_id
+        GET /api/patients/search?name=Priya&gender=F&birth_year=1990
     """
     # Validate that at least one search parameter is provided
     if not name and not abha and not phone and not aadhaar:
@@ -71,46 +166,327 @@ async def search_patients(
             detail="Provide 'name', 'abha', 'aadhaar', or 'phone' query parameter",
         )
 
+    requested = parse_fields(fields, db.PATIENT_COLUMNS + QUALITY_FIELDS)
+    columns = patient_columns(requested)
+
+    # Conditional GET: results only change when the data version does
+    data_version = await run_in_threadpool(db.get_data_version)
+    etag = weak_etag("search", data_version, sorted(request.query_params.multi_items()))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     # Priority: ABHA > Aadhaar > Phone > Name (most specific to least specific)
+    # Parameters are normalized so equivalent requests coalesce (see below);
+    # malformed identifiers are rejected before any lookup
     search_type = "name"
 
     if abha:
         # ABHA match - highest priority, searches ALL hospitals automatically
         search_type = "abha"
-        patients = db.search_patients(
-            abha=abha, hospital_id=None
-        )  # Force cross-hospital
+        clean_abha = checked_identifier("abha", abha)
+        criteria = {"abha": clean_abha, "hospital_id": None}  # Force cross-hospital
     elif aadhaar:
         # Aadhaar match - searches ALL hospitals automatically
         search_type = "aadhaar"
-        # Clean aadhaar (remove spaces, dashes)
-        clean_aadhaar = aadhaar.replace("-", "").replace(" ", "").strip()
-        patients = db.search_patients(aadhaar=clean_aadhaar, hospital_id=None)
+        # Clean aadhaar (remove spaces, dashes) and verify its checksum
+        clean_aadhaar = checked_identifier("aadhaar", aadhaar)
+        criteria = {"aadhaar": clean_aadhaar, "hospital_id": None}
     elif phone:
         # Phone match - search ALL hospitals automatically
         search_type = "phone"
-        # Clean phone number (remove +91, spaces, dashes)
-        clean_phone = phone.replace("+91", "").replace("-", "").replace(" ", "").strip()
-        patients = db.search_patients(
-            phone=clean_phone, hospital_id=None
-        )  # Force cross-hospital
+        # Clean phone number (remove +91, spaces, dashes; last 10 digits)
+        clean_phone = checked_identifier("phone", phone)
+        criteria = {"phone": clean_phone, "hospital_id": None}  # Force cross-hospital
     else:
         # Name search - respects hospital filter
         search_type = "name"
-        patients = db.search_patients(name=name, hospital_id=hospital_id)
+        criteria = {
+            "name": " ".join(name.split()),
+            "hospital_id": hospital_id,
+            "gender": gender.upper() if gender else None,
+            "birth_year": birth_year,
+            "year_window": year_window,
+        }
+
+    # Single-flight: concurrent identical searches share one execution.
+    # Identifier probes and name searches are admitted by separate pools.
+    # The search stops early when its time budget runs out, or when every
+    # client waiting for it has disconnected.
+    key = (search_type, tuple(sorted(criteria.items())), fields and tuple(requested))
+    async with admission.admit("name" if search_type == "name" else "identifier"):
+        # The budget starts once admitted (queueing does not spend it)
+        budget = SearchBudget(settings.search_budget_ms / 1000)
+        payload = await run_until_disconnect(
+            request,
+            search_flight.do(
+                key,
+                run_search,
+                search_type,
+                criteria,
+                columns,
+                requested,
+                budget,
+                on_abandon=budget.cancel,
+            ),
+            poll_s=settings.disconnect_poll_s,
+        )
+    if not isinstance(payload, dict):
+        return payload  # Client disconnected
+
+    # Serialized straight to bytes (no jsonable_encoder copy of the rows)
+    response = FastJSONResponse(payload)
+    if payload["partial"]:
+        # Cut short by the budget: the next request may get more results
+        return response
+    return set_cache_headers(response, etag)
 
-    # Calculate data quality for each result
-    for p in patients:
-        score, missing = calculate_data_quality(p)
-        p["quality_score"] = score
-        p["missing_fields"] = missing
+
+def checked_identifier(kind: str, value: str) -> str:
+    """
+    Normalized identifier (see app/utils/identifiers.py).
+
+    Raises:
+        HTTPException 400: If the identifier is malformed
+    """
+    try:
+        return validate_identifier(kind, value)
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def run_search(
+    search_type: str, criteria: dict, columns, requested, budget=None
+) -> dict:
+    """
+    Execute a search and build its response body (runs in the thread pool).
+
+    The body may be shared by coalesced requests and is not modified after.
+    """
+    patients = db.search_patients(columns=columns, budget=budget, **criteria)
+
+    # Calculate data quality for each result and apply the projection
+    patients = [shape_patient(p, requested) for p in patients]
 
     # Return results with search type indicator
-    return {"results": patients, "count": len(patients), "search_type": search_type}
+    # partial: the time budget ran out before every candidate was scored
+    return {
+        "results": patients,
+        "count": len(patients),
+        "search_type": search_type,
+        "partial": budget is not None and budget.partial,
+    }
 
 
-@router.get("/patients/{patient_id}")
-async def get_patient_details(patient_id: str):
+@router.post("/patients/search/batch", response_class=FastJSONResponse)
+async def search_patients_batch(request: BatchSearchRequest):
+    """
+    Run many patient searches in one call.
+
+    Identifier queries (ABHA/Aadhaar/phone, cross-hospital) are grouped into
+    one database query per identifier type; name queries are answered from
+    the shared in-memory name index. Each query gets the same results as
+    GET /api/patients/search would return, gender/birth_year filters
+    included. The batch shares one search time budget: name queries
+    reached after it runs out return their direct matches only, and
+    "partial" is true.
+
+    Request Body:
+        {
+            "queries": [
+                {"id": "1", "abha": "12-3456-7890-1234"},
+                {"id": "2", "name": "Ramesh Singh", "hospital_id": "hospital_a"},
+                {"id": "3", "name": "Priya", "gender": "F", "birth_year": 1990}
+            ],
+            "fields": "patient_id,name"     # optional projection
+        }
+
+    Returns:
+        {
+            "results": {
+                "1": {"results": [...], "count": 1, "search_type": "abha"},
+                "2": {"results": [...], "count": 3, "search_type": "name"},
+                "3": {"results": [...], "count": 2, "search_type": "name"}
+            },
+            "count": 3,
+            "partial": false
+        }
+
+        A query with a malformed identifier gets no results and an "error"
+        message; the other queries are still answered.
+
+    Raises:
+        HTTPException 400: Too many queries, duplicate query ids or a query
+                           without search criteria
+    """
+    queries = request.queries
+    if len(queries) > settings.batch_max_queries:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.batch_max_queries} queries per batch",
+        )
+    ids = [q.id for q in queries]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Query ids must be unique")
+    empty = [q.id for q in queries if not (q.name or q.abha or q.aadhaar or q.phone)]
+    if empty:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Queries without name, abha, aadhaar or phone: {', '.join(empty)}",
+        )
+
+    # A malformed identifier fails its own query only
+    errors = {}
+    for query in queries:
+        kind = next(
+            (k for k in ("abha", "aadhaar", "phone") if getattr(query, k)), None
+        )
+        try:
+            if kind:
+                validate_identifier(kind, getattr(query, kind))
+        except ValidationException as e:
+            errors[query.id] = str(e)
+
+    requested = parse_fields(request.fields, db.PATIENT_COLUMNS + QUALITY_FIELDS)
+    async with admission.admit("bulk"):
+        # The budget starts once admitted (queueing does not spend it)
+        budget = SearchBudget(settings.search_budget_ms / 1000)
+        results = await run_in_threadpool(
+            db.search_patients_batch,
+            [q.model_dump() for q in queries if q.id not in errors],
+            columns=patient_columns(requested),
+            budget=budget,
+        )
+
+    # A patient matching several queries is shaped once
+    shaped = {}
+    body = {}
+    for query in queries:
+        rows = [
+            shaped.get(id(p)) or shaped.setdefault(id(p), shape_patient(p, requested))
+            for p in results.get(query.id, [])
+        ]
+        search_type = next(
+            (t for t in ("abha", "aadhaar", "phone") if getattr(query, t)), "name"
+        )
+        body[query.id] = {
+            "results": rows,
+            "count": len(rows),
+            "search_type": search_type,
+        }
+        if query.id in errors:
+            body[query.id]["error"] = errors[query.id]
+    return FastJSONResponse(
+        {"results": body, "count": len(body), "partial": budget.partial}
+    )
+
+
+# Registered before /patients/{patient_id} so "suggest" is not read as an ID
+@router.get("/patients/suggest", response_class=FastJSONResponse)
+async def suggest_names(
+    q: str = Query(..., min_length=1, max_length=100),  # Text typed so far
+    hospital_id: str = Query(None),  # Optional hospital filter
+    limit: int = Query(10, ge=1, le=50),  # Number of completions
+):
+    """
+    Type-ahead completions for the name being typed.
+
+    The last word of `q` is completed from an in-memory index of name tokens
+    (ranked by how many patients carry the token); earlier words are kept
+    as typed. No database query is made.
+
+    Returns:
+        {
+            "query": str,
+            "suggestions": [{"text": "Ramesh Singh", "count": 42}, ...]
+        }
+
+    Examples:
+        GET /api/patients/suggest?q=ram
+        GET /api/patients/suggest?q=ramesh%20si&hospital_id=hospital_a
+    """
+    from app.index import index_manager
+
+    words = q.split()
+    if not words or q[-1].isspace():
+        return FastJSONResponse({"query": q, "suggestions": []})
+
+    head = " ".join(word.title() for word in words[:-1])
+    # get() may run the index freshness check, which reads SQLite
+    index = await run_in_threadpool(index_manager.get, "suggest")
+    completions = index.suggest(words[-1], hospital_id=hospital_id, limit=limit)
+    suggestions = [
+        {"text": f"{head} {c['text']}" if head else c["text"], "count": c["count"]}
+        for c in completions
+    ]
+    return FastJSONResponse({"query": q, "suggestions": suggestions})
+
+
+@router.get("/patients", response_class=FastJSONResponse)
+async def get_patients(
+    ids: str = Query(..., min_length=1),  # Comma-separated patient IDs
+    fields: str = Query(None),
+):
+    """
+    Get several patients in one call.
+
+    Query Parameters:
+        ids: Comma-separated patient IDs (e.g. "HA001,HB001")
+        fields: Optional comma-separated projection
+
+    Returns:
+        {
+            "results": [...],      # Records in request order (with quality fields)
+            "count": 2,
+            "missing": ["HX999"]   # Requested IDs that do not exist
+        }
+
+    Raises:
+        HTTPException 400: More than settings.batch_max_ids IDs
+
+    Example:
+        GET /api/patients?ids=HA001,HB001
+    """
+    patient_ids = [i.strip() for i in ids.split(",") if i.strip()]
+    return await fetch_patients(patient_ids, fields)
+
+
+@router.post("/patients/batch", response_class=FastJSONResponse)
+async def get_patients_batch(request: PatientIdsRequest):
+    """
+    POST variant of GET /api/patients?ids=... for long ID lists.
+
+    Request Body:
+        {"ids": ["HA001", "HB001"], "fields": "patient_id,name"}
+    """
+    return await fetch_patients(request.ids, request.fields)
+
+
+async def fetch_patients(patient_ids: list, fields: str):
+    """Load, enrich and order the records of a multi-ID fetch."""
+    patient_ids = list(dict.fromkeys(patient_ids))
+    if len(patient_ids) > settings.batch_max_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.batch_max_ids} patient IDs per request",
+        )
+    requested = parse_fields(fields, db.PATIENT_COLUMNS + QUALITY_FIELDS)
+
+    async with admission.admit("identifier"):
+        found = await run_in_threadpool(
+            db.get_patients, patient_ids, columns=patient_columns(requested)
+        )
+
+    results = [shape_patient(found[i], requested) for i in patient_ids if i in found]
+    missing = [i for i in patient_ids if i not in found]
+    return FastJSONResponse(
+        {"results": results, "count": len(results), "missing": missing}
+    )
+
+
+@router.get("/patients/{patient_id}", response_class=FastJSONResponse)
+async def get_patient_details(
+    request: Request, patient_id: str, fields: str = Query(None)
+):
     """
     Get detailed information for a specific patient.
 
@@ -123,8 +499,11 @@ async def get_patient_details(patient_id: str):
     Path Parameters:
         patient_id: Unique patient identifier (e.g., "HA001", "HB001")
 
+    Query Parameters:
+        fields: Optional comma-separated projection (only these columns are read)
+
     Returns:
-        Patient dictionary with all fields
+        Patient dictionary with all (or the projected) fields
 
     Raises:
         HTTPException 404: If patient not found
@@ -145,24 +524,42 @@ async def get_patient_details(patient_id: str):
             "state": "Maharashtra"
         }
     """
-    # Query database for patient
-    patient = db.get_patient(patient_id)
+    requested = parse_fields(fields, db.PATIENT_COLUMNS + QUALITY_FIELDS)
+
+    async with admission.admit("identifier"):
+        # Conditional GET: answer 304 from the row identity and version alone
+        revision = await run_in_threadpool(db.get_patient_revision, patient_id)
+        if revision is None:
+            raise HTTPException(
+                status_code=404, detail=f"Patient {patient_id} not found"
+            )
+        etag = weak_etag("patient", patient_id, *revision, requested)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        # Query database for patient
+        patient = await run_in_threadpool(
+            db.get_patient, patient_id, columns=patient_columns(requested)
+        )
 
-    # Return 404 if patient not found
+    # Return 404 if patient not found (deleted since the version lookup)
     if not patient:
         raise HTTPException(status_code=404, detail=f"Patient {patient_id} not found")
 
-    # Calculate data quality
-    score, missing = calculate_data_quality(patient)
-    patient["quality_score"] = score
-    patient["missing_fields"] = missing
+    # Calculate data quality and apply the projection
+    patient = shape_patient(patient, requested)
 
     # Return patient data
-    return patient
+    return set_cache_headers(FastJSONResponse(patient), etag)
 
 
-@router.get("/patients/{patient_id}/history")
-async def get_patient_history(patient_id: str):
+@router.get("/patients/{patient_id}/history", response_class=FastJSONResponse)
+async def get_patient_history(
+    request: Request,
+    patient_id: str,
+    fields: str = Query(None),  # Projection for the patient record
+    visit_fields: str = Query(None),  # Projection for each visit
+):
     """
     Get complete medical visit history for a patient.
 
@@ -179,6 +576,11 @@ async def get_patient_history(patient_id: str):
     Path Parameters:
         patient_id: Unique patient identifier
 
+    Query Parameters:
+        fields: Optional comma-separated projection for the patient record
+        visit_fields: Optional comma-separated projection for the visit rows
+                      (e.g. "admission_date,visit_type,diagnosis")
+
     Returns:
         {
             "patient": {...},      # Patient details
@@ -209,18 +611,48 @@ async def get_patient_history(patient_id: str):
             "visit_count": 2
         }
     """
-    # First, verify patient exists
-    patient = db.get_patient(patient_id)
-    if not patient:
+    requested = parse_fields(fields, db.PATIENT_COLUMNS + QUALITY_FIELDS)
+    visit_columns = parse_fields(visit_fields, db.VISIT_COLUMNS)
+
+    async with admission.admit("identifier"):
+        # Conditional GET: the patient version is bumped by visit writes too
+        revision = await run_in_threadpool(db.get_patient_revision, patient_id)
+        if revision is None:
+            raise HTTPException(
+                status_code=404, detail=f"Patient {patient_id} not found"
+            )
+        etag = weak_etag("history", patient_id, *revision, requested, visit_columns)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        body = await run_in_threadpool(
+            load_history, patient_id, requested, visit_columns
+        )
+
+    # Patient deleted since the version lookup
+    if body is None:
         raise HTTPException(status_code=404, detail=f"Patient {patient_id} not found")
 
+    # Return comprehensive response
+    return set_cache_headers(FastJSONResponse(body), etag)
+
+
+def load_history(patient_id: str, requested, visit_columns):
+    """
+    Build a history response body (runs in the thread pool).
+
+    Returns:
+        dict | None: {patient, visits, visit_count}, or None if not found
+    """
+    patient = db.get_patient(patient_id, columns=patient_columns(requested))
+    if not patient:
+        return None
+
     # Get all visits for this patient
     # Visits are ordered by admission_date DESC (most recent first)
-    visits = db.get_patient_visits(patient_id)
-
-    # Return comprehensive response
+    visits = db.get_patient_visits(patient_id, columns=visit_columns)
     return {
-        "patient": patient,  # Patient information
+        "patient": shape_patient(patient, requested, quality=False),
         "visits": visits,  # Visit history
         "visit_count": len(visits),  # Total visits
     }
@@ -0,0 +1,171 @@
+"""
+Sync API Routes
+
+Incremental sync for downstream consumers (analytics, other PRAISA nodes,
+caches): instead of re-pulling every patient, a consumer remembers the
+last change sequence it processed and asks only for what changed since.
+
+Nodes holding overlapping patient sets reconcile through a Merkle tree
+over their patients (see app/index/merkle.py): compare the root, descend
+only into differing children, then exchange just the differing buckets.
+
+Endpoints:
+- GET /api/changes - Changed patients/visits after a sequence number
+- GET /api/merkle - Root hash and depth of the patient tree
+- GET /api/merkle/nodes - Children of tree nodes (one level per call)
+- GET /api/merkle/buckets - patient_id -> record digest of leaf buckets
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import db
+from app.utils.admission import admission
+from app.utils.responses import FastJSONResponse
+
+router = APIRouter()
+
+
+@router.get("/changes", response_class=FastJSONResponse)
+async def get_changes(
+    since: int = Query(0, ge=0),  # Last sequence number already processed
+    limit: int = Query(None, ge=1),  # Changes per page (default 500)
+    hospital_id: str = Query(None),  # Required in the sharded layout
+):
+    """
+    Changes to patients and visits after `since`, in sequence order.
+
+    Each change carries the record's current state (`null` once deleted).
+    Continue with `since=next_since` while `has_more` is true; sync cost is
+    proportional to the number of changes, not the size of the dataset.
+
+    Query Parameters:
+        since: Sequence number of the last change processed (0 = full sync)
+        limit: Changes per page (default 500, max 5000)
+        hospital_id: Hospital whose sequence to read (sharded layout) or
+                     filter (single layout)
+
+    Returns:
+        {
+            "changes": [
+                {
+                    "seq": 101,
+                    "table_name": "patients",
+                    "record_id": "HA001",
+                    "op": "update",
+                    "hospital_id": "hospital_a",
+                    "changed_at": "2026-01-04 12:23:00",
+                    "record": {"patient_id": "HA001", "version": 4, ...}
+                }
+            ],
+            "count": 1,
+            "next_since": 101,
+            "has_more": false
+        }
+
+    Raises:
+        HTTPException 400: Sharded layout without a known hospital_id
+    """
+    limit = min(limit or settings.changes_page_size, settings.changes_max_page_size)
+    try:
+        async with admission.admit("bulk"):
+            changes, has_more = await run_in_threadpool(
+                db.get_changes, since, limit, hospital_id
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return FastJSONResponse(
+        {
+            "changes": changes,
+            "count": len(changes),
+            "next_since": changes[-1]["seq"] if changes else since,
+            "has_more": has_more,
+        }
+    )
+
+
+async def merkle_tree():
+    """Current Merkle tree (built on first use, rebuilt when data changes)."""
+    # Imported lazily: app.index pulls in the matching libraries
+    from app.index import index_manager
+
+    async with admission.admit("bulk"):
+        return await run_in_threadpool(index_manager.get, "merkle")
+
+
+def checked_prefixes(prefixes: list, tree, leaf: bool) -> list:
+    """Validate requested tree prefixes (hex digits, inner nodes or leaves)."""
+    if len(prefixes) > settings.merkle_max_prefixes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.merkle_max_prefixes} prefixes per request",
+        )
+    for prefix in prefixes:
+        depth_ok = len(prefix) == tree.depth if leaf else len(prefix) < tree.depth
+        if not depth_ok or any(c not in "0123456789abcdef" for c in prefix):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid prefix for a tree of depth {tree.depth}: {prefix!r}",
+            )
+    return list(dict.fromkeys(prefixes))
+
+
+@router.get("/merkle", response_class=FastJSONResponse)
+async def get_merkle_root():
+    """
+    Root of the Merkle tree over this node's patients.
+
+    Two nodes are in sync when their root hashes are equal.
+
+    Returns:
+        {"depth": 3, "fanout": 16, "root": {"hash": "9f2c...", "count": 1200}}
+    """
+    from app.index.merkle import FANOUT
+
+    tree = await merkle_tree()
+    return FastJSONResponse({"depth": tree.depth, "fanout": FANOUT, "root": tree.root})
+
+
+@router.get("/merkle/nodes", response_class=FastJSONResponse)
+async def get_merkle_nodes(prefix: list[str] = Query([""])):
+    """
+    Children of one or more tree nodes.
+
+    Query Parameters:
+        prefix: Node prefix (hex digits, "" = root), repeatable
+                (e.g. ?prefix=3&prefix=a)
+
+    Returns:
+        {"nodes": {"3": {"30": {"hash": "...", "count": 12}, ...}}}
+        Empty children are omitted.
+
+    Raises:
+        HTTPException 400: Invalid prefix or too many prefixes
+    """
+    tree = await merkle_tree()
+    prefixes = checked_prefixes(prefix, tree, leaf=False)
+    return FastJSONResponse({"nodes": {p: tree.children(p) for p in prefixes}})
+
+
+@router.get("/merkle/buckets", response_class=FastJSONResponse)
+async def get_merkle_buckets(prefix: list[str] = Query(...)):
+    """
+    Contents of leaf buckets as patient_id -> record digest.
+
+    Fetch the records themselves with POST /api/patients/batch once the
+    differing patient IDs are known.
+
+    Query Parameters:
+        prefix: Leaf prefix (exactly `depth` hex digits), repeatable
+
+    Returns:
+        {"buckets": {"3a7": {"HA001": "5d41...", "HB017": "7d79..."}}}
+
+    Raises:
+        HTTPException 400: Invalid prefix or too many prefixes
+    """
+    tree = await merkle_tree()
+    prefixes = checked_prefixes(prefix, tree, leaf=True)
+    return FastJSONResponse({"buckets": {p: tree.bucket(p) for p in prefixes}})
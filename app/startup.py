@@ -0,0 +1,157 @@
+"""
+Startup Warmup and Readiness
+
+Runs once per worker from the FastAPI lifespan, before traffic is admitted:
+
+1. Build in-memory indexes (name / phonetic)
+2. Preload the ML matcher weights
+3. Prime caches and warm the database connection pool
+4. Warm up rapidfuzz/jellyfish code paths with a few representative calls
+5. gc.freeze() the preloaded heap (settings.gc_freeze_after_warmup)
+
+`GET /ready` reports "warming" (503) until every step finished, then the
+per-step timings and index sizes, so a load balancer can hold traffic
+until the worker is at steady-state latency.
+"""
+
+import gc
+import threading
+import time
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class WarmupState:
+    """Thread-safe record of warmup progress for the readiness endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ready = False
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.timings_ms = {}
+        self._done = threading.Event()
+
+    def start(self):
+        self._done.clear()
+        with self._lock:
+            self.ready = False
+            self.error = None
+            self.started_at = time.time()
+            self.finished_at = None
+            self.timings_ms = {}
+
+    def record(self, step: str, elapsed_ms: float):
+        with self._lock:
+            self.timings_ms[step] = round(elapsed_ms, 2)
+
+    def finish(self, error: str = None):
+        with self._lock:
+            self.error = error
+            self.ready = error is None
+            self.finished_at = time.time()
+        self._done.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until warmup finished (successfully or not)."""
+        return self._done.wait(timeout)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "error": self.error,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "timings_ms": dict(self.timings_ms),
+            }
+
+
+# Process-wide warmup state, read by GET /ready
+warmup_state = WarmupState()
+
+
+def _timed(step: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    warmup_state.record(step, (time.perf_counter() - started) * 1000)
+    return result
+
+
+def _build_indexes():
+    from app.index import index_manager
+
+    for name, elapsed_ms in index_manager.build_all().items():
+        warmup_state.record(f"index:{name}", elapsed_ms)
+
+
+def _preload_matcher():
+    from app.matching.simple_matcher import get_ml_matcher
+
+    return get_ml_matcher()
+
+
+def _prime_caches():
+    from app.database import db
+
+    # Opens the first pooled connection and pages in the patient table index
+    db.get_data_signature()
+    db.search_patients(name="warmup")
+
+
+def _warm_scorers():
+    from rapidfuzz import fuzz, process
+    from app.index import index_manager
+    from app.matching.simple_matcher import match_patients
+
+    names = index_manager.get("names").names[:100] or ["Ramesh Singh"]
+    for query in ("Ramehs Singh", "Prya Sharma", "Wijay Kumar"):
+        process.extract(query, names, scorer=fuzz.ratio, limit=10)
+        process.extract(query, names, scorer=fuzz.token_sort_ratio, limit=10)
+    match_patients(
+        {"patient_id": "WARMUP_A", "name": "Ramesh Singh", "dob": "1985-03-15"},
+        {"patient_id": "WARMUP_B", "name": "Ramehs Singh", "dob": "1985-03-15"},
+    )
+
+
+def _freeze_heap():
+    # Move everything loaded so far to the permanent generation: the
+    # collector stops scanning it, so its pages are not dirtied (and copied)
+    # in forked workers and full collections stay cheap
+    if settings.gc_freeze_after_warmup:
+        gc.collect()
+        gc.freeze()
+
+
+WARMUP_STEPS = [
+    ("indexes", _build_indexes),
+    ("matcher", _preload_matcher),
+    ("caches", _prime_caches),
+    ("scorers", _warm_scorers),
+    ("gc_freeze", _freeze_heap),
+]
+
+
+def warmup():
+    """
+    Run all warmup steps and mark the worker ready.
+
+    Errors are recorded (and logged) instead of raised: the worker still
+    serves requests, but /ready keeps reporting not-ready.
+    """
+    warmup_state.start()
+    started = time.perf_counter()
+    try:
+        for step, fn in WARMUP_STEPS:
+            _timed(step, fn)
+    except Exception as e:
+        logger.exception("Warmup failed")
+        warmup_state.finish(error=f"{type(e).__name__}: {e}")
+        return
+    warmup_state.record("total", (time.perf_counter() - started) * 1000)
+    warmup_state.finish()
+    logger.info("Warmup complete in %.1f ms", warmup_state.timings_ms["total"])
@@ -0,0 +1,171 @@
+"""
+Admission Control
+
+Requests are admitted through a separate pool per class, so a storm of
+expensive name searches cannot take the threads that cheap identifier
+lookups need:
+
+- identifier: ABHA/Aadhaar/phone searches and lookups by patient id
+- name: name searches (may fall into the fuzzy scoring path)
+- match: POST /api/match
+- bulk: batch endpoints
+
+Each pool runs at most `concurrency` requests at once and queues at most
+`queue` more. A request that finds the queue full, or waits longer than
+the queue timeout, is answered 503 with Retry-After immediately instead of
+piling up. Pools are per worker (one event loop) and FIFO.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+from app.config import settings
+
+
+class AdmissionPool:
+    """
+    Bounded concurrency with a bounded FIFO wait queue.
+
+    Example:
+        >>> pool = AdmissionPool("name", concurrency=8, queue=32)
+        >>> await pool.acquire()  # raises HTTPException 503 when saturated
+        >>> try:
+        ...     run_search()
+        ... finally:
+        ...     pool.release()
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int,
+        queue: int,
+        queue_timeout_s: float = 1.0,
+        retry_after_s: int = 1,
+    ):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.queue_timeout_s = queue_timeout_s
+        self.retry_after_s = retry_after_s
+        self.active = 0
+        self._waiters = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _overloaded(self) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail=f"Too many {self.name} requests, retry shortly",
+            headers={"Retry-After": str(self.retry_after_s)},
+        )
+
+    async def acquire(self):
+        """
+        Take a slot, waiting in the queue if all are busy.
+
+        Raises:
+            HTTPException 503: If the queue is full or the wait times out
+        """
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.queue:
+            self.rejected += 1
+            raise self._overloaded()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # release() hands its slot over by resolving the future
+            await asyncio.wait_for(waiter, self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.timed_out += 1
+            raise self._overloaded()
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # Slot granted just as we were cancelled
+            else:
+                self._discard(waiter)
+            raise
+        self.admitted += 1
+
+    def release(self):
+        """Free a slot, or hand it to the next waiter."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, waiter):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queue": self.queue,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionController:
+    """
+    One AdmissionPool per request class.
+
+    Example:
+        >>> async with admission.admit("identifier"):
+        ...     patient = db.get_patient(patient_id)
+    """
+
+    def __init__(self, pools: dict, enabled: bool = True):
+        self.pools = pools
+        self.enabled = enabled
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        pools = {
+            name: AdmissionPool(
+                name,
+                concurrency,
+                queue,
+                queue_timeout_s=settings.admission_queue_timeout_s,
+                retry_after_s=settings.admission_retry_after_s,
+            )
+            for name, (concurrency, queue) in settings.admission_pools.items()
+        }
+        return cls(pools, enabled=settings.admission_enabled)
+
+    @asynccontextmanager
+    async def admit(self, request_class: str):
+        """Hold a slot of `request_class` for the duration of the block."""
+        pool = self.pools.get(request_class) if self.enabled else None
+        if pool is None:
+            yield
+            return
+        await pool.acquire()
+        try:
+            yield
+        finally:
+            pool.release()
+
+    def stats(self) -> dict:
+        """Per-class counters for the metrics endpoint."""
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+
+admission = AdmissionController.from_settings()
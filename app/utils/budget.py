@@ -0,0 +1,70 @@
+"""
+Request Time Budgets and Cancellation
+
+A SearchBudget is handed to search_patients (which runs in worker threads):
+the fuzzy name scoring checks it between chunks and stops when the budget
+has run out or the request was cancelled, flagging the result as partial.
+
+run_until_disconnect() awaits request work while polling the client
+connection, so work for a client that went away is cancelled.
+"""
+
+import asyncio
+import threading
+import time
+
+from starlette.responses import Response
+
+# Nginx's "client closed request"; never actually received by the client
+CLIENT_CLOSED_REQUEST = 499
+
+
+class SearchBudget:
+    """
+    Deadline plus cancellation flag shared with worker threads.
+
+    Example:
+        >>> budget = SearchBudget(0.5)
+        >>> for chunk in chunks:
+        ...     if budget.exhausted():
+        ...         budget.partial = True
+        ...         break
+        ...     score(chunk)
+    """
+
+    def __init__(self, budget_s: float = 0):
+        # budget_s <= 0: no deadline (only cancellation stops the work)
+        self.deadline = time.monotonic() + budget_s if budget_s > 0 else None
+        self._cancelled = threading.Event()
+        self.partial = False
+
+    def cancel(self):
+        """Stop the work at the next check (e.g. the client disconnected)."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def exhausted(self) -> bool:
+        """Whether the work should stop now."""
+        if self._cancelled.is_set():
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+
+async def run_until_disconnect(request, awaitable, poll_s: float = 0.05):
+    """
+    Await `awaitable`, cancelling it if the client disconnects first.
+
+    Returns:
+        The awaitable's result, or an empty 499 response after a disconnect
+    """
+    task = asyncio.ensure_future(awaitable)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=poll_s)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
@@ -0,0 +1,138 @@
+"""
+Response Compression Middleware
+
+Negotiates `Content-Encoding` from the request's `Accept-Encoding` header:
+brotli (`br`) when the optional `brotli` package is installed and the
+client accepts it, otherwise gzip. Responses smaller than `minimum_size`,
+already-encoded responses and non-text media types are sent as-is.
+
+Streaming responses (more than one body chunk) are passed through
+uncompressed so their chunks are not held back.
+
+Every response that could have been compressed (compressible media type,
+not already encoded) carries `Vary: Accept-Encoding`, compressed or not,
+so shared caches never serve an identity body to a br/gzip client (or the
+reverse).
+"""
+
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:  # Optional dependency: brotli gives ~15-25% smaller JSON than gzip
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """
+    Pick the best supported encoding from an Accept-Encoding header.
+
+    Honors q-values (q=0 disables an encoding) and prefers br over gzip.
+
+    Returns:
+        str | None: "br", "gzip" or None (identity)
+
+    Example:
+        >>> negotiate_encoding("gzip, deflate, br")
+        'br'
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    def allowed(encoding):
+        return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    """Compress a complete response body with the negotiated encoding."""
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware applying negotiated gzip/brotli compression.
+
+    Args:
+        app: Wrapped ASGI application
+        minimum_size: Bodies smaller than this (bytes) are not compressed
+        gzip_level: zlib compression level (1-9)
+        brotli_quality: brotli quality (0-11); 4-5 is a good latency trade-off
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            media_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not media_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                # Streaming, already encoded or binary: send untouched
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            # Negotiated: the representation depends on Accept-Encoding
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is None or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
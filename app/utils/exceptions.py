@@ -75,3 +75,27 @@ class ABHAValidationException(ValidationException):
     """
 
     pass
+
+
+class AadhaarValidationException(ValidationException):
+    """
+    Raised when Aadhaar number validation fails.
+
+    Example:
+        >>> if not verhoeff_valid(aadhaar_number):
+        >>>     raise AadhaarValidationException(f"Invalid Aadhaar: {aadhaar_number}")
+    """
+
+    pass
+
+
+class PhoneValidationException(ValidationException):
+    """
+    Raised when phone number validation fails.
+
+    Example:
+        >>> if len(digits) < 10:
+        >>>     raise PhoneValidationException(f"Invalid phone number: {phone}")
+    """
+
+    pass
@@ -0,0 +1,57 @@
+"""
+HTTP Conditional GET Helpers
+
+Weak ETags are derived from row versions (see migrations.py) rather than
+from the response body, so a matching `If-None-Match` can be answered with
+304 after a single version lookup, before any payload is loaded or
+serialized.
+"""
+
+import hashlib
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Clients must revalidate, but may reuse their copy after a 304
+CACHE_CONTROL = "no-cache"
+
+
+def weak_etag(*parts) -> str:
+    """
+    Build a weak ETag from the parts that identify a representation.
+
+    Example:
+        >>> weak_etag("patient", "HA001", 3, None)
+        'W/"..."'
+    """
+    digest = hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Weak comparison of `etag` against the request's If-None-Match header.
+
+    Handles lists of tags and the "*" wildcard (RFC 9110, section 13.1.2).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the validator."""
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def set_cache_headers(response: Response, etag: str) -> Response:
+    """Attach the ETag and revalidation policy to a full response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -0,0 +1,97 @@
+"""
+Patient Identifier Normalization and Validation
+
+ABHA numbers, Aadhaar numbers and phone numbers arrive with separators
+("12-3456-7890-1234", "+91 98765 43210"). identifier_key() reduces them to
+the form lookups compare on; validate_identifier() also rejects values that
+cannot belong to any patient (wrong length, failed Aadhaar checksum), so
+they are answered without a database lookup.
+"""
+
+from app.config import settings
+from app.utils.exceptions import (
+    AadhaarValidationException,
+    ABHAValidationException,
+    PhoneValidationException,
+)
+
+# Verhoeff checksum tables (dihedral group D5 multiplication, permutation)
+_VERHOEFF_D = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 2, 3, 4, 0, 6, 7, 8, 9, 5),
+    (2, 3, 4, 0, 1, 7, 8, 9, 5, 6),
+    (3, 4, 0, 1, 2, 8, 9, 5, 6, 7),
+    (4, 0, 1, 2, 3, 9, 5, 6, 7, 8),
+    (5, 9, 8, 7, 6, 0, 4, 3, 2, 1),
+    (6, 5, 9, 8, 7, 1, 0, 4, 3, 2),
+    (7, 6, 5, 9, 8, 2, 1, 0, 4, 3),
+    (8, 7, 6, 5, 9, 3, 2, 1, 0, 4),
+    (9, 8, 7, 6, 5, 4, 3, 2, 1, 0),
+)
+_VERHOEFF_P = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 5, 7, 6, 2, 8, 3, 0, 9, 4),
+    (5, 8, 0, 3, 7, 9, 6, 1, 4, 2),
+    (8, 9, 1, 6, 0, 4, 3, 5, 2, 7),
+    (9, 4, 5, 3, 1, 2, 6, 8, 7, 0),
+    (4, 2, 8, 6, 5, 7, 3, 9, 0, 1),
+    (2, 7, 9, 3, 8, 0, 6, 4, 1, 5),
+    (7, 0, 4, 6, 9, 1, 3, 2, 5, 8),
+)
+
+
+def identifier_key(kind: str, value: str) -> str:
+    """Normalized ABHA/Aadhaar number, or the last 10 digits of a phone."""
+    clean = value.replace("-", "").replace(" ", "").strip()
+    if kind == "phone":
+        clean = clean.replace("+91", "")[-10:]
+    return clean
+
+
+def verhoeff_valid(number: str) -> bool:
+    """Whether a digit string passes the Verhoeff checksum (as Aadhaar does)."""
+    check = 0
+    for i, digit in enumerate(reversed(number)):
+        check = _VERHOEFF_D[check][_VERHOEFF_P[i % 8][int(digit)]]
+    return check == 0
+
+
+def validate_identifier(kind: str, value: str) -> str:
+    """
+    Normalize an identifier and reject malformed values.
+
+    Args:
+        kind: "abha", "aadhaar" or "phone"
+        value: Identifier as entered
+
+    Returns:
+        str: identifier_key(kind, value)
+
+    Raises:
+        ABHAValidationException: ABHA number is not 14 digits
+        AadhaarValidationException: Aadhaar number is not 12 digits or fails
+            the Verhoeff checksum (settings.aadhaar_checksum_validation)
+        PhoneValidationException: Phone number has fewer than 10 digits
+    """
+    if kind == "phone":
+        digits = value.replace("+91", "").replace("-", "").replace(" ", "").strip()
+        if not digits.isdigit() or len(digits) < 10:
+            raise PhoneValidationException(f"Invalid phone number: {value}")
+        return digits[-10:]
+
+    key = identifier_key(kind, value)
+    if kind == "abha":
+        if not (key.isdigit() and len(key) == 14):
+            raise ABHAValidationException(
+                f"Invalid ABHA number (expected 14 digits): {value}"
+            )
+    elif kind == "aadhaar":
+        if not (key.isdigit() and len(key) == 12):
+            raise AadhaarValidationException(
+                f"Invalid Aadhaar number (expected 12 digits): {value}"
+            )
+        if settings.aadhaar_checksum_validation and not verhoeff_valid(key):
+            raise AadhaarValidationException(
+                f"Invalid Aadhaar number (checksum failed): {value}"
+            )
+    return key
@@ -0,0 +1,22 @@
+"""
+Runtime Metrics Registry
+
+Components register a function returning a dict of counters; GET /metrics
+returns all of them, keyed by the registered name.
+
+Usage:
+    from app.utils import metrics
+    metrics.register("search_coalescing", search_flight.stats)
+"""
+
+_sources = {}
+
+
+def register(name: str, stats_fn):
+    """Expose `stats_fn()` under `name` in the metrics snapshot."""
+    _sources[name] = stats_fn
+
+
+def snapshot() -> dict:
+    """Current value of every registered metrics source."""
+    return {name: stats_fn() for name, stats_fn in _sources.items()}
@@ -0,0 +1,123 @@
+"""
+Micro-Batching
+
+Collects concurrent calls for up to `max_wait_ms` or `max_size` items and
+hands them to one batch function, the way inference servers batch
+requests: a vectorized scorer amortizes its per-call overhead over the
+batch, at the cost of at most `max_wait_ms` extra latency per call.
+
+The batch function runs in the thread pool, so the event loop keeps
+collecting the next batch meanwhile. A caller that is cancelled while
+waiting is dropped from its batch (or just ignores the result if its batch
+is already running). Batches are per worker (one event loop).
+"""
+
+import asyncio
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+
+class MicroBatcher:
+    """
+    Batches concurrent `submit(item)` calls into `fn(items) -> results`.
+
+    Example:
+        >>> batcher = MicroBatcher(match_patients_batch, max_size=8, max_wait_ms=2)
+        >>> result = await batcher.submit((patient_a, patient_b))
+    """
+
+    def __init__(self, fn, max_size: int = 8, max_wait_ms: float = 2.0):
+        self.fn = fn
+        self.max_size = max_size
+        self.max_wait_ms = max_wait_ms
+        self._pending = []  # (item, future, submitted at)
+        self._timer = None
+        self._running = set()
+        self.submitted = 0
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.full_flushes = 0
+        self.timeout_flushes = 0
+        self.dropped = 0
+        self._wait_s = 0.0
+
+    async def submit(self, item):
+        """
+        Add `item` to the next batch and return its result.
+
+        Exceptions of the batch function are raised in every caller of the
+        batch.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.submitted += 1
+        self._pending.append((item, future, time.perf_counter()))
+        if len(self._pending) >= self.max_size:
+            self.full_flushes += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._on_timeout)
+        return await future
+
+    def _on_timeout(self):
+        self._timer = None
+        self.timeout_flushes += 1
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        now = time.perf_counter()
+        live = [entry for entry in batch if not entry[1].done()]
+        self.dropped += len(batch) - len(live)
+        if not live:
+            return
+        self.batches += 1
+        self.items += len(live)
+        self.largest_batch = max(self.largest_batch, len(live))
+        self._wait_s += sum(now - submitted for _, _, submitted in live)
+        task = asyncio.ensure_future(self._run(live))
+        self._running.add(task)  # Keep a reference until it finishes
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list):
+        try:
+            results = await run_in_threadpool(self.fn, [item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Batch function returned {len(results)} results "
+                    f"for {len(batch)} items"
+                )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint."""
+        return {
+            "max_size": self.max_size,
+            "max_wait_ms": self.max_wait_ms,
+            "submitted": self.submitted,
+            "batches": self.batches,
+            "mean_batch_size": (
+                round(self.items / self.batches, 2) if self.batches else 0.0
+            ),
+            "largest_batch": self.largest_batch,
+            "full_flushes": self.full_flushes,
+            "timeout_flushes": self.timeout_flushes,
+            "dropped": self.dropped,
+            "mean_wait_ms": (
+                round(self._wait_s / self.items * 1000, 3) if self.items else 0.0
+            ),
+            "pending": len(self._pending),
+            "running": len(self._running),
+        }
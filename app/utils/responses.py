@@ -0,0 +1,33 @@
+"""
+Fast JSON Responses
+
+Routes that return plain dicts go through FastAPI's `jsonable_encoder`
+(a recursive copy of the payload) and then `json.dumps`. For row-shaped
+payloads that are already JSON-compatible, that work is pure overhead.
+
+`FastJSONResponse` serializes the content with orjson straight to bytes.
+Returning a Response instance from a route also bypasses response_model
+validation, so routes keep `response_model=` for the OpenAPI schema only.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered with orjson.
+
+    Accepts dicts/lists of str, int, float, bool, None (and dates, which
+    orjson renders as ISO 8601) without a jsonable_encoder pass.
+
+    Example:
+        >>> return FastJSONResponse({"results": rows, "count": len(rows)})
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
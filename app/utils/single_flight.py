@@ -0,0 +1,87 @@
+"""
+Single-Flight Request Coalescing
+
+When several requests ask for the same thing at the same moment (e.g. many
+terminals searching the same emergency admission), only the first one runs
+the computation; the others await its result.
+
+The computation runs in the thread pool as its own task, so a caller that
+disconnects (and is cancelled) does not cancel it for the callers still
+waiting. Results are shared, so they must not be mutated by callers.
+"""
+
+import asyncio
+import threading
+
+from fastapi.concurrency import run_in_threadpool
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    Example:
+        >>> flight = SingleFlight()
+        >>> result = await flight.do(("name", "ramesh"), search, "Ramesh")
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn, *args, on_abandon=None, **kwargs):
+        """
+        Run `fn(*args, **kwargs)` in the thread pool, or await the identical
+        call already in flight for `key`.
+
+        Exceptions of the shared execution are raised in every caller.
+        `on_abandon()` (given by the caller that starts the execution) is
+        called when every caller has been cancelled before it finished, e.g.
+        to stop the work of a search nobody waits for anymore.
+        """
+        with self._lock:
+            self.calls += 1
+            flight = self._inflight.get(key)
+            if flight is None:
+                self.executions += 1
+                task = asyncio.ensure_future(run_in_threadpool(fn, *args, **kwargs))
+                # [task, callers still waiting, on_abandon]
+                flight = self._inflight[key] = [task, 0, on_abandon]
+                task.add_done_callback(lambda done: self._finish(key, done))
+            else:
+                self.coalesced += 1
+            flight[1] += 1
+        cancelled = False
+        try:
+            # shield: cancelling this caller leaves the shared task running
+            return await asyncio.shield(flight[0])
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                abandoned = cancelled and flight[1] == 0 and not flight[0].done()
+            if abandoned and flight[2] is not None:
+                flight[2]()
+
+    def _finish(self, key, task):
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is not None and flight[0] is task:
+                del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even if every caller went away
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._inflight),
+            }
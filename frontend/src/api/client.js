@@ -83,6 +83,15 @@ export const searchPatients = async (criteria) => {
     }
 };
 
+// Type-ahead name completions (served from memory; safe to call per keystroke)
+export const suggestNames = async (q, hospital) => {
+    const hospital_id = hospital ? `hospital_${hospital.toLowerCase()}` : undefined;
+    const response = await client.get('/api/patients/suggest', {
+        params: { q, hospital_id, limit: 8 },
+    });
+    return (response.data.suggestions || []).map(s => s.text);
+};
+
 export const getPatient = async (id) => {
     try {
         const response = await client.get(`/api/patients/${id}`);
@@ -93,13 +102,32 @@ export const getPatient = async (id) => {
     }
 };
 
+// Several patients in one request; records come back in the order of `ids`
+export const getPatients = async (ids) => {
+    try {
+        const response = await client.get('/api/patients', {
+            params: { ids: ids.join(',') },
+        });
+        if (response.data.missing?.length) {
+            console.warn('Patients not found:', response.data.missing);
+        }
+        return (response.data.results || []).map(transformPatient);
+    } catch (error) {
+        console.error(`Get patients ${ids.join(',')} failed:`, error);
+        throw error;
+    }
+};
+
 export const matchPatients = async (sourceId, targetId) => {
     try {
-        // Fetch full patient records first
-        const [p1, p2] = await Promise.all([
-            getPatient(sourceId),
-            getPatient(targetId)
-        ]);
+        // Fetch both full patient records in one request
+        const patients = await getPatients([sourceId, targetId]);
+        const byId = Object.fromEntries(patients.map(p => [p.id, p]));
+        const p1 = byId[sourceId];
+        const p2 = byId[targetId];
+        if (!p1 || !p2) {
+            throw new Error(`Patient ${p1 ? targetId : sourceId} not found`);
+        }
 
         console.log("Matching:", p1, p2);
 
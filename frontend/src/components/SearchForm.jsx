@@ -1,8 +1,28 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
+import { suggestNames } from '../api/client';
 
 const SearchForm = ({ onSearch, isLoading }) => {
     const [name, setName] = useState('');
     const [hospital, setHospital] = useState('A');
+    const [suggestions, setSuggestions] = useState([]);
+
+    // Type-ahead: fetch completions shortly after the user stops typing
+    useEffect(() => {
+        if (name.trim().length < 2) {
+            setSuggestions([]);
+            return;
+        }
+        let cancelled = false;
+        const timer = setTimeout(() => {
+            suggestNames(name, hospital)
+                .then(items => { if (!cancelled) setSuggestions(items); })
+                .catch(() => { if (!cancelled) setSuggestions([]); });
+        }, 150);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [name, hospital]);
 
     const handleSubmit = (e) => {
         e.preventDefault();
@@ -22,9 +42,14 @@ const SearchForm = ({ onSearch, isLoading }) => {
                         placeholder="e.g. Ramesh Singh"
                         value={name}
                         onChange={(e) => setName(e.target.value)}
+                        list="patient-name-suggestions"
+                        autoComplete="off"
                         required
                         disabled={isLoading}
                     />
+                    <datalist id="patient-name-suggestions">
+                        {suggestions.map(text => <option key={text} value={text} />)}
+                    </datalist>
                 </div>
                 <div className="w-full md:w-64">
                     <label className="block text-sm font-semibold text-gray-600 mb-2 uppercase tracking-wider">Hospital Source</label>
@@ -0,0 +1,166 @@
+"""
+Match Micro-Batching Benchmark
+
+Compares unbatched /api/match scoring with the micro-batched path:
+
+1. Scoring CPU per pair: match_patients() one pair at a time vs
+   match_patients_batch() (vectorized features) at several batch sizes
+2. End-to-end: `--concurrency` clients sending POST /api/match through the
+   ASGI app, with MATCH_BATCHING_ENABLED off and on; reports throughput
+   and p50/p99 latency
+
+Every pair is distinct and the match cache is disabled, so all requests
+are scored. Admission control is disabled so it does not cap the number
+of concurrent requests.
+
+The end-to-end client runs in the same process and event loop as the app,
+so it shares the CPU with it. Both modes score in the thread pool: one call
+per request unbatched, one call per batch batched. Latency includes the
+wait of every request ahead in the loop; compare throughput, and treat
+latency as an upper bound.
+
+Usage:
+    python scripts/benchmark_match_batching.py [--pairs 4000] [--concurrency 64]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+from app.config import settings
+from app.main import app
+from app.matching import simple_matcher
+from app.matching.match_cache import MatchCache
+from app.matching.simple_matcher import match_patients, match_patients_batch
+from app.routes import matching
+from app.utils.admission import admission
+from app.utils.micro_batch import MicroBatcher
+
+FIRST = ["Ramesh", "Priya", "Vijay", "Suresh", "Anita", "Lakshmi", "Arjun", "Kavya"]
+LAST = ["Singh", "Sharma", "Kumar", "Patel", "Reddy", "Iyer", "Gupta", "Nair"]
+
+
+def make_pairs(n: int, seed: int = 7) -> list:
+    """Distinct pairs: half typo'd duplicates, half different people."""
+    rng = random.Random(seed)
+
+    def person(i):
+        return {
+            "patient_id": f"P{i:07d}",
+            "name": f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+            "dob": f"{rng.randint(1950, 2010)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+            "gender": rng.choice("MF"),
+            "mobile": f"9{rng.randint(100000000, 999999999)}",
+        }
+
+    pairs = []
+    for i in range(n):
+        a = person(2 * i)
+        if i % 2:
+            b = person(2 * i + 1)
+        else:
+            name = a["name"]
+            j = rng.randrange(len(name) - 1)
+            b = {**a, "patient_id": f"P{2 * i + 1:07d}"}
+            b["name"] = name[:j] + name[j + 1] + name[j] + name[j + 2 :]
+        pairs.append((a, b))
+    return pairs
+
+
+def scoring_cpu(pairs: list, batch_sizes: list):
+    print("Scoring CPU per pair (microseconds)")
+    started = time.process_time()
+    for a, b in pairs:
+        match_patients(a, b)
+    unbatched = (time.process_time() - started) / len(pairs) * 1e6
+    print(f"{'unbatched':<12} {unbatched:10.1f}")
+    for size in batch_sizes:
+        started = time.process_time()
+        for i in range(0, len(pairs), size):
+            match_patients_batch(pairs[i : i + size])
+        per_pair = (time.process_time() - started) / len(pairs) * 1e6
+        print(
+            f"{'batch ' + str(size):<12} {per_pair:10.1f} {unbatched / per_pair:7.1f}x"
+        )
+
+
+async def load_test(pairs: list, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    queue = iter(pairs)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://b") as client:
+
+        async def worker():
+            for a, b in queue:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/match", json={"patient_a": a, "patient_b": b}
+                )
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(pairs) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pairs", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-size", type=int, default=settings.match_batch_max_size)
+    parser.add_argument(
+        "--max-wait-ms", type=float, default=settings.match_batch_max_wait_ms
+    )
+    args = parser.parse_args()
+
+    simple_matcher.match_cache = MatchCache(max_entries=0)
+    admission.enabled = False
+    simple_matcher.get_ml_matcher()  # Load weights outside the timings
+    pairs = make_pairs(args.pairs)
+
+    scoring_cpu(pairs, [8, 32, 128])
+
+    print()
+    print(
+        f"End-to-end POST /api/match, {args.concurrency} concurrent clients "
+        f"(batches of <= {args.max_size}, <= {args.max_wait_ms} ms)"
+    )
+    print(f"{'mode':<12} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    matching.match_batcher = MicroBatcher(
+        match_patients_batch, max_size=args.max_size, max_wait_ms=args.max_wait_ms
+    )
+    asyncio.run(load_test(pairs[:200], args.concurrency))  # Warm up
+    for mode, enabled in (("unbatched", False), ("batched", True)):
+        settings.match_batching_enabled = enabled
+        result = asyncio.run(load_test(pairs, args.concurrency))
+        print(
+            f"{mode:<12} {result['rps']:10.0f} "
+            f"{result['p50_ms']:10.2f} {result['p99_ms']:10.2f}"
+        )
+    stats = matching.match_batcher.stats()
+    print(
+        f"\nMean batch size {stats['mean_batch_size']}, "
+        f"mean wait {stats['mean_wait_ms']} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+N-gram TF-IDF Retrieval Benchmark
+
+Measures Recall@10 of the character n-gram TF-IDF shortlist (re-ranked with
+fuzz.ratio, as search_patients does) against the exhaustive
+process.extract over every name, and the per-query latency of both.
+
+Queries are corpus names with an Indian-name typo applied (swapped,
+dropped, doubled or substituted letter).
+
+Usage:
+    python scripts/benchmark_ngram_retrieval.py [--patients 200000] [--queries 200]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from rapidfuzz import fuzz, process
+
+from app.index.ngram_index import NgramIndex
+from scripts.benchmark_patient_store import synthetic_patients
+
+
+def typo(name: str, rng: random.Random) -> str:
+    """Apply one random edit (swap / drop / double / substitute)."""
+    i = rng.randrange(1, len(name) - 1)
+    edit = rng.choice(("swap", "drop", "double", "substitute"))
+    if edit == "swap":
+        return name[:i] + name[i + 1] + name[i] + name[i + 2 :]
+    if edit == "drop":
+        return name[:i] + name[i + 1 :]
+    if edit == "double":
+        return name[:i] + name[i] + name[i:]
+    return name[:i] + rng.choice("aeiouhy") + name[i + 1 :]
+
+
+def top_names(matches) -> set:
+    """Names of process.extract results (name, score, key)."""
+    return {match[0] for match in matches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--shortlist", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = [row[:3] for row in synthetic_patients(args.patients)]
+    started = time.perf_counter()
+    index = NgramIndex(rows)
+    print(f"Index build: {time.perf_counter() - started:.1f} s, {index.stats()}")
+
+    names = {row_id: name for row_id, name, _ in rows}
+    distinct = list(dict.fromkeys(names.values()))
+    rng = random.Random(7)
+    queries = [typo(rng.choice(rows)[1], rng) for _ in range(args.queries)]
+
+    recalls, exhaustive_ms, shortlist_ms = [], [], []
+    for query in queries:
+        started = time.perf_counter()
+        process.extract(query, names, scorer=fuzz.ratio, limit=10)
+        exhaustive_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        shortlist = index.shortlist(query, args.shortlist)
+        process.extract(query, shortlist, scorer=fuzz.ratio, limit=10)
+        shortlist_ms.append((time.perf_counter() - started) * 1000)
+
+        # Recall over distinct names (duplicates of a name share a score):
+        # the exhaustive top-10 names that reach the re-ranking stage
+        expected = top_names(
+            process.extract(query, distinct, scorer=fuzz.ratio, limit=10)
+        )
+        found = expected & set(shortlist.values())
+        recalls.append(len(found) / len(expected) if expected else 1.0)
+
+    print(f"Queries: {len(queries)}, corpus: {len(rows):,} names")
+    print(f"Recall@10 (distinct names): {sum(recalls) / len(recalls):.3f}")
+    print(f"Exhaustive extract:  {sorted(exhaustive_ms)[len(queries) // 2]:.1f} ms p50")
+    print(f"TF-IDF + re-rank:    {sorted(shortlist_ms)[len(queries) // 2]:.1f} ms p50")
+
+
+if __name__ == "__main__":
+    main()
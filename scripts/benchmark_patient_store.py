@@ -0,0 +1,118 @@
+"""
+Columnar Patient Store Benchmark
+
+Generates a synthetic patient corpus (1M records by default) and compares
+the memory per patient of the columnar PatientStore with a list of dicts
+(one dict per row, as `[dict(row) ...]` would hold it).
+
+It also times the vectorized demographic pre-filter and the fuzzy name
+scoring with and without it.
+
+Usage:
+    python scripts/benchmark_patient_store.py [--patients 1000000]
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from rapidfuzz import fuzz, process
+
+from app.index.patient_store import PatientStore
+
+FIRST_NAMES = [
+    "Ramesh", "Priya", "Vijay", "Anjali", "Suresh", "Lakshmi", "Arjun", "Sunita",
+    "Rahul", "Kavita", "Mohammed", "Fatima", "Harpreet", "Gurpreet", "Deepak",
+    "Pooja", "Sanjay", "Meena", "Ravi", "Geeta", "Amit", "Neha", "Kiran", "Asha",
+]  # fmt: skip
+LAST_NAMES = [
+    "Singh", "Sharma", "Kumar", "Gupta", "Patel", "Reddy", "Iyer", "Nair",
+    "Khan", "Das", "Yadav", "Joshi", "Mehta", "Verma", "Rao", "Chopra",
+]  # fmt: skip
+STATES = ["Maharashtra", "Delhi", "Karnataka", "Tamil Nadu", "Punjab", "Kerala"]
+
+
+def synthetic_patients(count: int, seed: int = 42):
+    """Yield (id, name, hospital_id, dob, gender, mobile, state) rows."""
+    rng = random.Random(seed)
+    for row_id in range(1, count + 1):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if rng.random() < 0.3:  # Middle initials / typos make names distinct
+            name += f" {chr(65 + rng.randrange(26))}{rng.randrange(1000)}"
+        yield (
+            row_id,
+            name,
+            f"hospital_{chr(97 + rng.randrange(5))}",
+            f"{rng.randrange(1940, 2020)}-{rng.randrange(1, 13):02d}-15",
+            rng.choice("MF"),
+            f"9{rng.randrange(10**9):09d}",
+            rng.choice(STATES),
+        )
+
+
+def measure(build):
+    """Return (result, bytes allocated by build())."""
+    tracemalloc.start()
+    result = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--dict-sample", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = list(synthetic_patients(args.patients))
+    keys = ("id", "name", "hospital_id", "dob", "gender", "mobile", "state")
+
+    # Strings of both representations already exist in `rows`; measure only
+    # what each representation allocates on top of the source rows
+    sample = rows[: args.dict_sample]
+    _, dict_bytes = measure(lambda: [dict(zip(keys, row)) for row in sample])
+    started = time.perf_counter()
+    store, store_bytes = measure(lambda: PatientStore(rows))
+    build_s = time.perf_counter() - started
+
+    print(f"Patients: {len(store):,}")
+    print(
+        f"List of dicts: {dict_bytes / len(sample):8.1f} bytes/patient "
+        f"(measured on {len(sample):,})"
+    )
+    print(
+        f"PatientStore:  {store_bytes / len(store):8.1f} bytes/patient "
+        f"(traced), {store.memory_bytes()['total'] / len(store):.1f} (reported)"
+    )
+    print(f"Store build:   {build_s:.2f} s")
+    print("Columns:", {k: v for k, v in store.memory_bytes().items() if k != "total"})
+
+    filters = {"gender": "F", "birth_year": 1990, "year_window": 1}
+    started = time.perf_counter()
+    positions = store.filter(hospital_id="hospital_a", **filters)
+    filter_ms = (time.perf_counter() - started) * 1000
+    print(f"Pre-filter:    {filter_ms:.2f} ms -> {len(positions):,} candidates")
+
+    for label, names in (
+        ("filtered", store.names_by_row_id(positions)),
+        (
+            "hospital only",
+            store.names_by_row_id(store.filter(hospital_id="hospital_a")),
+        ),
+    ):
+        started = time.perf_counter()
+        process.extract("Priya Sharmaa", names, scorer=fuzz.ratio, limit=10)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"Fuzzy scoring ({label}, {len(names):,} names): {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Response Serialization Benchmark
+
+Compares per-request CPU time of the default FastAPI serialization path
+(jsonable_encoder + json.dumps, plus MatchResult re-validation for
+/api/match) with the orjson FastJSONResponse path, for the payloads of the
+search, details, history and match endpoints.
+
+It also reports end-to-end CPU per request through the ASGI app.
+
+Usage:
+    python scripts/benchmark_responses.py [--iterations 2000]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app.database import db
+from app.main import app
+from app.matching.simple_matcher import match_patients
+from app.models.patient import MatchResult
+from app.utils.quality_scorer import calculate_data_quality
+from app.utils.responses import FastJSONResponse
+
+
+def with_quality(patient: dict) -> dict:
+    score, missing = calculate_data_quality(patient)
+    patient["quality_score"] = score
+    patient["missing_fields"] = missing
+    return patient
+
+
+def build_payloads() -> dict:
+    """Build the response payload of each endpoint, as the routes do."""
+    search = [with_quality(p) for p in db.search_patients(name="Ramesh")]
+    patient_a = with_quality(db.get_patient("HA001"))
+    patient_b = with_quality(db.get_patient("HB001"))
+    visits = db.get_patient_visits("HA001")
+    return {
+        "search": {"results": search, "count": len(search), "search_type": "name"},
+        "details": patient_a,
+        "history": {"patient": patient_a, "visits": visits, "visit_count": len(visits)},
+        "match": match_patients(patient_a, patient_b),
+    }
+
+
+def legacy_render(endpoint: str, content) -> bytes:
+    """Default FastAPI path: validate (match only), encode, json.dumps."""
+    if endpoint == "match":
+        content = MatchResult.model_validate(content).model_dump()
+    encoded = jsonable_encoder(content)
+    return json.dumps(
+        encoded, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_render(endpoint: str, content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def cpu_us(fn, iterations: int) -> float:
+    """Average CPU time per call in microseconds."""
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    payloads = build_payloads()
+    print("Serialization CPU per request (microseconds)")
+    print(f"{'endpoint':<10} {'before':>10} {'after':>10} {'speedup':>8}")
+    for endpoint, content in payloads.items():
+        before = cpu_us(lambda: legacy_render(endpoint, content), args.iterations)
+        after = cpu_us(lambda: fast_render(endpoint, content), args.iterations)
+        print(f"{endpoint:<10} {before:10.1f} {after:10.1f} {before / after:7.1f}x")
+
+    client = TestClient(app)
+    requests = {
+        "search": lambda: client.get("/api/patients/search?name=Ramesh"),
+        "details": lambda: client.get("/api/patients/HA001"),
+        "history": lambda: client.get("/api/patients/HA001/history"),
+        "match": lambda: client.post(
+            "/api/match",
+            json={"patient_a": payloads["details"], "patient_b": payloads["details"]},
+        ),
+    }
+    iterations = max(args.iterations // 10, 50)
+    print()
+    print("End-to-end CPU per request through the ASGI app (microseconds)")
+    for endpoint, request in requests.items():
+        request()  # warm up
+        print(f"{endpoint:<10} {cpu_us(request, iterations):10.1f}")
+
+
+if __name__ == "__main__":
+    main()
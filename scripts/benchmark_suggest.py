@@ -0,0 +1,66 @@
+"""
+Type-ahead Suggestion Benchmark
+
+Builds the SuggestIndex over a synthetic corpus (1M names by default) and
+measures suggest() latency for random 1-4 letter prefixes, with and
+without a hospital filter, plus the cost of an incremental insert batch.
+
+Usage:
+    python scripts/benchmark_suggest.py [--patients 1000000] [--queries 2000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.index.suggest_index import SuggestIndex
+from app.index.symspell import tokenize
+from scripts.benchmark_symspell import synthetic_names
+
+
+def percentiles(samples_ms: list) -> str:
+    samples_ms = sorted(samples_ms)
+    p50 = samples_ms[len(samples_ms) // 2]
+    p99 = samples_ms[int(len(samples_ms) * 0.99)]
+    return f"p50 {p50:.3f} ms, p99 {p99:.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = list(synthetic_names(args.patients))
+    started = time.perf_counter()
+    index = SuggestIndex(rows)
+    print(f"Index build: {time.perf_counter() - started:.1f} s, {index.stats()}")
+
+    rng = random.Random(3)
+    prefixes = [
+        rng.choice(tokenize(rng.choice(rows)[1]))[: rng.randint(1, 4)]
+        for _ in range(args.queries)
+    ]
+    for hospital_id in (None, "hospital_a"):
+        latencies = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            index.suggest(prefix, hospital_id=hospital_id, limit=10)
+            latencies.append((time.perf_counter() - started) * 1000)
+        print(f"suggest (hospital={hospital_id}): {percentiles(latencies)}")
+
+    new_rows = [(len(rows) + i, name, h) for i, (_, name, h) in enumerate(rows[:1000])]
+    started = time.perf_counter()
+    index.add_many(new_rows)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"Incremental insert of {len(new_rows)} patients: {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
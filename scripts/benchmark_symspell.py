@@ -0,0 +1,93 @@
+"""
+SymSpell Index Benchmark
+
+Builds the SymSpell deletion index over a synthetic corpus and measures
+per-query candidate lookup latency for typo queries, checking the results
+against a brute-force edit-distance scan over every distinct token.
+
+Usage:
+    python scripts/benchmark_symspell.py [--patients 1000000] [--queries 500]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from rapidfuzz.distance import OSA
+
+from app.index.symspell import SymSpellIndex, allowed_distance, tokenize
+from scripts.benchmark_ngram_retrieval import typo
+
+SYLLABLES = [
+    "ra", "me", "sh", "pri", "ya", "vi", "jay", "ku", "mar", "an", "ja", "li",
+    "su", "re", "lak", "shmi", "ar", "jun", "ni", "ta", "deep", "ak", "poo", "san",
+    "gee", "ha", "ka", "vya", "moh", "am", "ma", "di", "sha", "ran", "dev", "ish",
+]  # fmt: skip
+
+
+def synthetic_names(count: int, seed: int = 42):
+    """Yield (id, name, hospital_id) rows over a large token vocabulary."""
+    rng = random.Random(seed)
+
+    def token():
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+    first_names = [token().title() for _ in range(20_000)]
+    last_names = [token().title() for _ in range(5_000)]
+    for row_id in range(1, count + 1):
+        name = f"{rng.choice(first_names)} {rng.choice(last_names)}"
+        yield row_id, name, f"hospital_{chr(97 + rng.randrange(5))}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = list(synthetic_names(args.patients))
+    started = time.perf_counter()
+    index = SymSpellIndex(rows)
+    print(f"Index build: {time.perf_counter() - started:.1f} s, {index.stats()}")
+
+    # Typo'd tokens from the corpus (tokens of 4+ letters, one random edit)
+    rng = random.Random(11)
+    tokens = [t for _, name, _ in rows[:10_000] for t in tokenize(name) if len(t) > 3]
+    terms = [typo(rng.choice(tokens), rng) for _ in range(args.queries)]
+
+    lookup_ms, exact = [], 0
+    vocabulary = list(index._postings)
+    for term in terms:
+        started = time.perf_counter()
+        found = index.lookup(term)
+        lookup_ms.append((time.perf_counter() - started) * 1000)
+
+        budget = allowed_distance(term, index.max_distance)
+        expected = {
+            token for token in vocabulary if OSA.distance(term, token) <= budget
+        }
+        exact += set(found) == expected
+
+    lookup_ms.sort()
+    print(f"Token lookups: {len(terms)}, vocabulary: {len(vocabulary):,} tokens")
+    print(f"Matches brute force: {exact}/{len(terms)}")
+    print(
+        f"Lookup latency: p50 {lookup_ms[len(terms) // 2]:.3f} ms, "
+        f"p99 {lookup_ms[int(len(terms) * 0.99)]:.3f} ms"
+    )
+
+    started = time.perf_counter()
+    query = typo(rows[0][1], rng)
+    candidates = index.candidates(query)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"candidates({query!r}): {len(candidates):,} patients, {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ This script should be run once during initial setup.
 Usage:
     python scripts/setup_database.py
 
+    # One SQLite file per hospital (shards/hospital_a.db, ...)
+    DATABASE_LAYOUT=sharded python scripts/setup_database.py
+
 
 """
 
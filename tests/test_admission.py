@@ -0,0 +1,127 @@
+"""
+Tests for per-class admission control and load shedding
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.admission import AdmissionController, AdmissionPool, admission
+
+client = TestClient(app)
+
+
+async def hold(pool, release_event, admitted):
+    await pool.acquire()
+    admitted.append(pool.active)
+    try:
+        await release_event.wait()
+    finally:
+        pool.release()
+
+
+def test_queue_then_reject():
+    async def run():
+        pool = AdmissionPool("name", concurrency=1, queue=1, queue_timeout_s=5)
+        release, admitted = asyncio.Event(), []
+        first = asyncio.ensure_future(hold(pool, release, admitted))
+        queued = asyncio.ensure_future(hold(pool, release, admitted))
+        await asyncio.sleep(0)
+        assert pool.stats()["active"] == 1
+        assert pool.stats()["queued"] == 1
+
+        # Queue full: rejected at once with Retry-After
+        with pytest.raises(HTTPException) as exc:
+            await pool.acquire()
+        assert exc.value.status_code == 503
+        assert exc.value.headers == {"Retry-After": "1"}
+
+        release.set()
+        await asyncio.gather(first, queued)
+        return pool.stats()
+
+    stats = asyncio.run(run())
+    assert stats["active"] == 0
+    assert stats["admitted"] == 2
+    assert stats["rejected"] == 1
+
+
+def test_queue_timeout():
+    async def run():
+        pool = AdmissionPool("bulk", concurrency=1, queue=4, queue_timeout_s=0.01)
+        await pool.acquire()
+        with pytest.raises(HTTPException):
+            await pool.acquire()
+        pool.release()
+        return pool.stats()
+
+    stats = asyncio.run(run())
+    assert stats["timed_out"] == 1
+    assert stats["queued"] == 0
+    assert stats["active"] == 0
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def run():
+        pool = AdmissionPool("name", concurrency=1, queue=2, queue_timeout_s=5)
+        await pool.acquire()
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        pool.release()
+        return pool.stats()
+
+    stats = asyncio.run(run())
+    assert stats["queued"] == 0
+    assert stats["active"] == 0
+
+
+def test_saturated_class_does_not_block_others():
+    """A name-search storm leaves identifier lookups admitted"""
+
+    async def run():
+        controller = AdmissionController(
+            {
+                "name": AdmissionPool("name", concurrency=2, queue=0),
+                "identifier": AdmissionPool("identifier", concurrency=2, queue=0),
+            }
+        )
+        release, admitted = asyncio.Event(), []
+        storm = [
+            asyncio.ensure_future(hold(controller.pools["name"], release, admitted))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException):
+            async with controller.admit("name"):
+                pass
+        async with controller.admit("identifier"):
+            lookup_ok = True
+        release.set()
+        await asyncio.gather(*storm)
+        return lookup_ok, controller.stats()
+
+    lookup_ok, stats = asyncio.run(run())
+    assert lookup_ok
+    assert stats["name"]["rejected"] == 1
+    assert stats["identifier"]["admitted"] == 1
+
+
+def test_endpoint_returns_503_when_saturated(monkeypatch):
+    monkeypatch.setitem(admission.pools, "name", AdmissionPool("name", 0, 0))
+    response = client.get("/api/patients/search?name=Ramesh")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    # Identifier searches use their own pool
+    response = client.get("/api/patients/search?phone=9876543210")
+    assert response.status_code == 200
+
+    stats = client.get("/metrics").json()["admission"]
+    assert stats["name"]["rejected"] == 1
+    assert stats["identifier"]["active"] == 0
@@ -0,0 +1,89 @@
+"""
+Tests for the batch search endpoint
+"""
+
+from fastapi.testclient import TestClient
+
+from app.database import db
+from app.main import app
+from app.utils.budget import SearchBudget
+
+client = TestClient(app)
+
+QUERIES = [
+    {"id": "abha", "abha": "12-3456-7890-1234"},
+    {"id": "abha-clean", "abha": "12345678901234"},
+    {"id": "phone", "phone": "+91 98765 43210"},
+    {"id": "name", "name": "Ramesh"},
+    {"id": "typo", "name": "Rmaesh Sngh"},
+    {"id": "scoped", "name": "Ramesh", "hospital_id": "hospital_a"},
+    {"id": "female", "name": "Priya", "gender": "F"},
+    {"id": "born", "name": "Ramesh", "birth_year": 1985, "year_window": 2},
+    {"id": "none", "aadhaar": "234567890124"},
+]
+
+
+def ids(patients):
+    return [p["patient_id"] for p in patients]
+
+
+def test_batch_matches_single_searches():
+    batch = db.search_patients_batch(QUERIES)
+    assert set(batch) == {q["id"] for q in QUERIES}
+    for query in QUERIES:
+        criteria = {k: v for k, v in query.items() if k != "id"}
+        if "name" not in criteria:
+            criteria["hospital_id"] = None  # Identifiers search all hospitals
+        assert ids(batch[query["id"]]) == ids(db.search_patients(**criteria)), query
+    assert batch["abha"]
+    assert batch["none"] == []
+    assert all(p["gender"].upper().startswith("F") for p in batch["female"])
+
+
+def test_batch_stops_fuzzy_scoring_when_the_budget_runs_out():
+    budget = SearchBudget(0)
+    budget.cancel()
+    batch = db.search_patients_batch(QUERIES, budget=budget)
+    assert budget.partial
+    assert batch["typo"] == []  # Fuzzy-only match
+    assert ids(batch["abha"]) == ids(db.search_patients_batch(QUERIES)["abha"])
+
+
+def test_identifier_key():
+    assert db.identifier_key("abha", "12-3456 7890-1234") == "12345678901234"
+    assert db.identifier_key("phone", "+91 98765-43210") == "9876543210"
+    assert db.identifier_key("phone", "919876543210") == "9876543210"
+
+
+def test_batch_endpoint():
+    response = client.post(
+        "/api/patients/search/batch",
+        json={"queries": QUERIES, "fields": "patient_id,name,quality_score"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == len(QUERIES)
+    assert data["partial"] is False
+    abha = data["results"]["abha"]
+    assert abha["search_type"] == "abha"
+    assert abha["count"] == len(abha["results"]) > 0
+    assert set(abha["results"][0]) == {"patient_id", "name", "quality_score"}
+    assert data["results"]["typo"]["search_type"] == "name"
+    assert data["results"]["none"] == {
+        "results": [],
+        "count": 0,
+        "search_type": "aadhaar",
+    }
+
+
+def test_batch_endpoint_validation():
+    url = "/api/patients/search/batch"
+    duplicate = {"queries": [{"id": "1", "name": "Ramesh"}] * 2}
+    assert client.post(url, json=duplicate).status_code == 400
+    empty = {"queries": [{"id": "1", "hospital_id": "hospital_a"}]}
+    assert client.post(url, json=empty).status_code == 400
+    assert client.post(url, json={"queries": []}).status_code == 422
+    bad_field = {"queries": [{"id": "1", "name": "Ramesh"}], "fields": "secret"}
+    assert client.post(url, json=bad_field).status_code == 400
+    bad_gender = {"queries": [{"id": "1", "name": "Ramesh", "gender": "X"}]}
+    assert client.post(url, json=bad_gender).status_code == 422
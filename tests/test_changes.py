@@ -0,0 +1,111 @@
+"""
+Tests for the change log and the incremental sync endpoint
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import db
+from app.database.migrations import add_row_versions, apply_migrations
+from app.database.shards import ShardSet
+from app.main import app
+
+client = TestClient(app)
+SCHEMA = Path(__file__).parent.parent / "app" / "database" / "schema.sql"
+
+
+@pytest.fixture
+def single(tmp_path, monkeypatch):
+    """A small single-file database routed through db.py"""
+    path = tmp_path / "test.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA.read_text())
+    apply_migrations(conn)
+    conn.executemany(
+        "INSERT INTO patients (patient_id, hospital_id, name) VALUES (?, ?, ?)",
+        [("HA001", "hospital_a", "Ramesh Singh"), ("HB001", "hospital_b", "Priya")],
+    )
+    conn.commit()
+    monkeypatch.setattr(db, "shards", ShardSet.single(str(path), workers=1))
+    yield conn
+    conn.close()
+
+
+def log(conn):
+    return conn.execute(
+        "SELECT table_name, record_id, op FROM changes ORDER BY seq"
+    ).fetchall()
+
+
+def test_writes_are_logged_in_order(single):
+    conn = single
+    conn.execute("UPDATE patients SET state = 'Delhi' WHERE patient_id = 'HA001'")
+    conn.execute("INSERT INTO visits (visit_id, patient_id) VALUES ('V1', 'HA001')")
+    conn.execute("DELETE FROM patients WHERE patient_id = 'HB001'")
+    conn.commit()
+    assert log(conn) == [
+        ("patients", "HA001", "insert"),
+        ("patients", "HB001", "insert"),
+        ("patients", "HA001", "update"),  # Once per version bump
+        ("visits", "V1", "insert"),
+        ("patients", "HA001", "update"),  # The visit changed its history
+        ("patients", "HB001", "delete"),
+    ]
+
+
+def test_migration_backfills_existing_rows(tmp_path):
+    conn = sqlite3.connect(tmp_path / "old.db")
+    conn.executescript(SCHEMA.read_text())
+    add_row_versions(conn)
+    conn.execute("PRAGMA user_version = 1")
+    conn.execute(
+        "INSERT INTO patients (patient_id, hospital_id, name) VALUES ('P1', 'h', 'A')"
+    )
+    conn.execute("INSERT INTO visits (visit_id, patient_id) VALUES ('V1', 'P1')")
+    conn.commit()
+    apply_migrations(conn)
+    assert log(conn) == [("patients", "P1", "insert"), ("visits", "V1", "insert")]
+
+
+def test_get_changes_pages_with_records(single):
+    conn = single
+    conn.execute("UPDATE patients SET state = 'Delhi' WHERE patient_id = 'HA001'")
+    conn.execute("DELETE FROM patients WHERE patient_id = 'HB001'")
+    conn.commit()
+
+    changes, has_more = db.get_changes(since=0, limit=2)
+    assert [c["seq"] for c in changes] == [1, 2]
+    assert has_more
+    assert changes[0]["record"]["state"] == "Delhi"  # Current state
+    assert changes[1]["record"] is None  # Deleted since
+
+    changes, has_more = db.get_changes(since=2, limit=10)
+    assert [(c["record_id"], c["op"]) for c in changes] == [
+        ("HA001", "update"),
+        ("HB001", "delete"),
+    ]
+    assert not has_more
+    assert db.get_changes(since=4)[0] == []
+
+    changes, _ = db.get_changes(since=0, hospital_id="hospital_b")
+    assert {c["record_id"] for c in changes} == {"HB001"}
+
+
+def test_changes_endpoint(single):
+    response = client.get("/api/changes?since=0&limit=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 1
+    assert data["next_since"] == 1
+    assert data["has_more"] is True
+
+    data = client.get(f"/api/changes?since={data['next_since']}").json()
+    assert [c["record_id"] for c in data["changes"]] == ["HB001"]
+    assert data["has_more"] is False
+
+    # Nothing new: the cursor stays put
+    data = client.get("/api/changes?since=2").json()
+    assert data == {"changes": [], "count": 0, "next_since": 2, "has_more": False}
@@ -0,0 +1,127 @@
+"""
+Tests for row versions and ETag / conditional GET
+"""
+
+import sqlite3
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.database import db
+from app.database.shards import ShardSet
+from app.database.migrations import MIGRATIONS, apply_migrations
+from app.main import app
+
+client = TestClient(app)
+SCHEMA = Path(__file__).parent.parent / "app" / "database" / "schema.sql"
+
+
+def make_db(tmp_path):
+    conn = sqlite3.connect(tmp_path / "test.db")
+    conn.executescript(SCHEMA.read_text())
+    apply_migrations(conn)
+    conn.execute(
+        "INSERT INTO patients (patient_id, hospital_id, name) "
+        "VALUES ('HA001', 'hospital_a', 'Ramesh Singh')"
+    )
+    conn.commit()
+    return conn
+
+
+def versions(conn):
+    patient = conn.execute("SELECT version FROM patients").fetchone()[0]
+    data = conn.execute("SELECT value FROM meta").fetchone()[0]
+    return patient, data
+
+
+def test_migrations_are_idempotent(tmp_path):
+    """Re-applying migrations is a no-op"""
+    conn = make_db(tmp_path)
+    assert apply_migrations(conn) == len(MIGRATIONS)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+
+
+def test_patient_update_bumps_versions(tmp_path):
+    """Updating a patient bumps its row version and the data version"""
+    conn = make_db(tmp_path)
+    before = versions(conn)
+    conn.execute("UPDATE patients SET state = 'Maharashtra'")
+    conn.commit()
+    after = versions(conn)
+    assert after[0] == before[0] + 1
+    assert after[1] > before[1]
+
+
+def test_visit_write_bumps_patient_version(tmp_path):
+    """Adding a visit changes the patient's history version"""
+    conn = make_db(tmp_path)
+    before = versions(conn)
+    conn.execute("INSERT INTO visits (visit_id, patient_id) VALUES ('V1', 'HA001')")
+    conn.commit()
+    assert versions(conn)[0] == before[0] + 1
+
+
+def test_patient_details_304():
+    """If-None-Match with the current ETag returns an empty 304"""
+    first = client.get("/api/patients/HA001")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    second = client.get("/api/patients/HA001", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+def test_etag_depends_on_projection():
+    """Different projections are different representations"""
+    full = client.get("/api/patients/HA001").headers["etag"]
+    projected = client.get("/api/patients/HA001?fields=name").headers["etag"]
+    assert full != projected
+
+
+def test_history_and_search_304():
+    """History and search responses are revalidated too"""
+    for url in ("/api/patients/HA001/history", "/api/patients/search?name=Ramesh"):
+        etag = client.get(url).headers["etag"]
+        response = client.get(url, headers={"If-None-Match": f'"other", {etag}'})
+        assert response.status_code == 304
+
+
+def test_write_invalidates_etag():
+    """A write to the patient row changes its ETag"""
+    etag = client.get("/api/patients/HA001").headers["etag"]
+    with db.get_db() as session:
+        session.execute(
+            text("UPDATE patients SET state = state WHERE patient_id = 'HA001'")
+        )
+        session.commit()
+
+    response = client.get("/api/patients/HA001", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_reinserted_patient_gets_new_etag(tmp_path, monkeypatch):
+    """Versions restart on re-insert; the row id keeps old ETags stale"""
+    conn = make_db(tmp_path)
+    monkeypatch.setattr(db, "shards", ShardSet.single(str(tmp_path / "test.db")))
+    for url in ("/api/patients/HA001", "/api/patients/HA001/history"):
+        etag = client.get(url).headers["etag"]
+        conn.execute("DELETE FROM patients WHERE patient_id = 'HA001'")
+        conn.execute(
+            "INSERT INTO patients (patient_id, hospital_id, name) "
+            "VALUES ('HA001', 'hospital_a', 'Someone Else')"
+        )
+        conn.commit()
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+
+def test_unknown_patient_404_before_payload():
+    """Missing patients still return 404"""
+    response = client.get("/api/patients/NONEXISTENT", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
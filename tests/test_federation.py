@@ -0,0 +1,244 @@
+"""
+Tests for federated fan-out search across hospital nodes
+
+Uses small stand-in node apps served through httpx.ASGITransport, so no
+network or second server process is needed.
+"""
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.federation import CircuitBreaker, FederatedClient, HospitalNode, NodeRegistry
+
+
+def make_node_app(
+    patients, delay_s=0.0, fail=False, fail_status=500, html=False, body=None
+):
+    """Stand-in PRAISA node exposing search and history."""
+    node = FastAPI()
+
+    @node.get("/api/patients/search")
+    async def search(name: str = None):
+        await asyncio.sleep(delay_s)
+        if fail:
+            raise HTTPException(status_code=fail_status, detail="node down")
+        if html:
+            return PlainTextResponse("<html>Sign in</html>")
+        if body is not None:
+            return body
+        results = [p for p in patients if name and name.lower() in p["name"].lower()]
+        return {"results": results, "count": len(results), "search_type": "name"}
+
+    @node.get("/api/patients/{patient_id}/history")
+    async def history(patient_id: str):
+        await asyncio.sleep(delay_s)
+        patient = next((p for p in patients if p["patient_id"] == patient_id), None)
+        if not patient:
+            raise HTTPException(status_code=404, detail="not found")
+        return {"patient": patient, "visits": [{"visit_id": "V1"}], "visit_count": 1}
+
+    return node
+
+
+NODES = {
+    "hospital_a": make_node_app([{"patient_id": "HA001", "name": "Ramesh Singh"}]),
+    "hospital_b": make_node_app([{"patient_id": "HB001", "name": "Ramehs Singh"}]),
+    "hospital_slow": make_node_app(
+        [{"patient_id": "HS001", "name": "Ramesh Kumar"}], delay_s=1.0
+    ),
+    "hospital_down": make_node_app([], fail=True),
+    "hospital_busy": make_node_app([], fail=True, fail_status=503),
+    "hospital_proxy": make_node_app([], html=True),
+    "hospital_list": make_node_app([], body=["not", "an", "object"]),
+}
+
+
+def make_client(names, timeout_s=0.2, **options):
+    registry = NodeRegistry(
+        HospitalNode(name, f"http://{name}", timeout_s) for name in names
+    )
+    transports = {name: httpx.ASGITransport(app=NODES[name]) for name in names}
+    return FederatedClient(registry, transports=transports, **options)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_search_merges_results_from_all_nodes():
+    """Results from every node are merged and tagged with their node"""
+
+    async def scenario():
+        client = make_client(["hospital_a", "hospital_b"])
+        try:
+            return await client.search({"name": "Singh"})
+        finally:
+            await client.aclose()
+
+    result = run(scenario())
+    assert result["partial"] is False
+    assert {p["node"] for p in result["results"]} == {"hospital_a", "hospital_b"}
+    assert result["nodes"]["hospital_a"]["status"] == "ok"
+    assert result["nodes"]["hospital_a"]["latency_ms"] >= 0
+
+
+def test_slow_node_returns_partial_results():
+    """A node slower than its timeout is reported, others still answer"""
+
+    async def scenario():
+        client = make_client(["hospital_a", "hospital_slow"], timeout_s=0.2)
+        try:
+            return await client.search({"name": "Ramesh"})
+        finally:
+            await client.aclose()
+
+    result = run(scenario())
+    assert result["partial"] is True
+    assert result["nodes"]["hospital_slow"]["status"] == "timeout"
+    assert [p["patient_id"] for p in result["results"]] == ["HA001"]
+
+
+def test_circuit_opens_after_repeated_failures():
+    """A failing node is skipped once its breaker opens"""
+
+    async def scenario():
+        client = make_client(["hospital_a", "hospital_down"], failure_threshold=2)
+        try:
+            statuses = []
+            for _ in range(3):
+                result = await client.search({"name": "Ramesh"})
+                statuses.append(result["nodes"]["hospital_down"]["status"])
+            return statuses
+        finally:
+            await client.aclose()
+
+    assert run(scenario()) == ["error", "error", "circuit_open"]
+
+
+def test_overloaded_node_does_not_open_circuit():
+    """A 503 (load shedding) is reported but is not a breaker failure"""
+
+    async def scenario():
+        client = make_client(["hospital_busy"], failure_threshold=1)
+        try:
+            results = [await client.search({"name": "Ramesh"}) for _ in range(2)]
+            return results, client.breaker("hospital_busy").state
+        finally:
+            await client.aclose()
+
+    results, state = run(scenario())
+    assert [r["nodes"]["hospital_busy"]["status"] for r in results] == [
+        "error",
+        "error",
+    ]
+    assert results[0]["partial"] is True
+    assert state == CircuitBreaker.CLOSED
+
+
+def test_non_json_answer_is_an_error():
+    """A 2xx that is not JSON is reported as an error, not raised"""
+
+    async def scenario():
+        client = make_client(["hospital_a", "hospital_proxy"])
+        try:
+            return await client.search({"name": "Ramesh"})
+        finally:
+            await client.aclose()
+
+    result = run(scenario())
+    assert result["partial"] is True
+    assert result["nodes"]["hospital_proxy"]["status"] == "error"
+    assert "JSONDecodeError" in result["nodes"]["hospital_proxy"]["error"]
+    assert [p["patient_id"] for p in result["results"]] == ["HA001"]
+
+
+class BrokenTransport(httpx.AsyncBaseTransport):
+    """Transport failing with a non-httpx exception"""
+
+    async def handle_async_request(self, request):
+        raise RuntimeError("transport bug")
+
+
+def test_unexpected_errors_fail_only_their_node():
+    """Malformed bodies and unexpected exceptions give partial results"""
+
+    async def scenario():
+        client = make_client(["hospital_a", "hospital_list"], failure_threshold=1)
+        client.registry = NodeRegistry(
+            [*client.registry, HospitalNode("hospital_broken", "http://b", 0.2)]
+        )
+        client._transports["hospital_broken"] = BrokenTransport()
+        try:
+            result = await client.search({"name": "Ramesh"})
+            states = {n: client.breaker(n).state for n in result["nodes"]}
+            return result, states
+        finally:
+            await client.aclose()
+
+    result, states = run(scenario())
+    assert result["partial"] is True
+    assert [p["patient_id"] for p in result["results"]] == ["HA001"]
+    assert "JSON object" in result["nodes"]["hospital_list"]["error"]
+    assert "transport bug" in result["nodes"]["hospital_broken"]["error"]
+    assert states["hospital_list"] == states["hospital_broken"] == "open"
+
+
+def test_cancelled_trial_releases_half_open_breaker():
+    """A trial request cancelled by its caller lets the next one through"""
+
+    async def scenario():
+        client = make_client(["hospital_slow"], timeout_s=5.0, reset_timeout_s=0.0)
+        breaker = client.breaker("hospital_slow")
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_failure()
+        try:
+            trial = asyncio.ensure_future(client.search({"name": "Ramesh"}))
+            await asyncio.sleep(0.05)
+            trial.cancel()
+            await asyncio.gather(trial, return_exceptions=True)
+            return breaker.allow()
+        finally:
+            await client.aclose()
+
+    assert run(scenario()) is True
+
+
+def test_history_collects_nodes_that_know_the_patient():
+    """404 from a node means 'not here', not a partial result"""
+
+    async def scenario():
+        client = make_client(["hospital_a", "hospital_b"])
+        try:
+            return await client.history("HB001")
+        finally:
+            await client.aclose()
+
+    result = run(scenario())
+    assert result["partial"] is False
+    assert [h["node"] for h in result["histories"]] == ["hospital_b"]
+    assert result["nodes"]["hospital_a"]["status"] == "not_found"
+    assert result["visit_count"] == 1
+
+
+def test_breaker_half_open_after_reset_timeout():
+    """After the reset timeout one trial request is allowed"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=0.0)
+    breaker.record_failure()
+    assert breaker.allow() is True  # trial
+    assert breaker.allow() is False  # only one trial in flight
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_federation_endpoint_requires_params():
+    """The API endpoint validates its parameters"""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    response = TestClient(app).get("/api/federation/search")
+    assert response.status_code == 400
@@ -0,0 +1,191 @@
+"""
+Tests for identifier validation and the Bloom-filter negative cache
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database import db
+from app.database.migrations import apply_migrations
+from app.database.shards import ShardSet
+from app.index import IndexManager, index_manager
+from app.index.identifier_filter import BloomFilter, IdentifierFilter
+from app.main import app
+from app.utils.exceptions import (
+    AadhaarValidationException,
+    ABHAValidationException,
+    PhoneValidationException,
+)
+from app.utils.identifiers import validate_identifier, verhoeff_valid
+
+client = TestClient(app)
+
+UNREGISTERED_ABHA = "10-2030-4050-6070"
+SCHEMA = Path(__file__).parent.parent / "app" / "database" / "schema.sql"
+
+
+def test_bloom_filter_has_no_false_negatives():
+    members = [f"{i:014d}" for i in range(0, 20000, 2)]
+    bloom = BloomFilter(len(members), error_rate=0.01)
+    bloom.add_many(members)
+    assert all(m in bloom for m in members)
+
+    others = [f"{i:014d}" for i in range(1, 20000, 2)]
+    false_positives = sum(o in bloom for o in others)
+    assert false_positives / len(others) < 0.03
+
+
+def test_identifier_filter_normalizes_values():
+    filters = IdentifierFilter(
+        [
+            (1, "hospital_a", "12-3456-7890-1234", "1234 1234 1234", "+91 98765-43210"),
+            (2, "hospital_a", None, "", None),
+        ]
+    )
+    assert filters.might_contain("abha", "12345678901234")
+    assert filters.might_contain("aadhaar", "123412341234")
+    assert filters.might_contain("phone", "9876543210")
+    assert not filters.might_contain("abha", "10203040506070")
+    assert filters.stats()["entries"] == 3
+
+
+def test_verhoeff():
+    assert verhoeff_valid("123412341234")
+    assert verhoeff_valid("234567890124")
+    assert not verhoeff_valid("234567890125")
+    assert not verhoeff_valid("000000000000")
+
+
+def test_validate_identifier(monkeypatch):
+    monkeypatch.setattr(settings, "aadhaar_checksum_validation", True)
+    assert validate_identifier("abha", "12-3456-7890-1234") == "12345678901234"
+    assert validate_identifier("phone", "+91 98765 43210") == "9876543210"
+    assert validate_identifier("aadhaar", "2345 6789 0124") == "234567890124"
+    with pytest.raises(ABHAValidationException):
+        validate_identifier("abha", "329520")
+    with pytest.raises(AadhaarValidationException):
+        validate_identifier("aadhaar", "78412669755")  # 11 digits
+    with pytest.raises(AadhaarValidationException):
+        validate_identifier("aadhaar", "234567890125")  # Checksum
+    with pytest.raises(PhoneValidationException):
+        validate_identifier("phone", "98765-4321x")
+
+    monkeypatch.setattr(settings, "aadhaar_checksum_validation", False)
+    assert validate_identifier("aadhaar", "234567890125") == "234567890125"
+
+
+def test_definite_miss_skips_sqlite(monkeypatch):
+    index_manager.invalidate()  # Filters for the data written by earlier tests
+    assert db.search_patients(abha="12-3456-7890-1234")  # Registered
+
+    def no_sqlite(*args, **kwargs):
+        raise AssertionError("Patients queried for a definite miss")
+
+    monkeypatch.setattr(db, "_search_shard", no_sqlite)
+    assert db.search_patients(abha=UNREGISTERED_ABHA) == []
+    assert db.search_patients(aadhaar="234567890124") == []
+
+
+def insert_patient(conn, patient_id, abha):
+    conn.execute(
+        "INSERT INTO patients (patient_id, hospital_id, name, abha_number) "
+        "VALUES (?, 'hospital_a', 'New Patient', ?)",
+        (patient_id, abha),
+    )
+    conn.commit()
+
+
+def found(abha):
+    single = [p["patient_id"] for p in db.search_patients(abha=abha)]
+    batch = db.search_patients_batch([{"id": "1", "abha": abha}])["1"]
+    assert [p["patient_id"] for p in batch] == single
+    return single
+
+
+def test_filters_follow_writes(tmp_path, monkeypatch):
+    """Inserts are added in place; deletes and identifier edits rebuild"""
+    conn = sqlite3.connect(tmp_path / "test.db")
+    conn.executescript(SCHEMA.read_text())
+    apply_migrations(conn)
+    insert_patient(conn, "HA001", "12-3456-7890-1234")
+    monkeypatch.setattr(db, "shards", ShardSet.single(str(tmp_path / "test.db")))
+    manager = IndexManager(refresh_interval_s=0, background_rebuild=False)
+    builds = []
+    manager.register(
+        "identifiers", lambda: builds.append(1) or IdentifierFilter.build()
+    )
+    monkeypatch.setattr("app.index.index_manager", manager)
+    assert found(UNREGISTERED_ABHA) == []
+    filters = manager.get("identifiers")
+
+    # New patient: refreshed in place, no rebuild, no SQLite probe per search
+    insert_patient(conn, "HA900", UNREGISTERED_ABHA)
+    assert found(UNREGISTERED_ABHA) == ["HA900"]
+    assert manager.get("identifiers") is filters
+    assert filters.signature == manager.signature
+    assert len(builds) == 1
+
+    # Changed identifier: the old filters cannot drop values, so rebuild
+    conn.execute(
+        "UPDATE patients SET abha_number = '99-9999-9999-9999' "
+        "WHERE patient_id = 'HA900'"
+    )
+    conn.commit()
+    assert found("99-9999-9999-9999") == ["HA900"]
+    assert len(builds) == 2
+
+    # Other edits keep the filters
+    conn.execute("UPDATE patients SET name = 'Renamed' WHERE patient_id = 'HA900'")
+    conn.commit()
+    assert found("99-9999-9999-9999") == ["HA900"]
+    assert len(builds) == 2
+
+
+def test_filters_behind_the_manager_are_skipped(monkeypatch):
+    """Filters being rebuilt are not trusted with definite misses"""
+    index_manager.invalidate()
+    filters = index_manager.get("identifiers")
+    monkeypatch.setattr(filters, "signature", "older")
+    assert db._identifier_filter() is None
+
+
+def test_filter_disabled_queries_sqlite(monkeypatch):
+    monkeypatch.setattr(settings, "identifier_filter_enabled", False)
+    assert db.search_patients(abha=UNREGISTERED_ABHA) == []
+    assert db.search_patients(phone="9876543210")
+
+
+def test_stored_aadhaar_without_checksum_is_found():
+    """By default the checksum is not enforced (demo data fails it)"""
+    stored = next(
+        p["aadhaar_number"]
+        for p in db.search_patients(name="a")
+        if p["aadhaar_number"] and not verhoeff_valid(p["aadhaar_number"])
+    )
+    response = client.get("/api/patients/search", params={"aadhaar": stored})
+    assert response.status_code == 200
+    assert response.json()["count"] >= 1
+
+
+def test_malformed_identifiers_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "aadhaar_checksum_validation", True)
+    response = client.get("/api/patients/search?abha=12345")
+    assert response.status_code == 400
+    assert "14 digits" in response.json()["detail"]
+    assert client.get("/api/patients/search?aadhaar=234567890125").status_code == 400
+
+    # In a batch only the malformed query fails
+    response = client.post(
+        "/api/patients/search/batch",
+        json={"queries": [{"id": "x", "abha": "12345"}, {"id": "y", "name": "Ram"}]},
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results["x"]["count"] == 0
+    assert "14 digits" in results["x"]["error"]
+    assert results["y"]["count"] >= 1
+    assert "error" not in results["y"]
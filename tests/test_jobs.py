@@ -0,0 +1,164 @@
+"""
+Tests for the background job subsystem (job table, pools, API)
+"""
+
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import jobs
+from app.jobs import JobRunner, JobStore, tasks
+from app.jobs.runner import PROCESS
+from app.main import app
+
+client = TestClient(app)
+started = threading.Event()
+
+
+def count_to(ctx, n: int):
+    for i in range(n):
+        ctx.progress(i, n, f"at {i}")
+    ctx.progress(n, n, "done")
+    return {"counted": n}
+
+
+def run_until_cancelled(ctx):
+    started.set()
+    while True:
+        ctx.progress(0, 1)
+        time.sleep(0.01)
+
+
+def fail(ctx):
+    raise RuntimeError("broken input")
+
+
+def sum_squares(ctx, n: int):
+    """Process job: module-level so the worker process can import it"""
+    return {"sum": sum(i * i for i in range(n))}
+
+
+@pytest.fixture
+def runner(tmp_path):
+    runner = JobRunner(JobStore(str(tmp_path / "jobs.db")), progress_interval_s=0)
+    runner.register("count", count_to)
+    runner.register("forever", run_until_cancelled)
+    runner.register("fail", fail)
+    runner.register("squares", sum_squares, executor=PROCESS)
+    runner.register("rebuild_indexes", tasks.rebuild_indexes)
+    yield runner
+    runner.shutdown(wait=True)
+
+
+def wait_finished(runner, job_id, timeout_s=30.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        job = runner.store.get(job_id)
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} still {job['status']}")
+
+
+def test_thread_job_reports_progress_and_result(runner):
+    job = runner.submit("count", {"n": 5})
+    assert job["status"] == "queued"
+    job = wait_finished(runner, job["id"])
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"counted": 5}
+    assert (job["done"], job["total"], job["progress"]) == (5, 5, 1.0)
+    assert job["message"] == "done"
+
+
+def test_process_job_runs_in_another_process(runner):
+    job = wait_finished(runner, runner.submit("squares", {"n": 10})["id"])
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"sum": 285}
+
+
+def test_failures_are_recorded(runner):
+    job = wait_finished(runner, runner.submit("fail")["id"])
+    assert job["status"] == "failed"
+    assert job["error"] == "RuntimeError: broken input"
+
+
+def test_running_job_is_cancelled_at_next_progress_report(runner):
+    started.clear()
+    job = runner.submit("forever")
+    assert started.wait(5)
+    assert runner.cancel(job["id"])["cancel_requested"] is True
+    assert wait_finished(runner, job["id"])["status"] == "cancelled"
+
+
+def test_queued_job_is_cancelled_before_it_starts(tmp_path):
+    runner = JobRunner(JobStore(str(tmp_path / "jobs.db")), thread_workers=1)
+    runner.register("forever", run_until_cancelled)
+    runner.register("count", count_to)
+    started.clear()
+    blocker = runner.submit("forever")
+    assert started.wait(5)
+    queued = runner.submit("count", {"n": 3})
+    assert runner.cancel(queued["id"])["status"] == "cancelled"
+    runner.cancel(blocker["id"])
+    wait_finished(runner, blocker["id"])
+    runner.shutdown(wait=True)
+    job = runner.store.get(queued["id"])
+    assert job["status"] == "cancelled"
+    assert job["started_at"] is None
+
+
+def test_invalid_submissions_are_rejected(runner):
+    with pytest.raises(ValueError, match="Unknown job type"):
+        runner.submit("nope")
+    with pytest.raises(ValueError, match="Invalid params"):
+        runner.submit("count", {"m": 1})
+
+
+def test_jobs_of_exited_workers_are_failed(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job = store.create("count", {"n": 1})
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    conn = store._connect()
+    conn.execute("UPDATE jobs SET owner_pid = ? WHERE id = ?", (exited.pid, job["id"]))
+    conn.close()
+    alive = store.create("count", {"n": 1})
+
+    assert store.fail_orphaned() == 1
+    assert store.get(job["id"])["status"] == "failed"
+    assert store.get(alive["id"])["status"] == "queued"
+
+
+def test_rebuild_indexes_job(runner):
+    job = wait_finished(
+        runner, runner.submit("rebuild_indexes", {"names": ["names"]})["id"]
+    )
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"indexes": ["names"]}
+
+
+def test_jobs_api(runner, monkeypatch):
+    monkeypatch.setattr(jobs, "_job_runner", runner)
+
+    response = client.post("/api/jobs", json={"type": "count", "params": {"n": 3}})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    wait_finished(runner, job_id)
+
+    job = client.get(f"/api/jobs/{job_id}").json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"counted": 3}
+    listing = client.get("/api/jobs").json()
+    assert [j["id"] for j in listing["jobs"]] == [job_id]
+    assert listing["types"]["squares"] == "process"
+
+    assert client.get("/api/jobs/unknown").status_code == 404
+    assert client.post("/api/jobs/unknown/cancel").status_code == 404
+    assert client.post("/api/jobs", json={"type": "nope"}).status_code == 400
+    assert client.post("/api/jobs/" + job_id + "/cancel").json()["status"] == (
+        "succeeded"
+    )
@@ -0,0 +1,85 @@
+"""
+Tests for the memory-mapped shared name index
+"""
+
+import os
+
+from app.index.mapped_index import MappedNameIndex, load_or_build, write_name_index
+from app.index.name_index import NameIndex
+
+ROWS = [
+    (1, "Ramesh Singh", "hospital_a"),
+    (2, "Priya Sharma", "hospital_a"),
+    (3, "Vijay Kumar", "hospital_b"),
+    (4, "Wijay Kumar", "hospital_b"),
+    (5, "Anjali Gupta", "hospital_a"),
+]
+
+
+def write(tmp_path, rows=ROWS, signature=(7,)):
+    path = str(tmp_path / "names.idx")
+    write_name_index(NameIndex(rows), path, list(signature))
+    return path
+
+
+def test_mapped_index_matches_in_memory_index(tmp_path):
+    """The mapped file answers every query like the NameIndex it came from"""
+    index = NameIndex(ROWS)
+    mapped = MappedNameIndex(write(tmp_path))
+
+    assert len(mapped) == len(index)
+    assert list(mapped.names) == index.names
+    assert list(mapped.normalized) == index.normalized
+    assert list(mapped.hospital_ids) == index.hospital_ids
+    assert mapped.names[:2] == index.names[:2]
+    for hospital_id in (None, "hospital_a", "hospital_b", "hospital_z"):
+        assert mapped.names_by_row_id(hospital_id) == index.names_by_row_id(hospital_id)
+        for name in ("Vijay Kumar", "Ramesh Singh", "Nobody"):
+            assert mapped.phonetic_row_ids(name, hospital_id) == (
+                index.phonetic_row_ids(name, hospital_id)
+            )
+    assert mapped.stats()["entries"] == 5
+    assert mapped.stats()["hospitals"] == 2
+
+
+def test_empty_index(tmp_path):
+    mapped = MappedNameIndex(write(tmp_path, rows=[]))
+    assert len(mapped) == 0
+    assert mapped.names_by_row_id() == {}
+    assert mapped.phonetic_row_ids("Ramesh") == []
+
+
+def test_rebuild_swaps_file_atomically(tmp_path):
+    """Readers of the old file keep working after a rebuilt file is renamed in"""
+    path = write(tmp_path)
+    old = MappedNameIndex(path)
+
+    write(tmp_path, rows=ROWS[:2], signature=(8,))
+    new = MappedNameIndex(path)
+
+    assert len(old) == 5 and old.names[4] == "Anjali Gupta"
+    assert len(new) == 2 and new.signature == [8]
+    assert [f for f in os.listdir(tmp_path) if f.endswith(".tmp")] == []
+
+
+def test_load_or_build_reuses_current_file(tmp_path, monkeypatch):
+    """A file built from the current data signature is mapped, not rebuilt"""
+    path = write(tmp_path, signature=(7,))
+
+    def fail():
+        raise AssertionError("index should not be rebuilt")
+
+    monkeypatch.setattr(NameIndex, "build", classmethod(lambda cls: fail()))
+    assert len(load_or_build(path, signature=(7,))) == 5
+
+    monkeypatch.setattr(NameIndex, "build", classmethod(lambda cls: cls(ROWS[:1])))
+    rebuilt = load_or_build(path, signature=(9,))
+    assert len(rebuilt) == 1
+    assert rebuilt.signature == [9]
+
+
+def test_corrupt_file_is_rebuilt(tmp_path, monkeypatch):
+    path = tmp_path / "names.idx"
+    path.write_bytes(b"not an index")
+    monkeypatch.setattr(NameIndex, "build", classmethod(lambda cls: cls(ROWS)))
+    assert len(load_or_build(str(path), signature=(1,))) == 5
@@ -0,0 +1,108 @@
+"""
+Tests for the content-keyed match result cache
+"""
+
+from fastapi.testclient import TestClient
+
+from app.database.db import get_patient
+from app.main import app
+from app.matching import simple_matcher
+from app.matching.match_cache import MatchCache, pair_key, record_key
+from app.matching.simple_matcher import get_ml_matcher, match_patients
+
+client = TestClient(app)
+
+PAIRS = [("HA001", "HB001"), ("HA002", "HB002"), ("HA003", "HB003")]
+
+
+def test_record_key():
+    record = {"name": "Ramesh Singh", "dob": "1985-03-15"}
+    assert record_key(record) == record_key({**record, "address": "MG Road"})
+    assert record_key(record) != record_key({**record, "dob": "1985-03-16"})
+
+    # A client-sent patient_id/version does not identify the content
+    stored = {**record, "patient_id": "HA001", "version": 3}
+    assert record_key(stored) == record_key(record)
+    assert record_key(stored) != record_key({**stored, "name": "Someone Else"})
+
+
+def test_pair_key_is_order_normalized():
+    a = {"patient_id": "HA001", "version": 1}
+    b = {"name": "Ramehs Singh"}
+    assert pair_key(a, b, "v1") == pair_key(b, a, "v1")
+    assert pair_key(a, b, "v1") != pair_key(a, b, "v2")
+
+
+def test_lru_eviction_and_stats():
+    cache = MatchCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert len(cache) == 2
+    assert cache.stats() == {
+        "entries": 2,
+        "max_entries": 2,
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+        "evictions": 1,
+    }
+
+    disabled = MatchCache(max_entries=0)
+    disabled.put("a", 1)
+    assert disabled.get("a") is None
+
+
+def test_cached_results_equal_fresh_scores(monkeypatch):
+    monkeypatch.setattr(simple_matcher, "match_cache", MatchCache())
+    for a_id, b_id in PAIRS:
+        a, b = get_patient(a_id), get_patient(b_id)
+        first = match_patients(a, b)
+        reversed_pair = match_patients(b, a)
+        again = match_patients(a, b)
+        assert again == first
+        assert reversed_pair["match_score"] == first["match_score"]
+        assert reversed_pair["patient_a_id"] == b_id
+        assert reversed_pair["patient_b_id"] == a_id
+    stats = simple_matcher.match_cache.stats()
+    assert stats["misses"] == len(PAIRS)
+    assert stats["hits"] == 2 * len(PAIRS)
+
+
+def test_order_normalization_matches_scorer():
+    """The cache shares A/B and B/A entries; the scorer must agree"""
+    matcher = get_ml_matcher()
+    for a_id, b_id in PAIRS:
+        a, b = get_patient(a_id), get_patient(b_id)
+        assert matcher.predict_detailed(a, b) == matcher.predict_detailed(b, a)
+
+
+def test_model_version_in_key(monkeypatch):
+    monkeypatch.setattr(simple_matcher, "match_cache", MatchCache())
+    matcher = get_ml_matcher()
+    a, b = get_patient("HA001"), get_patient("HB001")
+    match_patients(a, b)
+    monkeypatch.setattr(matcher, "weights", {**matcher.weights, "DOB Match": 7.0})
+    match_patients(a, b)
+    assert simple_matcher.match_cache.stats()["misses"] == 2
+
+
+def test_spoofed_version_does_not_reuse_entry(monkeypatch):
+    """Same patient_id/version with different fields is scored afresh"""
+    monkeypatch.setattr(simple_matcher, "match_cache", MatchCache())
+    a, b = get_patient("HA001"), get_patient("HB001")
+    a["version"] = b["version"] = 1
+    genuine = client.post("/api/match", json={"patient_a": a, "patient_b": b})
+    spoofed = {**b, "name": "Someone Else", "abha_number": None}
+    response = client.post("/api/match", json={"patient_a": a, "patient_b": spoofed})
+    assert response.json()["match_score"] != genuine.json()["match_score"]
+    assert simple_matcher.match_cache.stats()["misses"] == 2
+
+
+def test_metrics_endpoint_reports_match_cache():
+    a, b = get_patient("HA001"), get_patient("HB001")
+    client.post("/api/match", json={"patient_a": a, "patient_b": b})
+    stats = client.get("/metrics").json()["match_cache"]
+    assert stats["hits"] + stats["misses"] >= 1
@@ -0,0 +1,145 @@
+"""
+Tests for Merkle-tree reconciliation between two PRAISA nodes
+
+Each node is the real application serving its own SQLite file: requests to
+a node swap in that node's shards and index manager for their duration
+(reconciliation makes one request at a time).
+"""
+
+import asyncio
+import sqlite3
+from pathlib import Path
+
+import httpx
+import pytest
+
+import app.index
+from app.database import db
+from app.database.migrations import apply_migrations
+from app.database.shards import ShardSet
+from app.federation import MerkleReconciler
+from app.index import IndexManager, MerkleTree
+from app.main import app as application
+
+SCHEMA = Path(__file__).parent.parent / "app" / "database" / "schema.sql"
+
+SHARED = [
+    (f"HA{i:03d}", "hospital_a", f"Patient {i}", f"98765{i:05d}") for i in range(200)
+]
+
+
+class NodeApp:
+    """The PRAISA app serving one node's database"""
+
+    def __init__(self, path, rows):
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA.read_text())
+        apply_migrations(conn)
+        conn.executemany(
+            "INSERT INTO patients (patient_id, hospital_id, name, mobile) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+        self.conn = conn
+        self.shards = ShardSet.single(str(path), workers=1)
+        self.indexes = IndexManager(refresh_interval_s=0)
+        self.indexes.register("merkle", MerkleTree.build)
+
+    def tree(self):
+        saved = db.shards
+        db.shards = self.shards
+        try:
+            return self.indexes.get("merkle")
+        finally:
+            db.shards = saved
+
+    async def __call__(self, scope, receive, send):
+        saved = db.shards, app.index.index_manager
+        db.shards, app.index.index_manager = self.shards, self.indexes
+        try:
+            await application(scope, receive, send)
+        finally:
+            db.shards, app.index.index_manager = saved
+
+
+@pytest.fixture
+def nodes(tmp_path):
+    """Node A and node B with 198 identical patients and three differences"""
+    rows_b = [row for row in SHARED if row[0] != "HA007"]
+    rows_b[10] = (*rows_b[10][:2], "Changed Name", rows_b[10][3])  # HA011
+    rows_b.append(("HB001", "hospital_b", "Priya Patel", "9123456789"))
+    node_a = NodeApp(tmp_path / "a.db", SHARED)
+    node_b = NodeApp(tmp_path / "b.db", rows_b)
+    yield node_a, node_b
+    node_a.conn.close()
+    node_b.conn.close()
+
+
+def diff(local, remote):
+    async def scenario():
+        transport = httpx.ASGITransport(app=remote)
+        async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+            return await MerkleReconciler(c).diff(local.tree())
+
+    return asyncio.run(scenario())
+
+
+def test_tree_ignores_row_order_and_local_columns():
+    """Equal content gives equal roots, whatever the row ids and versions"""
+    records = [{"patient_id": pid, "name": name} for pid, _, name, _ in SHARED]
+    shuffled = [{**r, "id": 999 - i, "version": 7} for i, r in enumerate(records)][::-1]
+    tree = MerkleTree(records, depth=2)
+    assert tree.root == MerkleTree(shuffled, depth=2).root
+    assert tree.root["count"] == 200
+    assert sum(c["count"] for c in tree.children("").values()) == 200
+
+    changed = [*records[:-1], {**records[-1], "name": "Other"}]
+    assert MerkleTree(changed, depth=2).root["hash"] != tree.root["hash"]
+
+
+def test_reconcile_finds_only_the_differences(nodes):
+    node_a, node_b = nodes
+    result = diff(node_a, node_b)
+
+    assert result["in_sync"] is False
+    assert [r["patient_id"] for r in result["missing_locally"]] == ["HB001"]
+    assert [r["patient_id"] for r in result["changed"]] == ["HA011"]
+    assert result["changed"][0]["name"] == "Changed Name"
+    assert result["missing_remotely"] == ["HA007"]
+    assert len(result["buckets"]) <= 3
+    # Root, one call per level, the buckets, the records
+    assert result["exchanges"] == node_a.tree().depth + 3
+
+
+def test_reconcile_is_symmetric(nodes):
+    node_a, node_b = nodes
+    result = diff(node_b, node_a)
+    assert [r["patient_id"] for r in result["missing_locally"]] == ["HA007"]
+    assert [r["patient_id"] for r in result["changed"]] == ["HA011"]
+    assert result["changed"][0]["name"] == "Patient 11"
+    assert result["missing_remotely"] == ["HB001"]
+
+
+def test_nodes_in_sync_after_one_exchange(nodes):
+    node_a, _ = nodes
+    result = diff(node_a, node_a)
+    assert result["in_sync"] is True
+    assert result["exchanges"] == 1
+
+
+def test_invalid_prefixes_are_rejected(nodes):
+    node_a, _ = nodes
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=node_a)
+        async with httpx.AsyncClient(transport=transport, base_url="http://a") as c:
+            return [
+                (await c.get("/api/merkle/nodes", params={"prefix": "xy"})).status_code,
+                (
+                    await c.get("/api/merkle/buckets", params={"prefix": "a"})
+                ).status_code,
+                (await c.get("/api/merkle/nodes")).status_code,
+            ]
+
+    assert asyncio.run(scenario()) == [400, 400, 200]
@@ -0,0 +1,142 @@
+"""
+Tests for micro-batching of match requests and the vectorized match path
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database.db import get_patient
+from app.main import app
+from app.matching.match_cache import MatchCache
+from app.matching import simple_matcher
+from app.matching.ml_matcher import FEATURES, extract_feature_matrix, extract_features
+from app.matching.model_reload import load_golden
+from app.matching.simple_matcher import (
+    get_ml_matcher,
+    match_patients,
+    match_patients_batch,
+)
+from app.utils.micro_batch import MicroBatcher
+
+client = TestClient(app)
+
+IDS_A = ["HA001", "HA002", "HA003", "HA004", "HA005"]
+IDS_B = ["HB001", "HB002", "HB003", "HB004", "HB005"]
+
+
+def pairs():
+    """Demo pairs (all combinations), golden pairs and edge cases"""
+    result = [(get_patient(a), get_patient(b)) for a in IDS_A for b in IDS_B]
+    result += [(pair["a"], pair["b"]) for pair in load_golden()]
+    result += [
+        ({"name": ""}, {"name": "Ramesh Singh"}),
+        ({"name": "Ramesh"}, {"name": "Ramesh", "dob": "unknown"}),
+        ({"name": "Amit Kumar", "dob": "1995-12-12"}, {"name": "Amit Kumar"}),
+    ]
+    return result
+
+
+def recording_batcher(max_size=4, max_wait_ms=20.0):
+    batches = []
+
+    def double(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    return MicroBatcher(double, max_size=max_size, max_wait_ms=max_wait_ms), batches
+
+
+def test_full_batches_flush_without_waiting():
+    batcher, batches = recording_batcher(max_size=4, max_wait_ms=10_000)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(8)))
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8, 10, 12, 14]
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert batcher.stats()["full_flushes"] == 2
+
+
+def test_partial_batch_flushes_after_max_wait():
+    batcher, batches = recording_batcher(max_size=100, max_wait_ms=5)
+
+    async def run():
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+    assert asyncio.run(run()) == [2, 4]
+    assert batches == [[1, 2]]
+    stats = batcher.stats()
+    assert stats["timeout_flushes"] == 1
+    assert stats["mean_batch_size"] == 2.0
+    assert stats["mean_wait_ms"] >= 4.0
+
+
+def test_batch_errors_reach_every_caller():
+    def broken(items):
+        raise RuntimeError("scorer failed")
+
+    batcher = MicroBatcher(broken, max_size=2)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+
+    errors = asyncio.run(run())
+    assert [str(e) for e in errors] == ["scorer failed", "scorer failed"]
+
+
+def test_cancelled_callers_are_dropped():
+    batcher, batches = recording_batcher(max_size=100, max_wait_ms=20)
+
+    async def run():
+        gone = asyncio.ensure_future(batcher.submit(1))
+        kept = asyncio.ensure_future(batcher.submit(2))
+        await asyncio.sleep(0)
+        gone.cancel()
+        return await kept
+
+    assert asyncio.run(run()) == 4
+    assert batches == [[2]]
+    assert batcher.stats()["dropped"] == 1
+
+
+def test_feature_matrix_matches_extract_features():
+    pairs_ = pairs()
+    X = extract_feature_matrix(pairs_)
+    for row, (a, b) in zip(X, pairs_):
+        assert list(row) == [extract_features(a, b)[name] for name in FEATURES]
+
+
+def test_batch_results_match_single_results(monkeypatch):
+    monkeypatch.setattr(simple_matcher, "match_cache", MatchCache(max_entries=0))
+    matcher = get_ml_matcher()
+    pairs_ = pairs()
+    for batched, (a, b) in zip(matcher.predict_batch(pairs_), pairs_):
+        single = matcher.predict_detailed(a, b)
+        assert batched["prob"] == pytest.approx(single["prob"], abs=1e-12)
+        assert {**batched, "prob": 0} == {**single, "prob": 0}
+
+    for batched, (a, b) in zip(match_patients_batch(pairs_), pairs_):
+        single = match_patients(a, b)
+        assert batched["recommendation"] == single["recommendation"]
+        assert batched["patient_a_id"] == single["patient_a_id"]
+
+
+def test_match_endpoint_with_batching(monkeypatch):
+    monkeypatch.setattr(settings, "match_batching_enabled", True)
+    a, b = get_patient("HA002"), get_patient("HB002")
+    response = client.post("/api/match", json={"patient_a": a, "patient_b": b})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["recommendation"] == match_patients(a, b)["recommendation"]
+    assert result["patient_b_id"] == "HB002"
+    assert client.get("/metrics").json()["match_batching"]["submitted"] >= 1
+
+
+def test_default_batch_fits_match_concurrency():
+    """Only admitted requests are batched: larger batches would never fill"""
+    assert settings.match_batch_max_size <= settings.admission_pools["match"][0]
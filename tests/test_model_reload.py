@@ -0,0 +1,147 @@
+"""
+Tests for versioned matcher weights and their hot reload
+"""
+
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.matching import ml_matcher, model_reload
+from app.matching.ml_matcher import WeightsSnapshot
+from app.matching.model_reload import ModelReloader, load_golden, validate_golden
+from app.matching.simple_matcher import get_ml_matcher, match_patients
+
+client = TestClient(app)
+
+# Puts all weight on the names: same-name, same-DOB people with different
+# ABHA numbers (golden non-matches) then score as matches
+NAME_ONLY = {
+    "Fuzzy Ratio": 5.0,
+    "Token Sort Ratio": 5.0,
+    "First Name Match": 5.0,
+    "Last Name Match": 5.0,
+    "DOB Match": 1.0,
+}
+
+
+@pytest.fixture
+def matcher():
+    """The shared matcher, restored to its weights after the test"""
+    matcher = get_ml_matcher()
+    snapshot = matcher.snapshot
+    yield matcher
+    matcher.swap(snapshot)
+
+
+@pytest.fixture
+def weights_file(tmp_path, matcher):
+    path = tmp_path / "weights.json"
+    path.write_text(json.dumps(dict(matcher.weights)))
+    return path
+
+
+def write_weights(path, weights):
+    path.write_text(json.dumps(weights))
+    # Distinct mtime even on coarse filesystem clocks
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_snapshot_validation():
+    snapshot = WeightsSnapshot.create({"DOB Match": 2}, "test")
+    assert snapshot.version == ml_matcher.weights_version({"DOB Match": 2})
+    with pytest.raises(TypeError):
+        snapshot.weights["DOB Match"] = 3.0
+    for bad in ({}, {"DOB Match": -1}, {"DOB Match": "2"}, {"Eye Colour": 1.0}):
+        with pytest.raises(ValueError):
+            WeightsSnapshot.create(bad, "test")
+
+
+def test_results_report_the_snapshot_version(matcher):
+    a = {"name": "Ramesh Singh", "dob": "1985-03-15", "gender": "M"}
+    b = {"name": "Ramehs Singh", "dob": "1985-03-15", "gender": "M"}
+    old = matcher.snapshot
+    new = WeightsSnapshot.create(NAME_ONLY, "test")
+    assert matcher.predict_detailed(a, b, new)["model_version"] == new.version
+    assert matcher.snapshot is old  # Scoring with a snapshot does not swap it in
+
+    assert match_patients(a, b)["model_version"] == old.version
+    assert matcher.swap(new) is old
+    assert match_patients(a, b)["model_version"] == new.version
+    response = client.post("/api/match", json={"patient_a": a, "patient_b": b})
+    assert response.json()["model_version"] == new.version
+
+
+def test_golden_set_passes_with_shipped_weights(matcher):
+    golden = validate_golden(matcher, matcher.snapshot, load_golden())
+    assert golden["failures"] == []
+    assert golden["accuracy"] == 1.0
+
+
+def test_reload_swaps_valid_weights(matcher, weights_file):
+    reloader = ModelReloader(str(weights_file))
+    assert reloader.reload()["status"] == "unchanged"
+
+    weights = {**matcher.weights, "Gender Match": 1.0}
+    write_weights(weights_file, weights)
+    previous = matcher.model_version
+    result = reloader.reload()
+    assert result["status"] == "swapped"
+    assert result["previous_version"] == previous
+    assert result["model_version"] == ml_matcher.weights_version(weights)
+    assert matcher.model_version == result["model_version"]
+    assert matcher.snapshot.source == str(weights_file)
+    assert reloader.stats()["swaps"] == 1
+
+
+def test_reload_rejects_failing_weights(matcher, weights_file):
+    reloader = ModelReloader(str(weights_file))
+    version = matcher.model_version
+
+    write_weights(weights_file, NAME_ONLY)
+    result = reloader.reload()
+    assert result["status"] == "rejected"
+    assert result["golden"]["failures"]
+    assert "Golden set accuracy" in result["error"]
+
+    weights_file.write_text("{not json")
+    assert "JSONDecodeError" in reloader.reload()["error"]
+    assert matcher.model_version == version  # Old weights stay in use
+    assert reloader.stats()["rejected"] == 2
+
+
+def test_watcher_reloads_changed_file(matcher, weights_file):
+    reloader = ModelReloader(str(weights_file))
+    reloader.start(interval_s=3600)  # Driven by check() below
+    try:
+        assert reloader.check() is None  # Unchanged since start()
+        write_weights(weights_file, {**matcher.weights, "Gender Match": 1.0})
+        assert reloader.check()["status"] == "swapped"
+        assert reloader.check() is None
+        assert reloader.stats()["watching"] is True
+    finally:
+        reloader.stop()
+    assert reloader.stats()["watching"] is False
+
+
+def test_admin_api(matcher, weights_file, monkeypatch):
+    monkeypatch.setattr(
+        model_reload, "model_reloader", ModelReloader(str(weights_file))
+    )
+    monkeypatch.setattr("app.routes.admin.model_reloader", model_reload.model_reloader)
+    status = client.get("/api/admin/model").json()
+    assert status["model_version"] == matcher.model_version
+
+    write_weights(weights_file, {**matcher.weights, "Gender Match": 1.0})
+    response = client.post("/api/admin/model/reload")
+    assert response.status_code == 200
+    assert response.json()["status"] == "swapped"
+
+    write_weights(weights_file, NAME_ONLY)
+    response = client.post("/api/admin/model/reload")
+    assert response.status_code == 422
+    assert response.json()["status"] == "rejected"
+    assert "model" in client.get("/metrics").json()
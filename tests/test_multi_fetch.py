@@ -0,0 +1,44 @@
+"""
+Tests for fetching several patients by ID
+"""
+
+from fastapi.testclient import TestClient
+
+from app.database import db
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_get_patients_one_query():
+    found = db.get_patients(["HA001", "HB001", "HX999"])
+    assert set(found) == {"HA001", "HB001"}
+    assert found["HA001"] == db.get_patient("HA001")
+    assert db.get_patients([]) == {}
+
+
+def test_records_in_request_order_with_missing():
+    response = client.get("/api/patients?ids=HB001,HX999,HA001,HB001")
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["patient_id"] for p in data["results"]] == ["HB001", "HA001"]
+    assert data["count"] == 2
+    assert data["missing"] == ["HX999"]
+
+    # Same enriched records as the single-patient endpoint
+    single = client.get("/api/patients/HA001").json()
+    assert data["results"][1] == single
+    assert "quality_score" in single and "missing_fields" in single
+
+
+def test_projection_and_post_variant():
+    response = client.post(
+        "/api/patients/batch",
+        json={"ids": ["HA001", "HB001"], "fields": "patient_id,quality_score"},
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [set(p) for p in results] == [{"patient_id", "quality_score"}] * 2
+
+    assert client.get("/api/patients?ids=HA001&fields=secret").status_code == 400
+    assert client.post("/api/patients/batch", json={"ids": []}).status_code == 422
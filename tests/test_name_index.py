@@ -0,0 +1,126 @@
+"""
+Unit Tests for the in-memory Name Index and Index Manager
+"""
+
+import threading
+
+from app.index.manager import IndexManager
+from app.index.name_index import NameIndex
+
+ROWS = [
+    (1, "Ramesh Singh", "hospital_a"),
+    (2, "Vijay Kumar", "hospital_a"),
+    (3, "Ramehs Singh", "hospital_b"),
+    (4, "Wijay Kumar", "hospital_b"),
+]
+
+
+def test_phonetic_lookup_handles_transliteration():
+    """v/w variants share a phonetic key"""
+    index = NameIndex(ROWS)
+    assert index.phonetic_row_ids("Vijay Kumar") == [2, 4]
+
+
+def test_hospital_filter():
+    """Positions and phonetic hits can be restricted to one hospital"""
+    index = NameIndex(ROWS)
+    assert index.names_by_row_id("hospital_b") == {3: "Ramehs Singh", 4: "Wijay Kumar"}
+    assert index.phonetic_row_ids("Vijay Kumar", "hospital_a") == [2]
+
+
+def test_stats():
+    """Index sizes are reported for /ready"""
+    stats = NameIndex(ROWS).stats()
+    assert stats["entries"] == 4
+    assert stats["hospitals"] == 2
+
+
+def test_manager_rebuilds_when_signature_changes():
+    """A changed data signature rebuilds cached indexes"""
+    signature = [(4, 4)]
+    builds = []
+
+    def builder():
+        builds.append(1)
+        return NameIndex(ROWS)
+
+    manager = IndexManager(signature_fn=lambda: signature[0], refresh_interval_s=0)
+    manager.register("names", builder)
+
+    first = manager.get("names")
+    assert manager.get("names") is first
+    assert len(builds) == 1
+
+    # The stale index is served while its replacement builds in the background
+    signature[0] = (5, 5)
+    assert manager.get("names") is first
+    assert manager.wait_for_rebuilds()
+    assert manager.get("names") is not first
+    assert len(builds) == 2
+
+
+def test_manager_rebuilds_inline_without_background():
+    signature = [(4, 4)]
+    manager = IndexManager(
+        signature_fn=lambda: signature[0],
+        refresh_interval_s=0,
+        background_rebuild=False,
+    )
+    manager.register("names", lambda: NameIndex(ROWS))
+    first = manager.get("names")
+    signature[0] = (5, 5)
+    assert manager.get("names") is not first
+
+
+def test_stale_index_is_served_during_rebuild():
+    """Readers are not blocked by a slow rebuild"""
+    signature = [(4, 4)]
+    release = threading.Event()
+    builds = []
+
+    def builder():
+        builds.append(1)
+        if len(builds) > 1:
+            release.wait(5)
+        return NameIndex(ROWS)
+
+    manager = IndexManager(signature_fn=lambda: signature[0], refresh_interval_s=0)
+    manager.register("names", builder)
+    first = manager.get("names")
+    signature[0] = (5, 5)
+    assert manager.get("names") is first  # Starts the rebuild
+    assert manager.get("names") is first  # Still served while it runs
+    assert manager.stats()["names"]["stale"] is True
+    release.set()
+    assert manager.wait_for_rebuilds()
+    assert manager.get("names") is not first
+    assert len(builds) == 2
+
+
+def test_slow_refresh_does_not_block_readers():
+    """Refreshes run outside the registry lock, one check at a time"""
+    signature = [1]
+    entered, release = threading.Event(), threading.Event()
+
+    class SlowIndex(NameIndex):
+        def refresh(self):
+            entered.set()
+            release.wait(5)
+            return True
+
+    manager = IndexManager(signature_fn=lambda: signature[0], refresh_interval_s=0)
+    manager.register("slow", lambda: SlowIndex(ROWS))
+    manager.register("names", lambda: NameIndex(ROWS))
+    slow = manager.get("slow")
+    names = manager.get("names")
+
+    signature[0] = 2
+    checker = threading.Thread(target=manager.get, args=("slow",))
+    checker.start()
+    assert entered.wait(5)
+    # Another thread's get() neither waits for nor repeats the check
+    assert manager.get("names") is names
+    assert manager.get("slow") is slow
+    release.set()
+    checker.join()
+    assert manager.stats()["slow"]["stale"] is False
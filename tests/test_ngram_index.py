@@ -0,0 +1,69 @@
+"""
+Tests for the character n-gram TF-IDF name shortlist
+"""
+
+from rapidfuzz import fuzz, process
+
+from app.config import settings
+from app.database import db
+from app.index import index_manager
+from app.index.ngram_index import NgramIndex
+
+ROWS = [
+    (1, "Ramesh Singh", "hospital_a"),
+    (2, "Ramesh Singh", "hospital_b"),
+    (3, "Priya Sharma", "hospital_a"),
+    (4, "Vijay Kumar", "hospital_b"),
+    (5, "Anjali Gupta", "hospital_a"),
+    (6, "Suresh Reddy", "hospital_a"),
+]
+
+
+def test_shortlist_finds_typos():
+    index = NgramIndex(ROWS)
+    assert index.shortlist("Ramehs Singh", k=1) == {
+        1: "Ramesh Singh",
+        2: "Ramesh Singh",
+    }
+    assert set(index.shortlist("Prya Sharma", k=1)) == {3}
+    assert set(index.shortlist("Wijay Kumarr", k=1)) == {4}
+
+
+def test_shortlist_scope():
+    index = NgramIndex(ROWS)
+    assert set(index.shortlist("Ramesh Singh", 1, hospital_id="hospital_b")) == {2}
+    assert set(index.shortlist("Ramesh Singh", 1, row_ids=[1])) == {1}
+    # Out-of-scope names do not take shortlist slots
+    assert set(index.shortlist("Ramesh", 1, hospital_id="hospital_b")) == {2}
+    assert index.shortlist("Ramesh", 5, hospital_id="hospital_z") == {}
+    assert index.shortlist("", 5) == {}
+    assert NgramIndex([]).shortlist("Ramesh", 5) == {}
+
+
+def test_recall_at_10_against_exhaustive():
+    """Re-ranking the shortlist finds the exhaustive top-10 on the demo data
+
+    Only matches above search_patients' fuzzy cutoff (70) count.
+    """
+    rows = db.iter_patient_names()
+    index = NgramIndex(rows)
+    names = {row_id: name for row_id, name, _ in rows}
+    for query in ("Ramehs Singh", "Prya Sharma", "Wijay Kumar", "Kumarr", "Anjli"):
+        expected = process.extract(
+            query, names, scorer=fuzz.ratio, limit=10, score_cutoff=70
+        )
+        shortlist = index.shortlist(query, settings.ngram_shortlist_size)
+        found = {match[0] for match in expected} & set(shortlist.values())
+        assert len(found) == len({match[0] for match in expected})
+
+
+def test_search_uses_shortlist_on_large_corpus(monkeypatch):
+    """search_patients gives the same results through the n-gram shortlist"""
+    exhaustive = db.search_patients(name="Ramehs Singh")
+    monkeypatch.setattr(settings, "candidate_index_min_names", 0)
+    index_manager.invalidate()
+    try:
+        assert db.search_patients(name="Ramehs Singh") == exhaustive
+        assert index_manager.stats()["ngrams"]["built"]
+    finally:
+        index_manager.invalidate()
@@ -0,0 +1,98 @@
+"""
+Tests for the columnar patient store and demographic search filters
+"""
+
+import numpy as np
+
+from app.database import db
+from app.index.patient_store import (
+    PatientStore,
+    birth_year,
+    gender_code,
+    mobile_last10,
+)
+
+ROWS = [
+    (1, "Ramesh Singh", "hospital_a", "1985-03-15", "M", "9876543210", "Maharashtra"),
+    (2, "Priya Sharma", "hospital_a", "1990-07-22", "F", "+91-98765-43211", "Delhi"),
+    (3, "Priya Sharma", "hospital_b", "1991-01-02", "F", None, "Delhi"),
+    (4, "Vijay Kumar", "hospital_b", None, "M", "9000000001", None),
+    (5, "Anjali Gupta", "hospital_a", "1970-05-05", "f", "9000000002", "Delhi"),
+    (6, "Sam Rao", "hospital_b", "1988-09-09", "Other", "9000000003", "Goa"),
+]
+
+
+def test_columns_are_compact_and_dictionary_encoded():
+    store = PatientStore(ROWS)
+    assert len(store) == 6
+    assert store.birth_year.dtype == np.int16
+    assert store.mobile_last10.dtype == np.int64
+    assert store.mobile_last10.tolist() == [
+        9876543210,
+        9876543211,
+        0,
+        9000000001,
+        9000000002,
+        9000000003,
+    ]
+    # Repeated names and states are stored once
+    assert len(store.names) == 5
+    assert store.name_code[1] == store.name_code[2]
+    assert len(store.states) == 4
+    assert store.memory_bytes()["total"] > 0
+
+
+def test_demographic_prefilters():
+    store = PatientStore(ROWS)
+    ids = store.row_ids
+
+    assert ids[store.filter(gender="F")].tolist() == [2, 3, 5]
+    assert ids[store.filter(gender="O")].tolist() == [6]
+    assert ids[store.filter(birth_year=1990, year_window=1)].tolist() == [2, 3]
+    assert ids[store.filter(birth_year=1990)].tolist() == [2]
+    assert ids[store.filter(hospital_id="hospital_a", gender="F")].tolist() == [2, 5]
+    assert store.filter(hospital_id="hospital_z").tolist() == []
+    # Unknown birth year never passes a birth-year filter
+    assert 4 not in ids[store.filter(birth_year=1985, year_window=100)].tolist()
+
+
+def test_names_by_row_id():
+    store = PatientStore(ROWS)
+    positions = store.filter(gender="F", hospital_id="hospital_a")
+    assert store.names_by_row_id(positions) == {2: "Priya Sharma", 5: "Anjali Gupta"}
+
+
+def test_parsers():
+    assert birth_year("1985-03-15") == 1985
+    assert birth_year(None) == 0
+    assert birth_year("unknown") == 0
+    assert mobile_last10("+91 98765 43210") == 9876543210
+    assert mobile_last10("") == 0
+    assert gender_code("Other") == gender_code("O") == 3
+    assert gender_code(None) == 0
+
+
+def test_search_with_demographic_filters():
+    """Name search narrowed by gender / birth year (SQL and fuzzy paths)"""
+    everyone = db.search_patients(name="Ramehs Singh")
+    assert everyone
+
+    matching = db.search_patients(name="Ramehs Singh", gender="M", birth_year=1985)
+    assert matching
+    for patient in matching:
+        assert patient["gender"] == "M"
+        assert abs(int(patient["dob"][:4]) - 1985) <= 1
+
+    assert db.search_patients(name="Ramehs Singh", gender="F", birth_year=1800) == []
+
+
+def test_search_gender_other():
+    """Stored "Other" matches gender=O on the SQL and fuzzy paths"""
+    other = [p for p in db.search_patients(name="a") if p["gender"] == "Other"]
+    assert other
+    name = other[0]["name"]
+    typo = name[:2] + name[3] + name[2] + name[4:]  # Only the fuzzy path finds it
+    for query in (name, typo):
+        results = db.search_patients(name=query, gender="O")
+        assert name in [p["name"] for p in results]
+        assert {p["gender"] for p in results} == {"Other"}
@@ -0,0 +1,126 @@
+"""
+Tests for field projection and response compression
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import db
+from app.main import app
+from app.utils.compression import CompressionMiddleware, negotiate_encoding
+
+client = TestClient(app)
+
+
+def test_db_projection_changes_select_list():
+    """Only projected columns (plus the id key) are read"""
+    results = db.search_patients(name="Ramesh", columns=["patient_id", "name"])
+    assert results
+    assert set(results[0]) == {"id", "patient_id", "name"}
+
+
+def test_db_projection_rejects_unknown_column():
+    """Unknown columns never reach the SQL text"""
+    with pytest.raises(ValueError):
+        db.get_patient("HA001", columns=["name; DROP TABLE patients"])
+
+
+def test_search_fields_projection():
+    """fields= limits the search result keys"""
+    response = client.get("/api/patients/search?name=Ramesh&fields=patient_id,name")
+    assert response.status_code == 200
+    for patient in response.json()["results"]:
+        assert set(patient) == {"patient_id", "name"}
+
+
+def test_details_projection_with_quality():
+    """Quality fields can be projected; their input columns are not returned"""
+    response = client.get("/api/patients/HA001?fields=patient_id,quality_score")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"patient_id", "quality_score"}
+    assert data["quality_score"] > 0
+
+
+def test_history_visit_projection():
+    """visit_fields= projects each visit row"""
+    response = client.get(
+        "/api/patients/HA001/history?fields=name&visit_fields=admission_date,diagnosis"
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["patient"]) == {"name"}
+    assert data["visits"]
+    assert set(data["visits"][0]) == {"admission_date", "diagnosis"}
+
+
+def test_unknown_field_is_rejected():
+    """Unknown projection fields return 400"""
+    response = client.get("/api/patients/HA001?fields=patient_id,password")
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
+
+
+def test_negotiate_encoding():
+    """Accept-Encoding negotiation honors q-values"""
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+def make_compressed_app(minimum_size=1024):
+    """Stand-in app returning a large JSON body behind the middleware."""
+    payload = {"visits": [{"diagnosis": "Diabetes Follow-up"}] * 200}
+    stand_in = FastAPI()
+    stand_in.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @stand_in.get("/history")
+    async def history():
+        return payload
+
+    @stand_in.get("/small")
+    async def small():
+        return {"status": "healthy"}
+
+    return TestClient(stand_in)
+
+
+def test_large_payload_is_gzip_compressed():
+    """Large payloads are gzip-compressed when accepted"""
+    response = make_compressed_app().get(
+        "/history", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < 1024
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()["visits"]) == 200
+
+
+def test_small_responses_are_not_compressed():
+    """Responses below the minimum size are sent as-is"""
+    response = make_compressed_app().get(
+        "/small", headers={"Accept-Encoding": "gzip, br"}
+    )
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_identity_when_not_accepted():
+    """No compression without a matching Accept-Encoding"""
+    response = make_compressed_app().get(
+        "/history", headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in response.headers
+    # Caches must not serve this identity body to gzip/br clients
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_brotli_preferred_when_available():
+    """br is negotiated when the brotli package is installed"""
+    pytest.importorskip("brotli")
+    response = make_compressed_app().get(
+        "/history", headers={"Accept-Encoding": "gzip, br"}
+    )
+    assert response.headers["content-encoding"] == "br"
@@ -0,0 +1,39 @@
+"""
+Tests for the orjson response path
+"""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.patient import MatchResult
+from app.utils.responses import FastJSONResponse
+
+client = TestClient(app)
+
+
+def test_fast_json_response_renders_bytes():
+    """FastJSONResponse renders compact JSON bytes"""
+    response = FastJSONResponse({"results": [{"id": 1, "name": "Ramesh"}], "count": 1})
+    assert response.body == b'{"results":[{"id":1,"name":"Ramesh"}],"count":1}'
+    assert response.media_type == "application/json"
+
+
+def test_match_response_still_matches_schema():
+    """/api/match skips re-validation, so check the payload against MatchResult"""
+    payload = {
+        "patient_a": {"patient_id": "HA001", "name": "Ramesh Singh"},
+        "patient_b": {"patient_id": "HB001", "name": "Ramehs Singh"},
+    }
+    response = client.post("/api/match", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    MatchResult.model_validate(response.json())
+
+
+def test_search_rows_include_quality_fields():
+    """Rows are serialized with the quality fields added in place"""
+    response = client.get("/api/patients/search?name=Ramesh")
+    assert response.status_code == 200
+    first = response.json()["results"][0]
+    assert "quality_score" in first
+    assert "missing_fields" in first
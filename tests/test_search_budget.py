@@ -0,0 +1,149 @@
+"""
+Tests for time-budgeted name search and cancellation on disconnect
+"""
+
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+from rapidfuzz import fuzz, process
+
+from app.config import settings
+from app.database import db
+from app.main import app
+from app.routes import patients as patient_routes
+from app.utils.budget import SearchBudget, run_until_disconnect
+from app.utils.single_flight import SingleFlight
+
+client = TestClient(app)
+
+NAMES = {
+    i: name
+    for i, name in enumerate(
+        ["Ramesh Singh", "Rajesh Kumar", "Ramesh Sing", "Suresh Rao", "Ramya Iyer"] * 8
+    )
+}
+
+
+class ChunkBudget(SearchBudget):
+    """Runs out after `chunks` budget checks"""
+
+    def __init__(self, chunks):
+        super().__init__()
+        self.checks_left = chunks
+
+    def exhausted(self):
+        self.checks_left -= 1
+        return self.checks_left < 0
+
+
+def test_chunked_scoring_matches_single_extract(monkeypatch):
+    monkeypatch.setattr(settings, "fuzzy_chunk_size", 7)
+    expected = process.extract(
+        "Ramesh Singh", NAMES, scorer=fuzz.ratio, limit=10, score_cutoff=70
+    )
+    budget = SearchBudget(0)
+    assert db._extract_within_budget("Ramesh Singh", NAMES, budget) == expected
+    assert db._extract_within_budget("Ramesh Singh", NAMES, None) == expected
+    assert not budget.partial
+
+
+def test_budget_exhausted_returns_best_so_far(monkeypatch):
+    monkeypatch.setattr(settings, "fuzzy_chunk_size", 5)
+    budget = ChunkBudget(chunks=1)
+    results = db._extract_within_budget("Ramesh Singh", NAMES, budget)
+    assert budget.partial
+    assert {key for _name, _score, key in results} <= set(range(5))
+    assert results[0][0] == "Ramesh Singh"
+
+
+def test_deadline_and_cancel():
+    budget = SearchBudget(0.01)
+    assert not budget.exhausted()
+    time.sleep(0.02)
+    assert budget.exhausted()
+
+    budget = SearchBudget(0)
+    assert not budget.exhausted()
+    budget.cancel()
+    assert budget.cancelled and budget.exhausted()
+
+
+def test_cancelled_search_skips_fuzzy_scoring():
+    budget = SearchBudget(0)
+    budget.cancel()
+    results = db.search_patients(name="Rmaesh Snigh", budget=budget)
+    assert budget.partial
+    assert results == db.search_patients(name="Rmaesh Snigh")[: len(results)]
+
+
+def test_search_response_flags_partial(monkeypatch):
+    response = client.get("/api/patients/search?name=Rmaesh")
+    assert response.json()["partial"] is False
+    assert "etag" in response.headers
+
+    def cancelled_budget(budget_s):
+        budget = SearchBudget(budget_s)
+        budget.cancel()
+        return budget
+
+    monkeypatch.setattr(patient_routes, "SearchBudget", cancelled_budget)
+    response = client.get("/api/patients/search?name=Rmaesh Sngh")
+    assert response.status_code == 200
+    assert response.json()["partial"] is True
+    # Partial results are not revalidated or cached
+    assert "etag" not in response.headers
+    assert "cache-control" not in response.headers
+
+
+def test_abandoned_flight_is_cancelled():
+    flight = SingleFlight()
+    budget = SearchBudget(0)
+
+    def search(budget):
+        while not budget.exhausted():
+            time.sleep(0.005)
+        return "stopped"
+
+    async def run():
+        callers = [
+            asyncio.ensure_future(
+                flight.do("key", search, budget, on_abandon=budget.cancel)
+            )
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.02)
+        callers[0].cancel()
+        await asyncio.sleep(0.02)
+        assert not budget.cancelled  # One caller still waits
+        callers[1].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert budget.cancelled
+    assert flight.stats()["in_flight"] == 0
+
+
+class FakeRequest:
+    def __init__(self, disconnected):
+        self.disconnected = disconnected
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def test_run_until_disconnect():
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def run():
+        assert await run_until_disconnect(FakeRequest(False), asyncio.sleep(0, "ok"))
+        work = asyncio.ensure_future(slow())
+        response = await run_until_disconnect(FakeRequest(True), work, poll_s=0.01)
+        await asyncio.sleep(0)
+        return response, work
+
+    response, work = asyncio.run(run())
+    assert response.status_code == 499
+    assert work.cancelled()
@@ -0,0 +1,127 @@
+"""
+Tests for the per-hospital sharded database layout
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.database import db, loader
+from app.database.shards import SHARDED, ShardSet
+from app.index import index_manager
+
+PATIENTS = {
+    "hospital_a": [
+        ("HA001", "Ramesh Singh", "12-3456-7890-1234", "9876543210"),
+        ("HA002", "Sunita Devi", "12-3456-7890-5555", "9000000001"),
+    ],
+    "hospital_b": [
+        ("HB001", "Ramesh Sing", "98-7654-3210-9876", "9876543210"),
+    ],
+}
+
+
+@pytest.fixture
+def sharded(tmp_path, monkeypatch):
+    """Load two hospitals into shard files and route db.py through them."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for hospital_id, rows in PATIENTS.items():
+        lines = ["patient_id,name,dob,mobile,gender,abha_number,address,state"]
+        lines += [
+            f"{pid},{name},1980-01-01,{mobile},M,{abha},Street,Delhi"
+            for pid, name, abha, mobile in rows
+        ]
+        (data_dir / f"{hospital_id}_patients.csv").write_text("\n".join(lines))
+    (data_dir / "hospital_a_visits.csv").write_text(
+        "visit_id,patient_id,admission_date,visit_type,diagnosis,doctor_name\n"
+        "VA001,HA001,2024-01-10,OPD,Fever,Dr. Rao"
+    )
+
+    shard_dir = tmp_path / "shards"
+    loader.load_all_data(
+        layout=SHARDED, data_dir=str(data_dir), shard_dir=str(shard_dir)
+    )
+    shards = ShardSet.sharded(str(shard_dir), workers=2)
+    monkeypatch.setattr(db, "shards", shards)
+    index_manager.invalidate()
+    yield shards
+    index_manager.invalidate()
+
+
+def test_loader_writes_one_file_per_hospital(sharded):
+    """Each hospital's CSV lands in its own shard file"""
+    assert sorted(sharded.keys()) == ["hospital_a", "hospital_b"]
+    with db.get_db("hospital_b") as session:
+        ids = [r[0] for r in session.execute(text("SELECT patient_id FROM patients"))]
+    assert ids == ["HB001"]
+
+
+def test_hospital_scoped_query_touches_one_shard(sharded):
+    """A hospital_id filter routes the query to that shard only"""
+    assert sharded.keys("hospital_a") == ["hospital_a"]
+    assert sharded.keys("hospital_z") == []
+    assert db.search_patients(phone="9876543210", hospital_id="hospital_z") == []
+
+    results = db.search_patients(phone="9876543210", hospital_id="hospital_a")
+    assert [p["patient_id"] for p in results] == ["HA001"]
+
+
+def test_cross_hospital_search_merges_shards(sharded):
+    """Identifier and name searches without hospital_id scatter to all shards"""
+    results = db.search_patients(phone="9876543210")
+    assert sorted(p["patient_id"] for p in results) == ["HA001", "HB001"]
+
+    results = db.search_patients(name="Ramesh")
+    ids = [p["patient_id"] for p in results]
+    assert "HA001" in ids and "HB001" in ids
+
+
+def test_fuzzy_name_search_per_shard(sharded):
+    """Typo-tolerant name search uses the name index scoped to each shard"""
+    results = db.search_patients(name="Sunitha Devi")
+    assert [p["patient_id"] for p in results] == ["HA002"]
+
+
+def test_patient_lookup_and_history(sharded):
+    """Lookups by patient_id find the right shard"""
+    assert db.get_patient("HB001")["hospital_id"] == "hospital_b"
+    assert db.get_patient("XX999") is None
+    assert db.get_patient_version("HA001") >= 1
+    visits = db.get_patient_visits("HA001")
+    assert [v["visit_id"] for v in visits] == ["VA001"]
+
+
+def test_data_signature_per_shard(sharded):
+    """Writing to one shard changes only that shard's version"""
+    before = dict(db.get_data_signature())
+    with db.get_db("hospital_b") as session:
+        session.execute(text("UPDATE patients SET state = 'Punjab'"))
+        session.commit()
+    after = dict(db.get_data_signature())
+    assert after["hospital_a"] == before["hospital_a"]
+    assert after["hospital_b"] > before["hospital_b"]
+
+
+def test_sharded_session_requires_hospital(sharded):
+    with pytest.raises(ValueError):
+        with db.get_db():
+            pass
+
+
+def test_visit_writes_keep_index_signature(sharded):
+    """Visits bump the patient's row version but not the index signature"""
+    before = dict(db.get_data_signature())
+    version = db.get_patient_version("HA001")
+    with db.get_db("hospital_a") as session:
+        session.execute(text("""
+            INSERT INTO visits (visit_id, patient_id, admission_date, visit_type)
+            VALUES ('VA002', 'HA001', '2024-02-01', 'OPD')
+            """))
+        session.commit()
+    assert db.get_patient_version("HA001") == version + 1
+    assert dict(db.get_data_signature()) == before
+
+    with db.get_db("hospital_a") as session:
+        session.execute(text("UPDATE patients SET name = 'Ramesh S' WHERE id = 1"))
+        session.commit()
+    assert dict(db.get_data_signature())["hospital_a"] > before["hospital_a"]
@@ -0,0 +1,100 @@
+"""
+Tests for single-flight coalescing of concurrent identical searches
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.single_flight import SingleFlight
+
+client = TestClient(app)
+
+
+def slow_search(name, started=None):
+    if started is not None:
+        started.set()
+    time.sleep(0.05)
+    return {"results": [name]}
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do(("name", "ramesh"), slow_search, "ramesh") for _ in range(5)),
+            flight.do(("name", "suresh"), slow_search, "suresh"),
+        )
+
+    results = asyncio.run(run())
+    assert results[:5] == [{"results": ["ramesh"]}] * 5
+    assert results[0] is results[4]  # One shared result
+    assert results[5] == {"results": ["suresh"]}
+    assert flight.stats() == {
+        "calls": 6,
+        "executions": 2,
+        "coalesced": 4,
+        "in_flight": 0,
+    }
+
+
+def test_sequential_calls_run_again():
+    flight = SingleFlight()
+
+    async def run():
+        await flight.do("key", slow_search, "a")
+        await flight.do("key", slow_search, "a")
+
+    asyncio.run(run())
+    assert flight.executions == 2
+    assert flight.coalesced == 0
+
+
+def test_exception_raised_in_every_caller():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.02)
+        raise RuntimeError("database locked")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do("key", failing) for _ in range(3)), return_exceptions=True
+        )
+
+    errors = asyncio.run(run())
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert flight.executions == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", slow_search, "a", started))
+        follower = asyncio.ensure_future(flight.do("key", slow_search, "a", started))
+        await asyncio.sleep(0)
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        leader.cancel()  # e.g. client disconnected
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == {"results": ["a"]}
+    assert flight.executions == 1
+
+
+def test_metrics_endpoint():
+    client.get("/api/patients/search?name=Ramesh")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    coalescing = response.json()["search_coalescing"]
+    assert coalescing["calls"] >= 1
+    assert coalescing["executions"] + coalescing["coalesced"] == coalescing["calls"]
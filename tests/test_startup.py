@@ -0,0 +1,134 @@
+"""
+Startup Performance Tests
+
+Guards the cold-start import budget of `app.main`. Workers are scaled up
+under load, so importing the app must stay cheap; heavy modules are loaded
+by the lifespan handler instead.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Cumulative import time allowed for `import app.main` (milliseconds)
+IMPORT_TIME_BUDGET_MS = 1500
+
+# Modules that must only be imported lazily (on first use or in the lifespan)
+DEFERRED_MODULES = [
+    "pandas",
+    "rapidfuzz",
+    "jellyfish",
+    "sklearn",
+    "app.matching.ml_matcher",
+]
+
+
+def run_importtime():
+    """Import app.main in a fresh interpreter with `-X importtime`."""
+    probe = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return proc.stdout.strip(), proc.stderr
+
+
+def parse_importtime(report: str) -> dict:
+    """Parse `-X importtime` output into {module: (self_us, cumulative_us)}."""
+    timings = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def format_report(timings: dict, top: int = 15) -> str:
+    """Render the slowest imports (by cumulative time) for the test report."""
+    slowest = sorted(timings.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+    lines = [f"{'cumulative ms':>14} {'self ms':>8}  module"]
+    for module, (self_us, cumulative_us) in slowest:
+        lines.append(f"{cumulative_us / 1000:14.1f} {self_us / 1000:8.1f}  {module}")
+    return "\n".join(lines)
+
+
+def test_import_app_main_within_budget():
+    """`import app.main` must stay within the cold-start budget"""
+    # Best of three runs to smooth out disk cache / scheduler noise
+    runs = []
+    for _ in range(3):
+        _, stderr = run_importtime()
+        timings = parse_importtime(stderr)
+        runs.append((timings["app.main"][1], timings))
+    cumulative_us, timings = min(runs, key=lambda run: run[0])
+
+    report = format_report(timings)
+    print(f"\nimport app.main: {cumulative_us / 1000:.1f} ms\n{report}")
+
+    assert cumulative_us / 1000 <= IMPORT_TIME_BUDGET_MS, (
+        f"import app.main took {cumulative_us / 1000:.1f} ms "
+        f"(budget {IMPORT_TIME_BUDGET_MS} ms)\n{report}"
+    )
+
+
+def test_heavy_modules_are_deferred():
+    """Heavy matching/data modules are not imported by `import app.main`"""
+    loaded, stderr = run_importtime()
+    assert loaded == "", (
+        f"Deferred modules imported eagerly: {loaded}\n"
+        f"{format_report(parse_importtime(stderr))}"
+    )
+
+
+def test_lifespan_initializes_matcher():
+    """The lifespan warmup builds the ML matcher"""
+    from app.main import app
+    from app.matching import simple_matcher
+    from app.startup import warmup_state
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        assert warmup_state.wait(timeout=30)
+        assert simple_matcher._ml_matcher is not None
+
+
+def test_ready_reports_indexes_after_warmup():
+    """GET /ready turns 200 after warmup and reports timings and index sizes"""
+    from app.main import app
+    from app.startup import warmup_state
+
+    with TestClient(app) as client:
+        assert warmup_state.wait(timeout=30)
+        response = client.get("/ready")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        for step in ("indexes", "matcher", "caches", "scorers", "total"):
+            assert step in data["timings_ms"]
+        assert data["indexes"]["names"]["built"] is True
+        assert data["indexes"]["names"]["entries"] > 0
+
+
+def test_ready_reports_warming_before_warmup(monkeypatch):
+    """GET /ready is 503 while warmup has not finished"""
+    from app import main
+    from app.startup import WarmupState
+
+    state = WarmupState()
+    state.start()
+    monkeypatch.setattr(main, "warmup_state", state)
+
+    response = TestClient(main.app).get("/ready")  # no lifespan: warmup not run
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming"
@@ -0,0 +1,132 @@
+"""
+Tests for type-ahead name suggestions
+"""
+
+from fastapi.testclient import TestClient
+
+from app.database import db
+from app.index.manager import IndexManager
+from app.index.suggest_index import SuggestIndex
+from app.main import app
+
+client = TestClient(app)
+
+ROWS = [
+    (1, "Ramesh Singh", "hospital_a"),
+    (2, "Ramesh Kumar", "hospital_a"),
+    (3, "Rajesh Kumar", "hospital_b"),
+    (4, "Ramya Iyer", "hospital_b"),
+    (5, "ramesh sharma", "hospital_b"),
+]
+
+
+def test_suggest_ranks_by_frequency():
+    index = SuggestIndex(ROWS)
+    assert index.suggest("ra") == [
+        {"text": "Ramesh", "count": 3},
+        {"text": "Rajesh", "count": 1},
+        {"text": "Ramya", "count": 1},
+    ]
+    assert index.suggest("RAM", limit=1) == [{"text": "Ramesh", "count": 3}]
+    assert index.suggest("ku") == [{"text": "Kumar", "count": 2}]
+    assert index.suggest("zz") == []
+    assert index.suggest("") == []
+
+
+def test_suggest_per_hospital():
+    index = SuggestIndex(ROWS)
+    assert index.suggest("ra", hospital_id="hospital_a") == [
+        {"text": "Ramesh", "count": 2}
+    ]
+    assert index.suggest("ra", hospital_id="hospital_z") == []
+
+
+def test_incremental_insert():
+    index = SuggestIndex(ROWS)
+    index.add_many([(6, "Rajesh Nair", "hospital_a"), (7, "Rajesh Rao", "hospital_a")])
+    assert index.suggest("raj")[0] == {"text": "Rajesh", "count": 3}
+    assert len(index) == 7
+
+
+def test_merged_inserts_match_a_full_build():
+    """Small inserts are merged into the published arrays, not re-sorted"""
+    first = [
+        (i, f"P{chr(97 + i // 26)}{chr(97 + i % 26)} Common", "hospital_a")
+        for i in range(1, 50)
+    ]
+    later = [
+        (50, "Aaron Common", "hospital_a"),
+        (51, "Zubin Pbb", "hospital_c"),
+        (52, "Mmm Nnn", "hospital_b"),
+    ]
+    index = SuggestIndex(first)
+    published = index._view
+    for row in later:
+        index.add_many([row])
+    index.add_many([])
+
+    expected = SuggestIndex(first + later)
+    assert index._view[0] == expected._view[0]
+    for prefix in ("a", "c", "m", "n", "p", "pb", "z"):
+        for hospital_id in (None, "hospital_a", "hospital_b", "hospital_c"):
+            assert index.suggest(prefix, hospital_id) == expected.suggest(
+                prefix, hospital_id
+            )
+    # The arrays readers already hold are left untouched
+    assert len(published[0]) == 50 and published[1].sum() == 98
+
+
+def test_refresh_reads_only_new_rows(monkeypatch):
+    """The manager refreshes the index in place when data changes"""
+    index = SuggestIndex(ROWS)
+    seen = {}
+
+    def names_after(last_ids):
+        seen.update(last_ids)
+        return [(8, "Ramesh Gupta", "hospital_b")]
+
+    monkeypatch.setattr(db, "iter_patient_names_after", names_after)
+    monkeypatch.setattr(db, "count_patients", lambda: 6)
+
+    signature = [1]
+    manager = IndexManager(signature_fn=lambda: tuple(signature), refresh_interval_s=0)
+    builds = []
+    manager.register("suggest", lambda: builds.append(1) or index)
+    assert manager.get("suggest") is index
+
+    signature.append(2)
+    assert manager.get("suggest") is index
+    assert len(builds) == 1  # Refreshed, not rebuilt
+    assert seen == {"hospital_a": 2, "hospital_b": 5}
+    assert index.suggest("ram")[0] == {"text": "Ramesh", "count": 4}
+
+    # Removed patients (count mismatch) force a rebuild
+    monkeypatch.setattr(db, "count_patients", lambda: 0)
+    signature.append(3)
+    manager.get("suggest")
+    assert manager.wait_for_rebuilds()
+    assert len(builds) == 2
+
+
+def test_names_after_and_count():
+    total = db.count_patients()
+    assert len(db.iter_patient_names_after({})) == total
+    assert db.iter_patient_names_after({"hospital_a": 10**9}) == []
+
+
+def test_suggest_endpoint():
+    response = client.get("/api/patients/suggest?q=ram")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["query"] == "ram"
+    assert data["suggestions"]
+    assert all(s["text"].lower().startswith("ram") for s in data["suggestions"])
+
+    # Earlier words are kept; the last word is completed
+    response = client.get("/api/patients/suggest?q=ramesh s&limit=3")
+    suggestions = response.json()["suggestions"]
+    assert 0 < len(suggestions) <= 3
+    assert all(s["text"].startswith("Ramesh S") for s in suggestions)
+
+    assert client.get("/api/patients/suggest?q=").status_code == 422
+    assert client.get("/api/patients/suggest?q=ram ").json()["suggestions"] == []
@@ -0,0 +1,96 @@
+"""
+Tests for the SymSpell deletion index over name tokens
+"""
+
+from app.config import settings
+from app.database import db
+from app.index import IndexManager, index_manager
+from app.index.symspell import SymSpellIndex, deletes, tokenize
+
+ROWS = [
+    (1, "Ramesh Singh", "hospital_a"),
+    (2, "Priya Sharma", "hospital_a"),
+    (3, "Vijay Kumar", "hospital_b"),
+    (4, "Ramesh Kumar", "hospital_b"),
+]
+
+
+def test_deletes_and_tokenize():
+    assert deletes("abc", 1) == {"abc", "bc", "ac", "ab"}
+    assert "a" in deletes("abc", 2)
+    assert tokenize("Dr. Ramesh  SINGH-2") == ["dr", "ramesh", "singh"]
+
+
+def test_lookup_indian_typos():
+    """Transpositions, doubled and dropped letters are found"""
+    index = SymSpellIndex(ROWS)
+    assert index.lookup("ramehs") == {"ramesh": 1}
+    assert index.lookup("kumarr") == {"kumar": 1}
+    assert index.lookup("prya") == {"priya": 1}
+    assert index.lookup("rmsh") == {}  # Short token: one edit allowed
+    assert index.lookup("rmsh", max_distance=2) == {"ramesh": 2}
+
+
+def test_candidates_require_every_token():
+    index = SymSpellIndex(ROWS)
+    assert index.candidates("Ramehs Kumarr") == {4: "Ramesh Kumar"}
+    assert set(index.candidates("Ramehs")) == {1, 4}
+    assert index.candidates("Ramehs", hospital_id="hospital_a") == {1: "Ramesh Singh"}
+    assert index.candidates("Ramehs", row_ids=[4]) == {4: "Ramesh Kumar"}
+    assert index.candidates("Zebediah") == {}
+
+
+def test_incremental_insert():
+    index = SymSpellIndex(ROWS)
+    assert index.candidates("Anjli Gupta") == {}
+    index.add(5, "Anjali Gupta", "hospital_a")
+    assert index.candidates("Anjli Gupta") == {5: "Anjali Gupta"}
+    # Existing tokens get new postings
+    index.add(6, "Priya Kumar", "hospital_b")
+    assert set(index.candidates("Prya")) == {2, 6}
+
+
+def test_refresh_reads_only_new_rows(monkeypatch):
+    """The manager refreshes the index in place when data changes"""
+    index = SymSpellIndex(ROWS)
+    seen = {}
+
+    def names_after(last_ids):
+        seen.update(last_ids)
+        return [(7, "Anjali Gupta", "hospital_a")]
+
+    monkeypatch.setattr(db, "iter_patient_names_after", names_after)
+    monkeypatch.setattr(db, "count_patients", lambda: 5)
+
+    signature = [1]
+    manager = IndexManager(signature_fn=lambda: tuple(signature), refresh_interval_s=0)
+    builds = []
+    manager.register("symspell", lambda: builds.append(1) or index)
+    assert manager.get("symspell") is index
+
+    signature.append(2)
+    assert manager.get("symspell") is index
+    assert len(builds) == 1  # Refreshed, not rebuilt
+    assert seen == {"hospital_a": 2, "hospital_b": 4}
+    assert index.candidates("Anjli Gupta") == {7: "Anjali Gupta"}
+
+    # Removed patients (count mismatch) force a rebuild
+    monkeypatch.setattr(db, "count_patients", lambda: 0)
+    signature.append(3)
+    manager.get("symspell")
+    assert manager.wait_for_rebuilds()
+    assert len(builds) == 2
+
+
+def test_search_feeds_symspell_candidates(monkeypatch):
+    """Large-corpus name search scores SymSpell candidates"""
+    monkeypatch.setattr(settings, "candidate_index_min_names", 0)
+    # An empty n-gram shortlist leaves only the SymSpell candidates
+    monkeypatch.setattr(settings, "ngram_shortlist_size", 0)
+    index_manager.invalidate()
+    try:
+        names = [p["name"] for p in db.search_patients(name="Ramehs Singhh")]
+        assert "Ramesh Singh" in names
+        assert index_manager.stats()["symspell"]["built"]
+    finally:
+        index_manager.invalidate()
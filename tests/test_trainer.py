@@ -0,0 +1,125 @@
+"""
+Tests for the logistic-regression trainer of the ML matcher
+"""
+
+import json
+import random
+
+import numpy as np
+import pytest
+
+from app.matching import ml_matcher, trainer
+from app.matching.ml_matcher import FEATURES, MLPatientMatcher
+
+FIRST = ["Ramesh", "Priya", "Vijay", "Suresh", "Anita", "Lakshmi", "Arjun", "Kavya"]
+LAST = ["Singh", "Sharma", "Kumar", "Patel", "Reddy", "Iyer", "Gupta", "Nair"]
+
+
+def person(rng):
+    return {
+        "name": f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+        "dob": f"{rng.randint(1950, 2010)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+        "gender": rng.choice("MF"),
+        "mobile": f"9{rng.randint(100000000, 999999999)}",
+    }
+
+
+def typo(name, rng):
+    i = rng.randrange(len(name) - 1)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2 :]
+
+
+@pytest.fixture
+def pairs_file(tmp_path):
+    """Labelled pairs: typo'd duplicates (1) and different people (0)"""
+    rng = random.Random(7)
+    path = tmp_path / "pairs.jsonl"
+    with open(path, "w") as f:
+        for _ in range(300):
+            a = person(rng)
+            b = {**a, "name": typo(a["name"], rng)}
+            if rng.random() < 0.3:
+                b["mobile"] = f"8{rng.randint(100000000, 999999999)}"
+            f.write(json.dumps({"a": a, "b": b, "label": 1}) + "\n")
+            f.write(json.dumps({"a": person(rng), "b": person(rng), "label": 0}) + "\n")
+    return path
+
+
+def test_parallel_extraction_matches_sequential(pairs_file):
+    seen = []
+    X1, y1 = trainer.load_features(str(pairs_file), workers=1, batch_size=128)
+    X2, y2 = trainer.load_features(
+        str(pairs_file), workers=2, batch_size=128, progress=seen.append
+    )
+    assert X1.shape == (600, len(FEATURES))
+    np.testing.assert_array_equal(X1, X2)
+    np.testing.assert_array_equal(y1, y2)
+    assert seen[-1] == 600
+
+
+def test_train_writes_weights_and_calibration(pairs_file, tmp_path):
+    weights_path = tmp_path / "weights.json"
+    calibration_path = tmp_path / "calibration.json"
+    rates = []
+    summary = trainer.train(
+        str(pairs_file),
+        str(weights_path),
+        str(calibration_path),
+        workers=1,
+        progress=lambda done, rate: rates.append(rate),
+    )
+    weights = json.loads(weights_path.read_text())
+    calibration = json.loads(calibration_path.read_text())
+
+    assert list(weights) == list(FEATURES)
+    assert all(w >= 0 for w in weights.values())
+    assert summary["pairs"] == 600 and summary["positives"] == 300
+    assert summary["accuracy"] > 0.95
+    assert rates and summary["pairs_per_second"] > 0
+    assert calibration["model_version"] == summary["model_version"]
+    assert calibration["slope"] == pytest.approx(sum(weights.values()), abs=1e-3)
+    assert sum(b["count"] for b in calibration["reliability"]) == 600
+
+
+def test_write_json_atomic_keeps_the_old_file_on_failure(tmp_path, monkeypatch):
+    path = tmp_path / "weights.json"
+    ml_matcher.write_json_atomic(str(path), {"ABHA Match": 5.0})
+    assert json.loads(path.read_text()) == {"ABHA Match": 5.0}
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ml_matcher.os, "replace", fail)
+    with pytest.raises(OSError):
+        ml_matcher.write_json_atomic(str(path), {"ABHA Match": 1.0})
+    assert json.loads(path.read_text()) == {"ABHA Match": 5.0}
+    assert [p.name for p in tmp_path.iterdir()] == ["weights.json"]
+
+
+def test_trained_weights_load_into_the_matcher(pairs_file, tmp_path, monkeypatch):
+    weights_path = tmp_path / "weights.json"
+    summary = trainer.train(
+        str(pairs_file), str(weights_path), str(tmp_path / "c.json"), workers=1
+    )
+    monkeypatch.setattr(ml_matcher, "MODEL_PATH", str(weights_path))
+    matcher = MLPatientMatcher()
+    assert matcher.model_version == summary["model_version"]
+
+
+def test_single_class_data_is_rejected(tmp_path):
+    path = tmp_path / "pairs.jsonl"
+    a = {"name": "Ramesh Singh"}
+    path.write_text(json.dumps({"a": a, "b": a, "label": 1}) + "\n")
+    with pytest.raises(ValueError, match="both matching and non-matching"):
+        trainer.train(str(path), str(tmp_path / "w"), str(tmp_path / "c"), workers=1)
+
+
+def test_matcher_train_swaps_weights(pairs_file):
+    examples = [json.loads(line) for line in pairs_file.read_text().splitlines()]
+    matcher = MLPatientMatcher()
+    before = matcher.weights
+    snapshot = dict(before)
+    matcher.train([(e["a"], e["b"]) for e in examples], [e["label"] for e in examples])
+    assert matcher.weights is not before
+    assert before == snapshot  # Readers holding the old weights see no change
+    assert set(matcher.weights) == set(FEATURES)